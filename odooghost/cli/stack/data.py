@@ -1,14 +1,24 @@
+import fnmatch
+import shlex
+import tarfile
+import time
 import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 
 import typer
 from loguru import logger
+from rich.console import Console
+from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+from rich.table import Table
 
 from odooghost import exceptions
 from odooghost.services import db, odoo
 from odooghost.stack import Stack
 from odooghost.utils import exec, misc
 from odooghost.utils.autocomplete import ac_stacks_lists
+from odooghost.utils.stream import ChunksReader
 
 if t.TYPE_CHECKING:
     from odooghost.container import Container
@@ -16,6 +26,306 @@ if t.TYPE_CHECKING:
 cli = typer.Typer(no_args_is_help=True)
 
 
+def print_restore_reports(dbname: str, reports: t.List[db.restore.PhaseReport]) -> None:
+    table = Table(title=f"{dbname} restore")
+    table.add_column("Phase")
+    table.add_column("Duration", justify="right")
+    table.add_column("Exit code", justify="right")
+    with_size = any(report.size is not None for report in reports)
+    if with_size:
+        table.add_column("Size", justify="right")
+        table.add_column("Throughput", justify="right")
+    for report in reports:
+        row = [report.name, f"{report.duration:.3f}s", str(report.exit_code)]
+        if with_size and report.size is not None:
+            row += [
+                misc.format_size(report.size),
+                f"{misc.format_size(report.size / (report.duration or 1))}/s",
+            ]
+        elif with_size:
+            row += ["-", "-"]
+        table.add_row(*row)
+    Console().print(table)
+
+
+def print_post_restore_reports(
+    dbname: str, reports: t.List[db.neutralize.StepReport]
+) -> None:
+    table = Table(title=f"{dbname} post restore")
+    table.add_column("Step")
+    table.add_column("Duration", justify="right")
+    for report in reports:
+        table.add_row(
+            report.name,
+            f"{report.duration:.3f}s" if report.duration is not None else "-",
+        )
+    Console().print(table)
+
+
+def run_post_restore(
+    stack: Stack, admin: db.AdminClient, dbname: str, verbose: bool = True
+) -> None:
+    stack_config = stack._config
+    logger.info("Running post restore steps ...")
+    try:
+        reports = db.neutralize.run_pipeline(
+            admin=admin,
+            dbname=dbname,
+            steps=stack_config.services.db.post_restore,
+            odoo_version=stack_config.services.odoo.version,
+        )
+    except exceptions.StackDatabaseQueryError as err:
+        # steps run in one transaction, database is left not neutralized
+        raise exceptions.StackDatabaseError(
+            f"Post restore steps failed, {dbname} is NOT neutralized: {err}. "
+            "Fix steps and run data neutralize, or drop the database"
+        )
+    if verbose:
+        print_post_restore_reports(dbname=dbname, reports=reports)
+
+
+def restore_stack_data(
+    stack: Stack,
+    dbname: str,
+    dump_path: Path,
+    filestore_path: t.Optional[Path] = None,
+    jobs: int = 0,
+    force: bool = False,
+    post_restore: bool = True,
+    exclude_patterns: t.Optional[t.List[str]] = None,
+    analyze: bool = True,
+    interactive: bool = True,
+) -> t.List[db.restore.PhaseReport]:
+    """
+    Restore database and/or filestore in Stack.
+    Non interactive restore fails on restore errors instead of asking
+    to continue and does not print reports.
+    """
+    db_service = t.cast("db.DbService", stack.get_service(name="db"))
+    db_container = db_service.get_container()
+    with db_service.admin() as admin:
+        if db.database_exists(admin=admin, dbname=dbname):
+            if not force:
+                raise exceptions.StackDatabaseError(
+                    f"Database {dbname} already exists !"
+                )
+            logger.info(f"Droping old database {dbname} ...")
+            db.drop_database(admin=admin, dbname=dbname)
+
+        jobs = db.restore.get_restore_jobs(container=db_container, jobs=jobs)
+        exclude_patterns = exclude_patterns or []
+        dest_dump_path = Path(
+            f"/tmp/odooghost_restore_{dbname}_{misc.get_now()}"  # nosec B108
+        )
+        with db.restore.prepare_dump(
+            dump_path=dump_path, jobs=jobs, exclude_patterns=exclude_patterns
+        ) as (upload_path, excluded):
+            logger.info("Transfering dump to container ...")
+            with misc.temp_tar_gz_file(upload_path) as tar_dump_path:
+                exec.create_folder(container=db_container, folder_path=dest_dump_path)
+                with open(tar_dump_path, "rb") as stream:
+                    db_container.put_archive(path=dest_dump_path, data=stream)
+        dest_dump_path /= upload_path.name
+
+        logger.info("Creating database ...")
+        db.create_database(admin=admin, dbname=dbname)
+
+        use_list = foreign_keys_path = None
+        if exclude_patterns and upload_path.suffix == ".sql":
+            logger.warning("Can not exclude tables data from plain SQL dump !")
+        elif exclude_patterns and not upload_path.name.endswith(
+            db.restore.SPLIT_SUFFIX
+        ):
+            use_list, excluded, foreign_keys_path = db.toc.write_filtered_toc(
+                container=db_container,
+                dump_path=dest_dump_path,
+                patterns=exclude_patterns,
+            )
+        if excluded:
+            logger.info(f"Excluding data of tables: {', '.join(sorted(excluded))}")
+
+        logger.info(f"Restoring dump with {jobs} jobs ...")
+        reports = db.restore_database(
+            container=db_container,
+            dbname=dbname,
+            dump_path=dest_dump_path,
+            jobs=jobs,
+            use_list=use_list,
+            foreign_keys_path=foreign_keys_path,
+            analyze=analyze,
+        )
+        failed = any(report.exit_code != 0 for report in reports)
+        if interactive:
+            print_restore_reports(dbname=dbname, reports=reports)
+            if failed and not typer.confirm(
+                "Restore exited with non 0 code, would you like to continue ?"
+            ):
+                logger.error("Failed to restore database !")
+                raise typer.Abort()
+        elif failed:
+            raise exceptions.StackDatabaseError(
+                f"Restore of {dbname} exited with non 0 code"
+            )
+
+        if post_restore:
+            run_post_restore(
+                stack=stack, admin=admin, dbname=dbname, verbose=interactive
+            )
+
+    if filestore_path:
+        odoo_container = t.cast(
+            "Container", stack.get_service(name="odoo").get_container()
+        )
+        dest_filestore_path = odoo.get_filestore_path(dbname=dbname)
+        if exec.folder_exists(
+            container=odoo_container, folder_path=dest_filestore_path
+        ):
+            if not force:
+                raise exceptions.StackException(
+                    f"Filestore path {dest_filestore_path} already exists !"
+                )
+            exec.remove_inode(container=odoo_container, inode_path=dest_filestore_path)
+
+        logger.info("Transfering filestore to container ...")
+        if filestore_path.is_dir():
+            shards = odoo.filestore.restore_filestore(
+                container=odoo_container,
+                source=filestore_path,
+                dest=dest_filestore_path,
+                jobs=jobs,
+            )
+            logger.debug(f"Transfered {shards} filestore shards")
+        else:
+            with misc.temp_tar_gz_file(
+                filestore_path, ignore_tar=True, include_root_dir=False
+            ) as tar_filestore_path:
+                exec.create_folder(
+                    container=odoo_container, folder_path=dest_filestore_path
+                )
+                with open(tar_filestore_path, "rb") as stream:
+                    odoo_container.put_archive(path=dest_filestore_path, data=stream)
+                exec.set_permissions(container=odoo_container, path=dest_filestore_path)
+    return reports
+
+
+def dump_stack_data(
+    stack: Stack,
+    dbname: str,
+    dest: Path,
+    jobs: int = 4,
+    pg_format: db.DumpFormat = db.DumpFormat.d,
+) -> int:
+    """
+    Dump database and filestore of Stack in a `dest/dbname` folder,
+    laid out as expected by restore-dir.
+    Dump file is removed from db container once transfered.
+
+    Returns:
+        int: dumped size
+    """
+    db_container = stack.get_service(name="db").get_container()
+    dest = dest / dbname
+    dest.mkdir(parents=True)
+    logger.info(f"Dumping database {dbname} ...")
+    exit_code, dump_path = db.dump_database(
+        container=db_container, dbname=dbname, jobs=jobs, format=pg_format
+    )
+    try:
+        if exit_code != 0:
+            raise exceptions.StackDatabaseError(
+                f"pg_dump of {dbname} exited with code {exit_code}"
+            )
+        data, _ = db_container.get_archive(path=dump_path)
+        with tarfile.open(fileobj=ChunksReader(data), mode="r|") as tar:
+            tar.extractall(path=dest, **odoo.filestore.EXTRACT_OPTIONS)  # nosec B202
+    finally:
+        exec.remove_inode(container=db_container, inode_path=dump_path)
+
+    odoo_container = t.cast("Container", stack.get_service(name="odoo").get_container())
+    filestore_path = odoo.get_filestore_path(dbname=dbname)
+    if exec.folder_exists(container=odoo_container, folder_path=filestore_path):
+        odoo.filestore.dump_filestore(
+            container=odoo_container,
+            path=filestore_path,
+            dest=dest / "filestore",
+            jobs=jobs,
+        )
+    else:
+        logger.warning(f"Filestore at {filestore_path} doest not exists !")
+    return sum(path.stat().st_size for path in dest.rglob("*") if path.is_file())
+
+
+class RunReport(t.NamedTuple):
+    dbname: str
+    duration: float
+    error: t.Optional[str] = None
+    size: t.Optional[int] = None
+
+
+def run_concurrently(
+    action: str,
+    dbnames: t.List[str],
+    func: t.Callable[[str], t.Optional[int]],
+    concurrency: int = 2,
+) -> t.List[RunReport]:
+    """
+    Run func on databases concurrently, with one progress line by database.
+    Func may return a size, any error is recorded in database report.
+    """
+    with Progress(
+        SpinnerColumn(), TextColumn("{task.description}"), TimeElapsedColumn()
+    ) as progress:
+        tasks = {
+            dbname: progress.add_task(f"{dbname}: waiting", start=False, total=1)
+            for dbname in dbnames
+        }
+
+        def _run(dbname: str) -> RunReport:
+            progress.start_task(tasks[dbname])
+            progress.update(tasks[dbname], description=f"{dbname}: {action}")
+            start = time.monotonic()
+            size, error = None, None
+            try:
+                size = func(dbname)
+            except exceptions.StackException as err:
+                error = str(err)
+            except Exception as err:
+                # docker, filesystem or archive errors must not abort other databases
+                error = f"{type(err).__name__}: {err}"
+            progress.update(
+                tasks[dbname],
+                completed=1,
+                description=f"{dbname}: {'failed' if error else 'done'}",
+            )
+            return RunReport(
+                dbname=dbname,
+                duration=time.monotonic() - start,
+                error=error,
+                size=size,
+            )
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            return list(executor.map(_run, dbnames))
+
+
+def print_run_reports(title: str, reports: t.List[RunReport]) -> None:
+    table = Table(title=title)
+    table.add_column("Database")
+    table.add_column("Status")
+    table.add_column("Duration", justify="right")
+    table.add_column("Size", justify="right")
+    for report in reports:
+        table.add_row(
+            report.dbname,
+            f"[red]failed: {report.error}[/red]"
+            if report.error
+            else "[green]ok[/green]",
+            f"{report.duration:.1f}s",
+            misc.format_size(report.size) if report.size is not None else "-",
+        )
+    Console().print(table)
+
+
 @cli.command()
 def dump(
     stack_name: t.Annotated[
@@ -24,7 +334,13 @@ def dump(
             ..., help="Stack name", show_default=False, autocompletion=ac_stacks_lists
         ),
     ],
-    dbname: t.Annotated[str, typer.Argument(help="Database name", show_default=False)],
+    dbnames: t.Annotated[
+        t.Optional[t.List[str]],
+        typer.Argument(help="Database names or glob patterns", show_default=False),
+    ] = None,
+    all_databases: t.Annotated[
+        bool, typer.Option("--all", help="Dump all Stack databases")
+    ] = False,
     dest: t.Annotated[
         Path,
         typer.Option(
@@ -44,21 +360,68 @@ def dump(
         typer.Option(
             "-j",
             "--jobs",
-            help="Postgres pg_dump jobs (Only availible in --pg-format=d)",
+            help="Postgres pg_dump jobs (Only availible in --pg-format=d) "
+            "and filestore concurrent streams",
         ),
     ] = 4,
     pg_format: t.Annotated[
         db.DumpFormat, typer.Option("--pg-format", help="Postgres dump format")
     ] = db.DumpFormat.d,
+    concurrency: t.Annotated[
+        int,
+        typer.Option(
+            "-c",
+            "--concurrency",
+            help="Databases dumped concurrently when dumping several databases",
+        ),
+    ] = 2,
 ) -> None:
     """
-    Dump one off Stack database and/or it's filestore.
+    Dump Stack databases and/or their filestore.
+    Several databases are dumped in a folder which can be restored with restore-dir.
     """
+    if not dbnames and not all_databases:
+        logger.error("Provide database names or use --all !")
+        raise typer.Abort()
     try:
         stack = Stack.from_name(name=stack_name)
-        db_container = t.cast("Container", stack.get_service(name="db").get_container())
+        db_service = t.cast("db.DbService", stack.get_service(name="db"))
+        db_container = db_service.get_container()
 
-        if not db.database_exsits(container=db_container, dbname=dbname):
+        with db_service.admin() as admin:
+            databases = [database.name for database in db.list_databases(admin=admin)]
+        if all_databases or len(dbnames) > 1 or misc.is_glob(dbnames[0]):
+            patterns = ["*"] if all_databases else dbnames
+            matched = [
+                dbname
+                for dbname in databases
+                if dbname not in ("postgres", db_service.config.db)
+                and any(fnmatch.fnmatchcase(dbname, pattern) for pattern in patterns)
+            ]
+            if not matched:
+                logger.error("No database matches !")
+                raise typer.Abort()
+            dest_path = dest / f"{stack.name}_dump_{misc.get_now()}"
+            reports = run_concurrently(
+                action="dumping",
+                dbnames=matched,
+                func=lambda dbname: dump_stack_data(
+                    stack=stack,
+                    dbname=dbname,
+                    dest=dest_path,
+                    jobs=jobs,
+                    pg_format=pg_format,
+                ),
+                concurrency=concurrency,
+            )
+            print_run_reports(title=f"{stack_name} dump", reports=reports)
+            logger.info(f"Dumped {len(matched)} databases at {dest_path.as_posix()}")
+            if any(report.error for report in reports):
+                raise typer.Exit(code=1)
+            return
+
+        dbname = dbnames[0]
+        if dbname not in databases:
             logger.error(f"Database {dbname} does not exists !")
             raise typer.Abort()
 
@@ -87,10 +450,11 @@ def dump(
             return
 
         logger.debug("Transfering filestore from container ...")
-        data, _ = odoo_container.get_archive(path=filestore_path)
-        dest_path = dest / f"{stack.name}_dump_filestore_{dbname}_{now}.tar"
-        misc.write_tar(dest=dest_path, data=data)
-        logger.info(f"Transfered filestore at {dest_path.as_posix()}")
+        dest_path = dest / f"{stack.name}_dump_filestore_{dbname}_{now}"
+        shards = odoo.filestore.dump_filestore(
+            container=odoo_container, path=filestore_path, dest=dest_path, jobs=jobs
+        )
+        logger.info(f"Transfered filestore ({shards} shards) at {dest_path.as_posix()}")
         logger.info(f"Done dumping stack {stack_name} data !")
     except exceptions.StackException as err:
         logger.error(f"Failed to dump {stack_name} data !")
@@ -131,9 +495,10 @@ def restore(
         typer.Option(
             "-j",
             "--jobs",
-            help="Postgres pg_restore jobs (Only availible in --pg-format=d)",
+            help="Restore jobs and filestore concurrent streams, "
+            "defaults to db container CPUs",
         ),
-    ] = 4,
+    ] = 0,
     force: t.Annotated[
         bool,
         typer.Option(
@@ -142,6 +507,34 @@ def restore(
             help="Drop database if already exists",
         ),
     ] = False,
+    post_restore: t.Annotated[
+        bool,
+        typer.Option(
+            "--no-post-restore",
+            help="Do not run post restore steps defined in stack config",
+        ),
+    ] = True,
+    exclude_data: t.Annotated[
+        t.Optional[t.List[str]],
+        typer.Option(
+            "--exclude-data",
+            help="Do not restore data of tables matching pattern (schema is kept)",
+        ),
+    ] = None,
+    profile: t.Annotated[
+        t.Optional[db.toc.RestoreProfile],
+        typer.Option(
+            "--profile",
+            help="Restore profile, lean excludes heavy tables data",
+        ),
+    ] = None,
+    analyze: t.Annotated[
+        bool,
+        typer.Option(
+            "--no-analyze",
+            help="Do not analyze database once restored",
+        ),
+    ] = True,
 ) -> None:
     """
     Restore database and/or filestore in Stack
@@ -155,88 +548,398 @@ def restore(
             "Provide a valid filestore ! Either a folder or a tar(gz) archive."
         )
         raise typer.Abort()
+    exclude_patterns = list(exclude_data or [])
+    if profile is not None:
+        exclude_patterns += db.toc.RESTORE_PROFILES[profile]
     try:
-        stack = Stack.from_name(name=stack_name)
-        db_container = t.cast("Container", stack.get_service(name="db").get_container())
-
-        if db.database_exsits(container=db_container, dbname=dbname):
-            if not force:
-                logger.error(f"Database {dbname} already exists !")
-                raise typer.Abort()
-            logger.info(f"Droping old database {dbname} ...")
-            if db.drop_database(container=db_container, dbname=dbname) != 0:
-                logger.error(f"Failed to drop database {dbname} !")
-                raise typer.Abort()
-
-        logger.info("Transfering dump to container ...")
-        dest_dump_path = Path(
-            f"/tmp/odooghost_restore_{dbname}_{misc.get_now()}"  # nosec B108
+        restore_stack_data(
+            stack=Stack.from_name(name=stack_name),
+            dbname=dbname,
+            dump_path=dump_path,
+            filestore_path=filestore_path,
+            jobs=jobs,
+            force=force,
+            post_restore=post_restore,
+            exclude_patterns=exclude_patterns,
+            analyze=analyze,
         )
+        logger.info(f"Done restoring stack {stack_name} data !")
+    except exceptions.StackException as err:
+        logger.error(f"Failed to restore {stack_name} data !")
+        logger.error(err)
+        raise typer.Exit(code=1)
 
-        with misc.temp_tar_gz_file(dump_path) as tar_dump_path:
-            if tar_dump_path is None:
-                tar_dump_path = dump_path
-            exec.create_folder(container=db_container, folder_path=dest_dump_path)
-            with open(tar_dump_path, "rb") as stream:
-                db_container.put_archive(path=dest_dump_path, data=stream)
 
-        logger.info("Creating database ...")
-        if db.create_database(container=db_container, dbname=dbname) != 0:
-            logger.error(f"Failed to create database {dbname}!")
-            raise typer.Abort()
+@cli.command()
+def restore_dir(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    dumps_path: t.Annotated[
+        Path,
+        typer.Argument(
+            file_okay=False,
+            dir_okay=True,
+            readable=True,
+            resolve_path=True,
+            exists=True,
+            help="Folder of databases dumps, as made by dump with several databases",
+        ),
+    ],
+    jobs: t.Annotated[
+        int,
+        typer.Option(
+            "-j",
+            "--jobs",
+            help="Restore jobs and filestore concurrent streams by database, "
+            "defaults to db container CPUs",
+        ),
+    ] = 0,
+    concurrency: t.Annotated[
+        int,
+        typer.Option(
+            "-c",
+            "--concurrency",
+            help="Databases restored concurrently",
+        ),
+    ] = 2,
+    force: t.Annotated[
+        bool,
+        typer.Option(
+            "-f",
+            "--force",
+            help="Drop databases if already exists",
+        ),
+    ] = False,
+    post_restore: t.Annotated[
+        bool,
+        typer.Option(
+            "--no-post-restore",
+            help="Do not run post restore steps defined in stack config",
+        ),
+    ] = True,
+    profile: t.Annotated[
+        t.Optional[db.toc.RestoreProfile],
+        typer.Option(
+            "--profile",
+            help="Restore profile, lean excludes heavy tables data",
+        ),
+    ] = None,
+    analyze: t.Annotated[
+        bool,
+        typer.Option(
+            "--no-analyze",
+            help="Do not analyze databases once restored",
+        ),
+    ] = True,
+) -> None:
+    """
+    Restore a folder of databases dumps and their filestore in Stack
+    """
+    dumps: t.Dict[str, t.Tuple[Path, t.Optional[Path]]] = {}
+    for folder in sorted(dumps_path.iterdir()):
+        if not folder.is_dir():
+            continue
+        dump_paths = [path for path in folder.iterdir() if path.name != "filestore"]
+        if len(dump_paths) != 1:
+            logger.warning(f"Skipping {folder.name}, expected one database dump")
+            continue
+        filestore_path = folder / "filestore"
+        dumps[folder.name] = (
+            dump_paths[0],
+            filestore_path if filestore_path.is_dir() else None,
+        )
+    if not dumps:
+        logger.error(f"No database dump found in {dumps_path.as_posix()} !")
+        raise typer.Abort()
+    try:
+        stack = Stack.from_name(name=stack_name)
+    except exceptions.StackException as err:
+        logger.error(err)
+        raise typer.Exit(code=1)
 
-        logger.info("Restoring dump ...")
-        if db.restore_database(
-            container=db_container,
+    def _restore(dbname: str) -> int:
+        dump_path, filestore_path = dumps[dbname]
+        restore_stack_data(
+            stack=stack,
             dbname=dbname,
-            dump_path=dest_dump_path / dump_path.name,
+            dump_path=dump_path,
+            filestore_path=filestore_path,
             jobs=jobs,
-        ) != 0 and not typer.confirm(
-            "pg_restore exited with non 0 code, would you like to continue ?"
-        ):
-            logger.error("Failed to restore database !")
-            raise typer.Abort()
+            force=force,
+            post_restore=post_restore,
+            exclude_patterns=db.toc.RESTORE_PROFILES[profile] if profile else None,
+            analyze=analyze,
+            interactive=False,
+        )
+        return sum(
+            path.stat().st_size
+            for path in (dumps_path / dbname).rglob("*")
+            if path.is_file()
+        )
 
-        logger.info("Changing web base url ...")
-        if db.change_base_url(container=db_container, dbname=dbname) != 0:
-            logger.info(
-                "The change web base url command return with non 0 code. Continuing..."
-            )
+    reports = run_concurrently(
+        action="restoring",
+        dbnames=list(dumps),
+        func=_restore,
+        concurrency=concurrency,
+    )
+    print_run_reports(title=f"{stack_name} restore", reports=reports)
+    if any(report.error for report in reports):
+        raise typer.Exit(code=1)
 
-        if filestore_path:
-            odoo_container = t.cast(
-                "Container", stack.get_service(name="odoo").get_container()
+
+@cli.command()
+def clone(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    source_stack_name: t.Annotated[
+        str,
+        typer.Argument(
+            ...,
+            help="Stack name whose remote database is cloned",
+            autocompletion=ac_stacks_lists,
+        ),
+    ],
+    dbname: t.Annotated[str, typer.Argument(help="Remote database name")],
+    dest_dbname: t.Annotated[
+        t.Optional[str],
+        typer.Option(
+            "-n", "--name", help="Local database name. Defaults to remote name"
+        ),
+    ] = None,
+    jobs: t.Annotated[
+        int,
+        typer.Option(
+            "-j",
+            "--jobs",
+            help="Concurrent data pipes, defaults to db container CPUs",
+        ),
+    ] = 0,
+    force: t.Annotated[
+        bool,
+        typer.Option(
+            "-f",
+            "--force",
+            help="Drop local database if already exists",
+        ),
+    ] = False,
+    post_restore: t.Annotated[
+        bool,
+        typer.Option(
+            "--no-post-restore",
+            help="Do not run post restore steps defined in stack config",
+        ),
+    ] = True,
+    analyze: t.Annotated[
+        bool,
+        typer.Option(
+            "--no-analyze",
+            help="Do not analyze database once cloned",
+        ),
+    ] = True,
+) -> None:
+    """
+    Clone a remote database in Stack without intermediate dump file
+    """
+    dest_dbname = dest_dbname or dbname
+    try:
+        stack = Stack.from_name(name=stack_name)
+        source_config = Stack.from_name(name=source_stack_name)._config.services.db
+        source = db.clone.CloneSource.from_config(
+            db_config=source_config, dbname=dbname
+        )
+        db_service = t.cast("db.DbService", stack.get_service(name="db"))
+        if db_service.is_remote:
+            logger.error(f"Stack {stack_name} database is not local !")
+            raise typer.Abort()
+        if source_config.version > db_service.config.version:
+            logger.error(
+                f"Can not clone from Postgres {source_config.version} "
+                f"to older Postgres {db_service.config.version} !"
             )
-            dest_filestore_path = odoo.get_filestore_path(dbname=dbname)
-            if exec.folder_exists(
-                container=odoo_container, folder_path=dest_filestore_path
-            ):
+            raise typer.Abort()
+        db_container = db_service.get_container()
+
+        with db_service.admin() as admin:
+            if db.database_exists(admin=admin, dbname=dest_dbname):
                 if not force:
-                    logger.error("Filestore path already exists !")
+                    logger.error(f"Database {dest_dbname} already exists !")
                     raise typer.Abort()
+                logger.info(f"Droping old database {dest_dbname} ...")
+                db.drop_database(admin=admin, dbname=dest_dbname)
+            db.create_database(admin=admin, dbname=dest_dbname)
 
-                exec.remove_inode(
-                    container=odoo_container, inode_path=dest_filestore_path
-                )
+            jobs = db.restore.get_restore_jobs(container=db_container, jobs=jobs)
+            logger.info(f"Cloning {source.host}/{dbname} with {jobs} jobs ...")
+            reports = db.clone.clone_database(
+                container=db_container,
+                source=source,
+                dbname=dest_dbname,
+                jobs=jobs,
+                analyze=analyze,
+            )
+            print_restore_reports(dbname=dest_dbname, reports=reports)
+            if any(report.exit_code != 0 for report in reports) and not typer.confirm(
+                "Clone exited with non 0 code, would you like to continue ?"
+            ):
+                logger.error("Failed to clone database !")
+                raise typer.Abort()
 
-            logger.info("Transfering filestore to container ...")
-            with misc.temp_tar_gz_file(
-                filestore_path, ignore_tar=True, include_root_dir=False
-            ) as tar_filestore_path:
-                if tar_filestore_path is None:
-                    tar_filestore_path = filestore_path
-                exec.create_folder(
-                    container=odoo_container, folder_path=dest_filestore_path
-                )
-                with open(tar_filestore_path, "rb") as stream:
-                    odoo_container.put_archive(path=dest_filestore_path, data=stream)
+            if post_restore:
+                run_post_restore(stack=stack, admin=admin, dbname=dest_dbname)
+        logger.info(f"Done cloning {dbname} in stack {stack_name} !")
+    except exceptions.StackException as err:
+        logger.error(f"Failed to clone {dbname} in {stack_name} !")
+        logger.error(err)
+        raise typer.Exit(code=1)
 
-                exec.set_permissions(container=odoo_container, path=dest_filestore_path)
 
-        logger.info(f"Done restoring stack {stack_name} data !")
+@cli.command()
+def sync_filestore(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    dbname: t.Annotated[str, typer.Argument(help="Database name")],
+    filestore_path: t.Annotated[
+        Path,
+        typer.Argument(
+            file_okay=False,
+            dir_okay=True,
+            readable=True,
+            resolve_path=True,
+            exists=True,
+            help="Database filestore folder",
+        ),
+    ],
+    jobs: t.Annotated[
+        int,
+        typer.Option(
+            "-j",
+            "--jobs",
+            help="Concurrent hashing threads and filestore streams",
+        ),
+    ] = 4,
+    delete: t.Annotated[
+        bool,
+        typer.Option(
+            "--delete",
+            help="Delete files missing from source filestore",
+        ),
+    ] = False,
+    dry_run: t.Annotated[
+        bool,
+        typer.Option(
+            "--dry-run",
+            help="Only show what would be transfered",
+        ),
+    ] = False,
+) -> None:
+    """
+    Sync filestore in Stack, transfering only missing or changed files
+    """
+    try:
+        stack = Stack.from_name(name=stack_name)
+        odoo_container = t.cast(
+            "Container", stack.get_service(name="odoo").get_container()
+        )
+        logger.info("Comparing filestores ...")
+        report = odoo.filestore.sync_filestore(
+            container=odoo_container,
+            source=filestore_path,
+            dest=odoo.get_filestore_path(dbname=dbname),
+            jobs=jobs,
+            delete=delete,
+            dry_run=dry_run,
+        )
     except exceptions.StackException as err:
-        logger.error(f"Failed to restore {stack_name} data !")
+        logger.error(f"Failed to sync {stack_name} {dbname} filestore !")
+        logger.error(err)
+        raise typer.Exit(code=1)
+    logger.info(
+        f"{'Would transfer' if dry_run else 'Transfered'} {report.transfered} files "
+        f"({misc.format_size(report.size)}) in {report.shards} shards"
+        + (f", {report.deleted} deleted" if delete else "")
+    )
+
+
+@cli.command()
+def base_backup(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+) -> None:
+    """
+    Take a base backup of Stack database cluster in WAL archive
+    """
+    try:
+        stack = Stack.from_name(name=stack_name)
+        db_service = t.cast("db.DbService", stack.get_service(name="db"))
+        logger.info("Taking base backup ...")
+        db_service.base_backup()
+    except exceptions.StackException as err:
+        logger.error(f"Failed to take {stack_name} base backup !")
+        logger.error(err)
+        raise typer.Exit(code=1)
+    logger.info(f"Done taking {stack_name} base backup !")
+
+
+@cli.command()
+def pitr(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    target: t.Annotated[
+        str,
+        typer.Option(
+            "--to",
+            help="Recovery target, ISO 8601 timestamp, local time if no offset",
+        ),
+    ],
+    timeout: t.Annotated[
+        int, typer.Option("--timeout", help="WAL replay timeout in seconds")
+    ] = 600,
+    yes: t.Annotated[
+        bool, typer.Option("--yes", "-y", help="Do not ask for confirmation")
+    ] = False,
+) -> None:
+    """
+    Recover Stack database cluster at a point in time from WAL archive.
+    All databases are rewound, changes made after target are lost.
+    """
+    try:
+        target_date = datetime.fromisoformat(target).astimezone(timezone.utc)
+    except ValueError:
+        logger.error(f"Invalid recovery target {target} !")
+        raise typer.Abort()
+    if target_date > datetime.now(timezone.utc):
+        logger.error("Recovery target is in the future !")
+        raise typer.Abort()
+    if not yes:
+        typer.confirm(
+            f"All {stack_name} databases will be rewound to "
+            f"{target_date.isoformat()}, continue ?",
+            abort=True,
+        )
+    try:
+        stack = Stack.from_name(name=stack_name)
+        db_service = t.cast("db.DbService", stack.get_service(name="db"))
+        start = time.monotonic()
+        backup = db_service.recover(target=target_date, timeout=timeout)
+    except exceptions.StackException as err:
+        logger.error(f"Failed to recover {stack_name} database cluster !")
         logger.error(err)
+        raise typer.Exit(code=1)
+    logger.info(
+        f"Recovered {stack_name} at {target_date.isoformat()} from base backup "
+        f"{backup.name} in {time.monotonic() - start:.1f}s !"
+    )
 
 
 @cli.command()
@@ -252,27 +955,23 @@ def drop(
     """
     try:
         stack = Stack.from_name(name=stack_name)
-        db_container = t.cast("Container", stack.get_service(name="db").get_container())
+        db_service = t.cast("db.DbService", stack.get_service(name="db"))
 
-        if not db.database_exsits(container=db_container, dbname=dbname):
-            logger.error(f"Database {dbname} doest not exists !")
-            raise typer.Abort()
+        with db_service.admin() as admin:
+            if not db.database_exists(admin=admin, dbname=dbname):
+                logger.error(f"Database {dbname} doest not exists !")
+                raise typer.Abort()
 
-        logger.info("Dropping database ...")
-        if db.drop_database(container=db_container, dbname=dbname) != 0:
-            logger.error(f"Failed to drop database {dbname} !")
-            raise typer.Abort()
+            logger.info("Dropping database ...")
+            db.drop_database(admin=admin, dbname=dbname)
 
         odoo_container = t.cast(
             "Container", stack.get_service(name="odoo").get_container()
         )
         logger.info("Removing filestore ...")
-        if (
-            exec.remove_inode(
-                container=odoo_container,
-                inode_path=odoo.get_filestore_path(dbname=dbname),
-            )
-            != 0
+        if not exec.remove_inode(
+            container=odoo_container,
+            inode_path=odoo.get_filestore_path(dbname=dbname),
         ):
             logger.error(f"Failed to remove database {dbname} filestore !")
             raise typer.Abort()
@@ -282,6 +981,182 @@ def drop(
         logger.error(err)
 
 
+@cli.command()
+def init(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    dbname: t.Annotated[str, typer.Argument(help="Database name")],
+    install: t.Annotated[
+        t.List[str],
+        typer.Option("-i", "--install", help="Modules to install, comma separated"),
+    ] = ["base"],
+    odoo_args: t.Annotated[
+        t.Optional[str],
+        typer.Option("--odoo-args", help="Additional odoo-bin install arguments"),
+    ] = None,
+    force: t.Annotated[
+        bool,
+        typer.Option(
+            "-f",
+            "--force",
+            help="Drop database if already exists",
+        ),
+    ] = False,
+    use_cache: t.Annotated[
+        bool,
+        typer.Option("--no-cache", help="Rebuild cached template"),
+    ] = True,
+) -> None:
+    """
+    Create a database with modules installed from a cached template
+    """
+    modules = [
+        module.strip() for arg in install for module in arg.split(",") if module.strip()
+    ]
+    try:
+        stack = Stack.from_name(name=stack_name)
+        db_service = t.cast("db.DbService", stack.get_service(name="db"))
+        if db_service.is_remote:
+            logger.error(f"Stack {stack_name} database is not local !")
+            raise typer.Abort()
+        odoo_service = stack.get_service(name="odoo")
+        stack.start_dependencies()
+
+        with db_service.admin() as admin:
+            if db.database_exists(admin=admin, dbname=dbname):
+                if not force:
+                    logger.error(f"Database {dbname} already exists !")
+                    raise typer.Abort()
+                logger.info(f"Droping old database {dbname} ...")
+                db.drop_database(admin=admin, dbname=dbname)
+        odoo_service.run_one_off(
+            command=["rm", "-rf", odoo.get_filestore_path(dbname=dbname)]
+        )
+
+        start = time.monotonic()
+        template, cached = odoo.templates.get_template(
+            odoo_service=odoo_service,
+            db_service=db_service,
+            modules=modules,
+            args=shlex.split(odoo_args or ""),
+            use_cache=use_cache,
+        )
+        odoo.templates.create_from_template(
+            odoo_service=odoo_service,
+            db_service=db_service,
+            template=template.name,
+            dbnames=[dbname],
+        )
+        logger.info(
+            f"Done creating {dbname} in {time.monotonic() - start:.1f}s "
+            f"from {'cached' if cached else 'new'} template {template.name} !"
+        )
+    except exceptions.StackException as err:
+        logger.error(f"Failed to init {dbname} in {stack_name} !")
+        logger.error(err)
+        raise typer.Exit(code=1)
+
+
+@cli.command()
+def templates(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    clear: t.Annotated[
+        bool,
+        typer.Option("--clear", help="Drop all cached templates"),
+    ] = False,
+) -> None:
+    """
+    List cached database templates, most recently used first
+    """
+    try:
+        stack = Stack.from_name(name=stack_name)
+        odoo_service = stack.get_service(name="odoo")
+        with stack.get_service(name="db").admin() as admin:
+            templates = odoo.templates.list_templates(admin=admin)
+            if clear:
+                for template in templates:
+                    logger.info(f"Dropping template {template.name} ...")
+                    odoo.templates.drop_template(
+                        odoo_service=odoo_service, admin=admin, name=template.name
+                    )
+                return
+    except exceptions.StackException as err:
+        logger.error(f"Failed to list {stack_name} templates !")
+        logger.error(err)
+        raise typer.Exit(code=1)
+    table = Table(title=f"{stack_name} templates")
+    table.add_column("Name")
+    table.add_column("Modules")
+    table.add_column("Size", justify="right")
+    table.add_column("Created")
+    table.add_column("Last used")
+    for template in templates:
+        table.add_row(
+            template.name,
+            ", ".join(template.modules),
+            misc.format_size(template.size),
+            f"{template.created.astimezone():%Y-%m-%d %H:%M}",
+            f"{template.last_used.astimezone():%Y-%m-%d %H:%M}",
+        )
+    Console().print(table)
+
+
+@cli.command()
+def neutralize(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    dbname: t.Annotated[str, typer.Argument(help="Database name")],
+) -> None:
+    """
+    Run post restore steps defined in stack config on a database
+    """
+    try:
+        stack = Stack.from_name(name=stack_name)
+        with stack.get_service(name="db").admin() as admin:
+            if not db.database_exists(admin=admin, dbname=dbname):
+                logger.error(f"Database {dbname} does not exists !")
+                raise typer.Abort()
+            run_post_restore(stack=stack, admin=admin, dbname=dbname)
+    except exceptions.StackException as err:
+        logger.error(f"Failed to neutralize {stack_name} {dbname} !")
+        logger.error(err)
+        raise typer.Exit(code=1)
+
+
+@cli.command()
+def ls(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+) -> None:
+    """
+    List Stack databases with their size
+    """
+    try:
+        stack = Stack.from_name(name=stack_name)
+        with stack.get_service(name="db").admin() as admin:
+            databases = db.list_databases(admin=admin)
+    except exceptions.StackException as err:
+        logger.error(f"Failed to list {stack_name} databases !")
+        logger.error(err)
+        raise typer.Exit(code=1)
+    table = Table(title=f"{stack_name} databases")
+    table.add_column("Name")
+    table.add_column("Owner")
+    table.add_column("Size", justify="right")
+    for database in databases:
+        table.add_row(database.name, database.owner, misc.format_size(database.size))
+    Console().print(table)
+
+
 @cli.callback()
 def callback() -> None:
     """
@@ -0,0 +1,112 @@
+import typing as t
+
+import typer
+from loguru import logger
+from pydantic import ValidationError
+from rich.console import Console
+from rich.table import Table
+
+from odooghost import config, exceptions
+from odooghost.stack import Stack
+from odooghost.utils.autocomplete import ac_stacks_lists
+
+cli = typer.Typer(no_args_is_help=True)
+
+
+@cli.command()
+def set(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    service_name: t.Annotated[str, typer.Argument(help="Service name")],
+    cpus: t.Annotated[
+        t.Optional[float], typer.Option("--cpus", help="CPUs, ie. 1.5")
+    ] = None,
+    memory: t.Annotated[
+        t.Optional[str], typer.Option("--memory", help="Memory limit, ie. 2g")
+    ] = None,
+    memory_reservation: t.Annotated[
+        t.Optional[str],
+        typer.Option("--memory-reservation", help="Memory soft limit"),
+    ] = None,
+    memory_swap: t.Annotated[
+        t.Optional[str],
+        typer.Option("--memory-swap", help="Memory plus swap limit, -1 for unlimited"),
+    ] = None,
+    pids: t.Annotated[
+        t.Optional[int], typer.Option("--pids", help="Maximum number of processes")
+    ] = None,
+    blkio_weight: t.Annotated[
+        t.Optional[int],
+        typer.Option("--blkio-weight", help="Relative block IO weight, 10 to 1000"),
+    ] = None,
+) -> None:
+    """
+    Set service resources, applied live on its container and saved in Stack config
+    """
+    values = dict(
+        cpus=cpus,
+        memory=memory,
+        memory_reservation=memory_reservation,
+        memory_swap=memory_swap,
+        pids=pids,
+        blkio_weight=blkio_weight,
+    )
+    try:
+        stack = Stack.from_name(name=stack_name)
+        service = stack.get_service(name=service_name)
+        current = service.config.resources or config.ResourcesConfig()
+        resources = config.ResourcesConfig(
+            **{
+                **current.model_dump(),
+                **{key: value for key, value in values.items() if value is not None},
+            }
+        )
+        stack.update_resources(service_name=service_name, resources=resources)
+    except ValidationError as err:
+        logger.error(f"Invalid resources:\n {err}")
+        raise typer.Exit(code=1)
+    except exceptions.StackException as err:
+        logger.error(f"Failed to set {stack_name} {service_name} resources: {err}")
+        raise typer.Exit(code=1)
+    logger.info(f"Updated {stack_name} {service_name} resources !")
+
+
+@cli.command()
+def ls(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+) -> None:
+    """
+    List Stack services resources
+    """
+    try:
+        stack = Stack.from_name(name=stack_name)
+    except exceptions.StackException as err:
+        logger.error(f"Failed to list {stack_name} resources: {err}")
+        raise typer.Exit(code=1)
+    fields = list(config.ResourcesConfig.model_fields)
+    table = Table(title=f"{stack_name} resources")
+    table.add_column("Service")
+    for field in fields:
+        table.add_column(field.replace("_", " ").capitalize(), justify="right")
+    for service in stack.services():
+        resources = service.config.resources or config.ResourcesConfig()
+        table.add_row(
+            service.name,
+            *(
+                str(value) if (value := getattr(resources, field)) is not None else "-"
+                for field in fields
+            ),
+        )
+    Console().print(table)
+
+
+@cli.callback()
+def callback() -> None:
+    """
+    Resources subcommands allow you to manage Stack services resources
+    """
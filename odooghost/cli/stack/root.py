@@ -1,3 +1,6 @@
+import asyncio
+import shlex
+import statistics
 import sys
 import typing as t
 import webbrowser
@@ -5,10 +8,19 @@ from pathlib import Path
 
 import typer
 from loguru import logger
+from pydantic import ValidationError
+from rich.console import Console
+from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+from rich.table import Table
 
-from odooghost import constant, exceptions
+from odooghost import constant, exceptions, metrics
+from odooghost.config import BenchConfig
+from odooghost.context import ctx
+from odooghost.services.odoo import bench as odoo_bench
+from odooghost.services.odoo import modules as odoo_modules
+from odooghost.services.odoo import profiling, testing
 from odooghost.stack import Stack
-from odooghost.utils import signals
+from odooghost.utils import misc, signals
 from odooghost.utils.autocomplete import (
     ac_stack_configs,
     ac_stacks_lists,
@@ -17,6 +29,8 @@ from odooghost.utils.autocomplete import (
 
 from .config import cli as configCLI
 from .data import cli as dataCLI
+from .resources import cli as resourcesCLI
+from .stats import cli as statsCLI
 
 if not constant.IS_WINDOWS_PLATFORM:
     from dockerpty.pty import PseudoTerminal, RunOperation
@@ -25,6 +39,8 @@ if not constant.IS_WINDOWS_PLATFORM:
 cli = typer.Typer(no_args_is_help=True)
 cli.add_typer(configCLI, name="config", help="Manage Stack config")
 cli.add_typer(dataCLI, name="data", help="Manage Stack data")
+cli.add_typer(resourcesCLI, name="resources", help="Manage Stack services resources")
+cli.add_typer(statsCLI, name="stats", help="Analyze Stack performance")
 
 
 @cli.command()
@@ -161,17 +177,34 @@ def start(
         int,
         typer.Option("--tail", help="Number of lines to show from the end of the logs"),
     ] = 1,
+    wait: t.Annotated[
+        bool,
+        typer.Option("--wait", help="Wait for services to be ready"),
+    ] = False,
+    timeout: t.Annotated[
+        int,
+        typer.Option("--timeout", help="Services ready timeout in seconds"),
+    ] = 300,
 ) -> None:
     """
     Start stack
     """
     try:
         stack = Stack.from_name(name=stack_name)
-        stack.start()
+        durations = stack.start(wait=wait, timeout=timeout)
+        if durations:
+            table = Table(title=f"{stack_name} time to ready")
+            table.add_column("Service")
+            table.add_column("Duration", justify="right")
+            for service_name, duration in durations.items():
+                table.add_row(service_name, f"{duration:.3f}s")
+            Console().print(table)
+        stack.get_service(name="db").ensure_base_backup()
         odoo = stack.get_service(name="odoo").get_container()
         if open:
+            http = stack.get_http_container()
             webbrowser.open(
-                f"http://{odoo.get_subnet_port(8069) if open_mode == constant.OpenMode.subnet else odoo.get_local_port(8069)}"
+                f"http://{http.get_subnet_port(8069) if open_mode == constant.OpenMode.subnet else http.get_local_port(8069)}"
             )
         if not detach:
             while True:
@@ -381,6 +414,8 @@ def run(
             for service in stack.services()
             if service.name != one_off_service.name
         ]
+        for service in stack.services():
+            service.prepare_start()
         for service in service_deps:
             service.start_container()
 
@@ -438,6 +473,643 @@ def run(
         raise typer.Exit(code=1)
 
 
+@cli.command()
+def scale(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    replicas: t.Annotated[int, typer.Argument(min=1, help="Odoo replicas count")],
+    timeout: t.Annotated[
+        int,
+        typer.Option("--timeout", help="New replicas ready timeout in seconds"),
+    ] = 300,
+) -> None:
+    """
+    Scale Odoo replicas behind the load balancer without restarting stack
+    """
+    try:
+        stack = Stack.from_name(name=stack_name)
+        if "lb" not in [service.name for service in stack.services()]:
+            logger.error(
+                f"Stack {stack_name} has no load balancer, set odoo replicas "
+                "or lb in Stack config and update Stack"
+            )
+            raise typer.Abort()
+        stack.scale(replicas=replicas, timeout=timeout)
+    except exceptions.StackException as err:
+        logger.error(f"Failed to scale stack {stack_name}: {err}")
+        raise typer.Exit(code=1)
+    logger.info(f"Scaled {stack_name} Odoo to {replicas} replicas !")
+
+
+@cli.command()
+def sync_addons(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    jobs: t.Annotated[
+        int,
+        typer.Option("-j", "--jobs", help="Concurrent hashing threads"),
+    ] = 4,
+    restart: t.Annotated[
+        bool,
+        typer.Option("--restart/--no-restart", help="Restart changed Odoo containers"),
+    ] = True,
+    dry_run: t.Annotated[
+        bool,
+        typer.Option("--dry-run", help="Only show what would be transfered"),
+    ] = False,
+) -> None:
+    """
+    Push copy mode addons changes in running Odoo without rebuilding image
+    """
+    try:
+        stack = Stack.from_name(name=stack_name)
+        report, containers = stack.sync_addons(
+            jobs=jobs, dry_run=dry_run, restart=restart
+        )
+    except exceptions.StackException as err:
+        logger.error(f"Failed to sync {stack_name} addons: {err}")
+        raise typer.Exit(code=1)
+    logger.info(
+        f"{'Would transfer' if dry_run else 'Transfered'} {report.transfered} files "
+        f"({misc.format_size(report.size)}), {report.deleted} deleted"
+        f" in {len(containers)} containers"
+    )
+
+
+@cli.command()
+def test(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    modules: t.Annotated[
+        t.List[str],
+        typer.Argument(..., help="Modules to test, space or comma separated"),
+    ],
+    shards: t.Annotated[
+        int,
+        typer.Option("-j", "--shards", help="Parallel shards, 0 for docker host cpus"),
+    ] = 0,
+    output: t.Annotated[
+        Path,
+        typer.Option(
+            "-o",
+            "--output",
+            file_okay=False,
+            dir_okay=True,
+            resolve_path=True,
+            help="Shards logs, JUnit and coverage reports folder",
+        ),
+    ] = Path("test-reports"),
+    coverage: t.Annotated[
+        bool,
+        typer.Option(
+            "--coverage", help="Measure coverage, coverage must be in Odoo image"
+        ),
+    ] = False,
+    odoo_args: t.Annotated[
+        t.Optional[str],
+        typer.Option("--odoo-args", help="Additional odoo-bin arguments"),
+    ] = None,
+) -> None:
+    """
+    Run modules tests in parallel shards on clones of a template database
+    """
+    modules = [module for arg in modules for module in arg.split(",") if module.strip()]
+    try:
+        stack = Stack.from_name(name=stack_name)
+        stack.start_dependencies()
+        report = testing.run_tests(
+            odoo_service=stack.get_service(name="odoo"),
+            db_service=stack.get_service(name="db"),
+            modules=modules,
+            durations=metrics.get_test_durations(stack_name=stack_name),
+            output=output,
+            shards=shards or ctx.docker.info()["NCPU"],
+            coverage=coverage,
+            odoo_args=shlex.split(odoo_args or ""),
+        )
+    except exceptions.StackException as err:
+        logger.error(f"Failed to test stack {stack_name}: {err}")
+        raise typer.Exit(code=1)
+    durations = {
+        module.module: module.duration
+        for module in report.modules
+        if module.duration is not None
+    }
+    for shard in report.shards:
+        # spread shard duration when Odoo did not log modules stats
+        if not any(module in durations for module in shard.modules):
+            durations.update(
+                {
+                    module: shard.duration / len(shard.modules)
+                    for module in shard.modules
+                }
+            )
+    metrics.record_test_durations(stack_name=stack_name, durations=durations)
+
+    table = Table(title=f"{stack_name} tests")
+    table.add_column("Module")
+    table.add_column("Shard", justify="right")
+    table.add_column("Tests", justify="right")
+    table.add_column("Duration", justify="right")
+    table.add_column("Failures", justify="right")
+    for module in sorted(report.modules, key=lambda module: module.module):
+        table.add_row(
+            module.module,
+            str(module.shard),
+            str(module.tests),
+            f"{module.duration:.3f}s" if module.duration is not None else "-",
+            str(len(module.failures)),
+        )
+    Console().print(table)
+    for shard in report.shards:
+        if shard.exit_code != 0 or shard.errors:
+            logger.error(
+                f"Shard {shard.index} exited with code {shard.exit_code} "
+                f"and {len(shard.errors)} errors, see {output}/shard_{shard.index}.log"
+            )
+    logger.info(
+        f"Template ready in {report.template_duration:.1f}s, "
+        f"shards done in {max(shard.duration for shard in report.shards):.1f}s, "
+        f"reports written in {output}"
+    )
+    if report.failed:
+        raise typer.Exit(code=1)
+
+
+@cli.command()
+def pool_stats(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+) -> None:
+    """
+    Print stack PgBouncer pools statistics
+    """
+    try:
+        stack = Stack.from_name(name=stack_name)
+        pools = stack.get_service(name="pgbouncer").pool_stats()
+    except exceptions.StackException as err:
+        logger.error(f"Failed to get stack {stack_name} pool stats: {err}")
+        raise typer.Exit(code=1)
+    if not pools:
+        logger.warning("No pool to show !")
+        return
+    table = Table(title=f"{stack_name} pools")
+    for column in pools[0].keys():
+        table.add_column(column)
+    for pool in pools:
+        table.add_row(*(value or "" for value in pool.values()))
+    Console().print(table)
+
+
+@cli.command()
+def upgrade(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    dbname: t.Annotated[str, typer.Argument(help="Database name")],
+    modules: t.Annotated[
+        t.Optional[t.List[str]],
+        typer.Argument(help="Modules to upgrade, space or comma separated"),
+    ] = None,
+    changed: t.Annotated[
+        bool,
+        typer.Option(
+            "--changed", help="Upgrade modules changed in addons git repositories"
+        ),
+    ] = False,
+    since: t.Annotated[
+        t.Optional[str],
+        typer.Option(
+            "--since",
+            help="Git ref compared by --changed, defaults to last upgraded revisions",
+        ),
+    ] = None,
+    install: t.Annotated[
+        bool, typer.Option("-i", "--install", help="Install instead of upgrade")
+    ] = False,
+    top: t.Annotated[
+        int, typer.Option("-n", "--top", help="Number of slowest steps to show")
+    ] = 20,
+    odoo_args: t.Annotated[
+        t.Optional[str],
+        typer.Option("--odoo-args", help="Additional odoo-bin arguments"),
+    ] = None,
+) -> None:
+    """
+    Install or upgrade modules with a per module timing report
+    """
+    modules = [
+        module for arg in modules or [] for module in arg.split(",") if module.strip()
+    ]
+    try:
+        stack = Stack.from_name(name=stack_name)
+        odoo_service = stack.get_service(name="odoo")
+        if changed:
+            last_upgrade = metrics.get_last_upgrade(
+                stack_name=stack_name, dbname=dbname
+            )
+            if since is None and last_upgrade is None:
+                logger.error(f"No upgrade of {dbname} recorded, use --since !")
+                raise typer.Abort()
+            changed_modules = odoo_service.addons.get_changed_modules(
+                since=since or last_upgrade.heads
+            )
+            logger.info(f"Changed modules: {', '.join(changed_modules) or 'none'}")
+            modules = sorted({*modules, *changed_modules})
+        if not modules:
+            logger.info("Nothing to upgrade !")
+            return
+
+        stack.start_dependencies()
+        running = odoo_service.get_replicas(stopped=False)
+        if "gevent" in [service.name for service in stack.services()]:
+            gevent_container = stack.get_service(name="gevent").get_container()
+            if gevent_container.is_running:
+                running.append(gevent_container)
+        if running:
+            logger.info("Stopping Odoo during upgrade ...")
+            for odoo_container in running:
+                odoo_container.stop()
+        heads = odoo_service.addons.get_heads()
+        try:
+            with Progress(
+                SpinnerColumn(), TextColumn("{task.description}"), TimeElapsedColumn()
+            ) as progress:
+                task = progress.add_task("Starting Odoo ...")
+                report, log = odoo_modules.run_upgrade(
+                    odoo_service=odoo_service,
+                    dbname=dbname,
+                    modules=modules,
+                    install=install,
+                    odoo_args=shlex.split(odoo_args or ""),
+                    on_module=lambda module: progress.update(
+                        task, description=f"Loading {module} ..."
+                    ),
+                )
+        finally:
+            for odoo_container in running:
+                odoo_container.start()
+    except exceptions.StackException as err:
+        logger.error(f"Failed to upgrade {dbname} in {stack_name}: {err}")
+        raise typer.Exit(code=1)
+
+    table = Table(title=f"{dbname} slowest modules")
+    table.add_column("Module")
+    table.add_column("Duration", justify="right")
+    table.add_column("Data files", justify="right")
+    table.add_column("Migrations", justify="right")
+    for step in report.get_slowest(limit=top, kinds=("module",)):
+        table.add_row(
+            step.module,
+            f"{step.duration:.3f}s",
+            *(
+                str(
+                    sum(
+                        other.kind == kind and other.module == step.module
+                        for other in report.steps
+                    )
+                )
+                for kind in ("data", "migration")
+            ),
+        )
+    Console().print(table)
+    table = Table(title=f"{dbname} slowest steps")
+    table.add_column("Kind")
+    table.add_column("Module")
+    table.add_column("Step")
+    table.add_column("Duration", justify="right")
+    for step in report.get_slowest(limit=top, kinds=("data", "migration", "registry")):
+        table.add_row(step.kind, step.module or "-", step.name, f"{step.duration:.3f}s")
+    Console().print(table)
+
+    if report.exit_code != 0:
+        logger.error(
+            f"Odoo exited with code {report.exit_code}:\n"
+            + "\n".join(log.splitlines()[-20:])
+        )
+        raise typer.Exit(code=1)
+    metrics.record_upgrade(
+        stack_name=stack_name,
+        dbname=dbname,
+        modules=modules,
+        duration=report.duration,
+        heads=heads,
+    )
+    logger.info(f"Upgraded {len(modules)} modules in {report.duration:.1f}s !")
+
+
+@cli.command()
+def profile(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    duration: t.Annotated[
+        int, typer.Option("-d", "--duration", help="Sampling seconds")
+    ] = 30,
+    rate: t.Annotated[int, typer.Option("--rate", help="Samples per second")] = 100,
+    output: t.Annotated[
+        t.Optional[Path],
+        typer.Option(
+            "-o",
+            "--output",
+            dir_okay=False,
+            resolve_path=True,
+            help="Collapsed stacks file, defaults to <stack>_<date>.folded",
+        ),
+    ] = None,
+    top: t.Annotated[
+        int, typer.Option("-n", "--top", help="Number of functions to show")
+    ] = 20,
+    idle: t.Annotated[
+        bool, typer.Option("--idle", help="Include idle threads")
+    ] = False,
+    native: t.Annotated[
+        bool, typer.Option("--native", help="Include native frames")
+    ] = False,
+) -> None:
+    """
+    Sample running Odoo processes with py-spy, requires odoo profiling in Stack config
+    """
+    output = output or Path(f"{stack_name}_{misc.get_now()}.folded").resolve()
+    try:
+        stack = Stack.from_name(name=stack_name)
+        container = stack.get_service(name="odoo").get_container()
+        if not container.is_running:
+            logger.error(f"Stack {stack_name} Odoo is not running !")
+            raise typer.Abort()
+        folded = profiling.record_profile(
+            container=container,
+            dest=output,
+            duration=duration,
+            rate=rate,
+            idle=idle,
+            native=native,
+        )
+    except exceptions.StackException as err:
+        logger.error(f"Failed to profile stack {stack_name}: {err}")
+        raise typer.Exit(code=1)
+    report = profiling.summarize(folded=folded, limit=top)
+    if not report.samples:
+        logger.warning("No sample recorded, Odoo was idle !")
+        return
+    table = Table(title=f"{stack_name} top functions ({report.samples} samples)")
+    table.add_column("Function")
+    table.add_column("Own", justify="right")
+    table.add_column("Total", justify="right")
+    for function in report.functions:
+        table.add_row(
+            function.name,
+            f"{100 * function.own / report.samples:.1f}%",
+            f"{100 * function.total / report.samples:.1f}%",
+        )
+    Console().print(table)
+    logger.info(f"Collapsed stacks written to {output}, render with flamegraph.pl")
+
+
+@cli.command()
+def bench(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    scenarios: t.Annotated[
+        Path,
+        typer.Argument(
+            exists=True,
+            dir_okay=False,
+            resolve_path=True,
+            help="Bench scenarios YAML file",
+        ),
+    ],
+    dbname: t.Annotated[
+        t.Optional[str],
+        typer.Option("--db", help="Database name, overrides scenarios file db"),
+    ] = None,
+    concurrency: t.Annotated[
+        int, typer.Option("-c", "--concurrency", help="Concurrent clients")
+    ] = 10,
+    duration: t.Annotated[
+        int, typer.Option("-d", "--duration", help="Bench seconds")
+    ] = 30,
+    rate: t.Annotated[
+        t.Optional[float],
+        typer.Option("--rate", help="Maximum requests per second"),
+    ] = None,
+    mode: t.Annotated[
+        constant.OpenMode,
+        typer.Option("--mode", help="Reach Odoo on local port or subnet"),
+    ] = (
+        constant.OpenMode.subnet
+        if constant.IS_LINUX_PLATFORM
+        else constant.OpenMode.local
+    ),
+    save: t.Annotated[
+        t.Optional[str],
+        typer.Option("--save", help="Save report with this name"),
+    ] = None,
+    compare: t.Annotated[
+        t.Optional[str],
+        typer.Option("--compare", help="Compare to a saved report"),
+    ] = None,
+) -> None:
+    """
+    Load test Stack Odoo by replaying JSON-RPC, page and report scenarios
+    """
+    try:
+        bench_config = BenchConfig.from_file(file_path=scenarios)
+    except ValidationError as err:
+        logger.error(f"Invalid bench scenarios: {err}")
+        raise typer.Exit(code=1)
+    dbname = dbname or bench_config.db
+    if not dbname:
+        logger.error("Database name must be set in scenarios file or with --db !")
+        raise typer.Abort()
+    baseline = None
+    if compare:
+        try:
+            baseline = odoo_bench.load_report(
+                metrics.get_bench_path(stack_name=stack_name, name=compare)
+            )
+        except FileNotFoundError:
+            logger.error(f"Bench report {compare} not found !")
+            raise typer.Exit(code=1)
+    try:
+        container = Stack.from_name(name=stack_name).get_http_container()
+        if not container.is_running:
+            logger.error(f"Stack {stack_name} Odoo is not running !")
+            raise typer.Abort()
+        address = (
+            container.get_subnet_port(8069)
+            if mode == constant.OpenMode.subnet
+            else container.get_local_port(8069)
+        )
+        if address is None:
+            logger.error(f"Stack {stack_name} Odoo is not reachable in {mode} mode !")
+            raise typer.Abort()
+        host, _, port = address.rpartition(":")
+        with Progress(
+            SpinnerColumn(), TextColumn("{task.description}"), TimeElapsedColumn()
+        ) as progress:
+            progress.add_task(f"Benchmarking {address} with {concurrency} clients ...")
+            report = asyncio.run(
+                odoo_bench.run_bench(
+                    host=host,
+                    port=int(port),
+                    bench_config=bench_config,
+                    dbname=dbname,
+                    concurrency=concurrency,
+                    duration=duration,
+                    rate=rate,
+                )
+            )
+    except exceptions.StackException as err:
+        logger.error(f"Failed to bench stack {stack_name}: {err}")
+        raise typer.Exit(code=1)
+
+    baselines = (
+        {summary.name: summary for summary in (baseline.total, *baseline.scenarios)}
+        if baseline
+        else {}
+    )
+    table = Table(title=f"{stack_name} bench ({report.duration:.0f}s)")
+    table.add_column("Scenario")
+    table.add_column("Requests", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("Req/s", justify="right")
+    for quantile in odoo_bench.QUANTILES:
+        table.add_column(f"p{int(quantile * 100)}", justify="right")
+    if baseline:
+        table.add_column(f"Req/s vs {compare}", justify="right")
+        table.add_column(f"p95 vs {compare}", justify="right")
+    for summary in (*report.scenarios, report.total):
+        row = [
+            summary.name,
+            str(summary.requests),
+            f"{100 * summary.error_rate:.1f}%",
+            f"{summary.throughput:.1f}",
+            *(f"{value * 1000:.0f}ms" for value in summary.percentiles.values()),
+        ]
+        if baseline:
+            previous = baselines.get(summary.name)
+            row += (
+                [
+                    misc.format_change(previous.throughput, summary.throughput),
+                    misc.format_change(
+                        previous.percentiles["p95"], summary.percentiles["p95"]
+                    ),
+                ]
+                if previous
+                else ["-", "-"]
+            )
+        table.add_row(*row, end_section=summary is report.scenarios[-1])
+    Console().print(table)
+    if save:
+        odoo_bench.save_report(
+            metrics.get_bench_path(stack_name=stack_name, name=save), report
+        )
+        logger.info(f"Saved bench report {save} !")
+
+
+@cli.command()
+def db_upgrade(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    version: t.Annotated[int, typer.Argument(help="New postgres major version")],
+    jobs: t.Annotated[
+        int,
+        typer.Option("-j", "--jobs", help="pg_upgrade and analyze jobs"),
+    ] = 4,
+    yes: t.Annotated[
+        bool, typer.Option("--yes", "-y", help="Do not ask for confirmation")
+    ] = False,
+) -> None:
+    """
+    Upgrade stack database cluster to a new postgres major version in place
+    """
+    if not yes:
+        typer.confirm(
+            f"Stack {stack_name} will be stopped during upgrade, "
+            "backup your data first. Continue ?",
+            abort=True,
+        )
+    try:
+        stack = Stack.from_name(name=stack_name)
+        reports = stack.upgrade_database(version=version, jobs=jobs)
+    except exceptions.StackException as err:
+        logger.error(f"Failed to upgrade stack {stack_name} database: {err}")
+        raise typer.Exit(code=1)
+    table = Table(title=f"{stack_name} database upgrade")
+    table.add_column("Phase")
+    table.add_column("Duration", justify="right")
+    table.add_column("Exit code", justify="right")
+    for report in reports:
+        table.add_row(report.name, f"{report.duration:.3f}s", str(report.exit_code))
+    Console().print(table)
+    logger.info(f"Upgraded stack {stack_name} database to version {version} !")
+
+
+@cli.command()
+def boot_times(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    last: t.Annotated[
+        int, typer.Option("--last", "-n", help="Number of boots to show")
+    ] = 10,
+) -> None:
+    """
+    Print stack services time to ready recorded by start --wait
+    """
+    records = metrics.list_boots(stack_name=stack_name, limit=last)
+    if not records:
+        logger.warning("No boot recorded, use start --wait !")
+        return
+    services = sorted({name for record in records for name in record.durations})
+    table = Table(title=f"{stack_name} time to ready")
+    table.add_column("Date")
+    for service_name in services:
+        table.add_column(service_name, justify="right")
+    for record in records:
+        table.add_row(
+            record.date.astimezone().strftime("%Y-%m-%d %H:%M:%S"),
+            *(
+                f"{record.durations[name]:.3f}s" if name in record.durations else "-"
+                for name in services
+            ),
+        )
+    table.add_section()
+    for label, func in (("min", min), ("avg", statistics.mean), ("max", max)):
+        table.add_row(
+            label,
+            *(
+                f"{func(values):.3f}s"
+                if (
+                    values := [
+                        record.durations[name]
+                        for record in records
+                        if name in record.durations
+                    ]
+                )
+                else "-"
+                for name in services
+            ),
+        )
+    Console().print(table)
+
+
 @cli.command()
 def ls() -> None:
     """
@@ -0,0 +1,228 @@
+import time
+import typing as t
+from datetime import datetime, timedelta, timezone
+
+import typer
+from loguru import logger
+from rich.console import Console
+from rich.live import Live
+from rich.table import Table
+
+from odooghost import exceptions, metrics
+from odooghost.services import db
+from odooghost.services.odoo import http_stats
+from odooghost.stack import Stack
+from odooghost.utils import misc
+from odooghost.utils.autocomplete import ac_stacks_lists
+
+cli = typer.Typer(no_args_is_help=True)
+
+
+def get_http_table(
+    title: str,
+    stats: http_stats.HttpStats,
+    sort: http_stats.SortKey = http_stats.SortKey.latency,
+    top: int = 20,
+) -> Table:
+    table = Table(title=f"{title} ({stats.requests} requests)")
+    table.add_column("Route")
+    table.add_column("Count", justify="right")
+    table.add_column("5xx", justify="right")
+    for name in ("Latency", "SQL count", "SQL time"):
+        for quantile in http_stats.QUANTILES:
+            table.add_column(f"{name} p{int(quantile * 100)}", justify="right")
+    for route in stats.top(sort=sort, limit=top):
+        table.add_row(
+            f"{route.method} {route.route}",
+            str(route.count),
+            str(route.errors),
+            *(
+                f"{route.latency.quantile(quantile) * 1000:.0f}ms"
+                for quantile in http_stats.QUANTILES
+            ),
+            *(
+                f"{route.sql_count.quantile(quantile):.0f}"
+                for quantile in http_stats.QUANTILES
+            ),
+            *(
+                f"{route.sql_time.quantile(quantile) * 1000:.0f}ms"
+                for quantile in http_stats.QUANTILES
+            ),
+        )
+    return table
+
+
+@cli.command()
+def http(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    since: t.Annotated[
+        str,
+        typer.Option("--since", help="Window of logs analyzed, ie. 30s, 15m or 2h"),
+    ] = "1h",
+    follow: t.Annotated[
+        bool,
+        typer.Option("-f", "--follow", help="Analyze new requests as they arrive"),
+    ] = False,
+    sort: t.Annotated[
+        http_stats.SortKey,
+        typer.Option("--sort", help="Sort routes by count or p95"),
+    ] = http_stats.SortKey.latency,
+    top: t.Annotated[
+        int, typer.Option("-n", "--top", help="Number of routes to show")
+    ] = 20,
+) -> None:
+    """
+    Per route latency, SQL count and SQL time percentiles from Odoo access logs
+    """
+    try:
+        window = misc.parse_duration(since)
+    except ValueError:
+        logger.error(f"Invalid duration {since} !")
+        raise typer.Exit(code=1)
+    start = datetime.now(timezone.utc) - timedelta(seconds=window)
+    try:
+        container = Stack.from_name(name=stack_name).get_service("odoo").get_container()
+        if not follow:
+            stats = http_stats.collect(container=container, since=start)
+            if not stats.requests:
+                logger.warning(
+                    "No request with perf info found, Odoo must log werkzeug at info level"
+                )
+                return
+            Console().print(
+                get_http_table(
+                    title=f"{stack_name} last {since}", stats=stats, sort=sort, top=top
+                )
+            )
+            return
+        stats = http_stats.HttpStats()
+        refreshed = 0.0
+        with Live(
+            get_http_table(title=stack_name, stats=stats, sort=sort, top=top)
+        ) as live:
+            for line in http_stats.iter_lines(
+                container=container, since=start, follow=True
+            ):
+                if stats.feed(line) is None or time.monotonic() - refreshed < 1:
+                    continue
+                live.update(
+                    get_http_table(title=stack_name, stats=stats, sort=sort, top=top)
+                )
+                refreshed = time.monotonic()
+    except exceptions.StackException as err:
+        logger.error(f"Failed to get {stack_name} http stats: {err}")
+        raise typer.Exit(code=1)
+    except KeyboardInterrupt:
+        pass
+
+
+@cli.command()
+def sql(
+    stack_name: t.Annotated[
+        str,
+        typer.Argument(..., help="Stack name", autocompletion=ac_stacks_lists),
+    ],
+    dbname: t.Annotated[str, typer.Argument(help="Database name")],
+    sort: t.Annotated[
+        db.statements.SortKey,
+        typer.Option("--sort", help="Sort statements by total time, mean or calls"),
+    ] = db.statements.SortKey.total,
+    top: t.Annotated[
+        int, typer.Option("-n", "--top", help="Number of statements to show")
+    ] = 20,
+    save: t.Annotated[
+        t.Optional[str],
+        typer.Option("--save", help="Save current statistics as a named snapshot"),
+    ] = None,
+    diff: t.Annotated[
+        t.Optional[str],
+        typer.Option("--diff", help="Show statistics accumulated since snapshot"),
+    ] = None,
+    against: t.Annotated[
+        t.Optional[str],
+        typer.Option("--against", help="Compare --diff snapshot to this snapshot"),
+    ] = None,
+    reset: t.Annotated[
+        bool, typer.Option("--reset", help="Reset statistics of all databases")
+    ] = False,
+) -> None:
+    """
+    Top SQL statements of a database from pg_stat_statements
+    """
+    try:
+        stack = Stack.from_name(name=stack_name)
+        db_service = t.cast("db.DbService", stack.get_service(name="db"))
+        if db_service.config.statements is None:
+            logger.error(
+                "Statements statistics are not enabled, set db statements "
+                "in Stack config and update Stack"
+            )
+            raise typer.Abort()
+        with db_service.admin() as admin:
+            if reset:
+                db.statements.reset(admin=admin)
+                logger.info("Statements statistics reset !")
+                return
+            statements = (
+                db.statements.load_snapshot(
+                    metrics.get_sql_snapshot_path(
+                        stack_name=stack_name, dbname=dbname, name=against
+                    )
+                )
+                if against
+                else db.statements.get_statements(
+                    admin=admin, dbname=dbname, version=db_service.config.version
+                )
+            )
+    except FileNotFoundError as err:
+        logger.error(f"Snapshot not found: {err.filename}")
+        raise typer.Exit(code=1)
+    except exceptions.StackException as err:
+        logger.error(f"Failed to get {stack_name} {dbname} statements: {err}")
+        raise typer.Exit(code=1)
+    if save:
+        path = metrics.get_sql_snapshot_path(
+            stack_name=stack_name, dbname=dbname, name=save
+        )
+        db.statements.save_snapshot(path=path, statements=statements)
+        logger.info(f"Saved snapshot {save} !")
+    title = f"{dbname} statements"
+    if diff:
+        try:
+            statements = db.statements.diff(
+                before=db.statements.load_snapshot(
+                    metrics.get_sql_snapshot_path(
+                        stack_name=stack_name, dbname=dbname, name=diff
+                    )
+                ),
+                after=statements,
+            )
+        except FileNotFoundError as err:
+            logger.error(f"Snapshot not found: {err.filename}")
+            raise typer.Exit(code=1)
+        title += f" since {diff}"
+    table = Table(title=title)
+    table.add_column("Statement", overflow="fold")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total", justify="right")
+    table.add_column("Mean", justify="right")
+    table.add_column("Rows", justify="right")
+    for statement in db.statements.top(statements=statements, sort=sort, limit=top):
+        table.add_row(
+            statement.query,
+            str(statement.calls),
+            f"{statement.total_time:.0f}ms",
+            f"{statement.mean_time:.2f}ms",
+            str(statement.rows),
+        )
+    Console().print(table)
+
+
+@cli.callback()
+def callback() -> None:
+    """
+    Stats subcommands allow you to analyze Stack performance
+    """
@@ -1,17 +1,34 @@
 from .app import ContextConfig
+from .bench import BenchConfig, BenchScenarioConfig
 from .service import (
+    GeventStackConfig,
+    LoadBalancerStackConfig,
     MailStackConfig,
     OdooStackConfig,
+    PgBouncerStackConfig,
     PostgresStackConfig,
+    ResourcesConfig,
     StackServiceConfig,
+    StatementsConfig,
+    TemplateCacheConfig,
+    WalArchiveConfig,
 )
 from .stack import StackConfig
 
 __all__ = (
     "ContextConfig",
+    "BenchConfig",
+    "BenchScenarioConfig",
     "StackConfig",
     "StackServiceConfig",
     "OdooStackConfig",
     "PostgresStackConfig",
     "MailStackConfig",
+    "PgBouncerStackConfig",
+    "LoadBalancerStackConfig",
+    "GeventStackConfig",
+    "ResourcesConfig",
+    "StatementsConfig",
+    "TemplateCacheConfig",
+    "WalArchiveConfig",
 )
@@ -0,0 +1,101 @@
+import typing as t
+from pathlib import Path
+
+import yaml
+from pydantic import BaseModel, Field, model_validator
+
+
+class BenchScenarioConfig(BaseModel):
+    """
+    Bench scenario config, a request replayed by bench clients
+    """
+
+    name: str
+    """
+    Scenario name
+    """
+    type: t.Literal["rpc", "page", "report"] = "rpc"
+    """
+    JSON-RPC call_kw, web page load or PDF report printing
+    """
+    weight: int = Field(default=1, ge=1)
+    """
+    Relative frequency of the scenario
+    """
+    model: t.Optional[str] = None
+    """
+    Model of rpc scenario, ie. res.partner
+    """
+    method: t.Optional[str] = None
+    """
+    Method of rpc scenario, ie. search_read
+    """
+    args: t.List[t.Any] = []
+    """
+    Positional arguments of rpc scenario
+    """
+    kwargs: t.Dict[str, t.Any] = {}
+    """
+    Keyword arguments of rpc scenario
+    """
+    path: t.Optional[str] = None
+    """
+    Path of page scenario, ie. /web/login
+    """
+    report: t.Optional[str] = None
+    """
+    Report name of report scenario, ie. account.report_invoice
+    """
+    ids: t.List[int] = []
+    """
+    Record ids printed by report scenario
+    """
+
+    @model_validator(mode="after")
+    def validate_scenario(self) -> "BenchScenarioConfig":
+        required = dict(rpc=("model", "method"), page=("path",), report=("report",))
+        missing = [name for name in required[self.type] if not getattr(self, name)]
+        if missing:
+            raise ValueError(
+                f"Scenario {self.name} of type {self.type} requires {', '.join(missing)}"
+            )
+        if self.type == "report" and not self.ids:
+            raise ValueError(f"Scenario {self.name} requires report ids")
+        return self
+
+
+class BenchConfig(BaseModel):
+    """
+    Bench config, scenarios replayed against a Stack
+    """
+
+    db: t.Optional[str] = None
+    """
+    Database logged in, defaults to Odoo single database
+    """
+    login: str = "admin"
+    """
+    User login
+    """
+    password: str = "admin"
+    """
+    User password
+    """
+    scenarios: t.List[BenchScenarioConfig] = Field(min_length=1)
+    """
+    Scenarios picked randomly according to their weight
+    """
+
+    @classmethod
+    def from_file(cls, file_path: Path) -> "BenchConfig":
+        """
+        Return a BenchConfig instance from YAML/JSON file
+
+        Args:
+            file_path (Path): file path
+
+        Returns:
+            BenchConfig: BenchConfig instance
+        """
+        with open(file_path.as_posix(), "r") as stream:
+            return cls(**(yaml.safe_load(stream=stream) or {}))
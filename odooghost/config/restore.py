@@ -0,0 +1,48 @@
+import typing as t
+
+from pydantic import BaseModel, model_validator
+
+BUILTIN_POST_RESTORE_STEPS: t.Tuple[str, ...] = (
+    "base_url",
+    "crons",
+    "mail_servers",
+    "payment_providers",
+    "database_uuid",
+    "anonymize_partners",
+)
+
+
+class PostRestoreStepConfig(BaseModel):
+    """
+    Post restore step config
+    A step is either a built-in step referenced by name or a custom SQL step
+    """
+
+    name: str
+    """
+    Step name, must be a built-in step when sql is not set
+    """
+    sql: t.Optional[str] = None
+    """
+    Custom SQL to run
+    """
+
+    @model_validator(mode="before")
+    @classmethod
+    def validate_shorthand(cls, values: t.Any) -> t.Any:
+        if isinstance(values, str):
+            return dict(name=values)
+        return values
+
+    @model_validator(mode="after")
+    def validate_step(self) -> "PostRestoreStepConfig":
+        if self.sql is None and self.name not in BUILTIN_POST_RESTORE_STEPS:
+            raise ValueError(
+                f"Unknown built-in post restore step {self.name}, "
+                f"available steps are {', '.join(BUILTIN_POST_RESTORE_STEPS)}"
+            )
+        return self
+
+    @property
+    def is_builtin(self) -> bool:
+        return self.sql is None
@@ -1,10 +1,96 @@
 import abc
 import typing as t
 
-from pydantic import BaseModel, field_validator
+from docker.errors import DockerException
+from docker.utils import parse_bytes
+from pydantic import BaseModel, field_validator, model_validator
 
 from . import addons as _addons
-from . import dependency
+from . import dependency, restore
+
+
+class ResourcesConfig(BaseModel):
+    """
+    Service container resources limits and reservations
+    """
+
+    cpus: t.Optional[float] = None
+    """
+    CPUs the container can use, ie. 1.5
+    """
+    memory: t.Optional[t.Union[int, str]] = None
+    """
+    Memory limit, in bytes or with unit, ie. 2g
+    """
+    memory_reservation: t.Optional[t.Union[int, str]] = None
+    """
+    Memory soft limit applied when host memory is low
+    """
+    memory_swap: t.Optional[t.Union[int, str]] = None
+    """
+    Memory plus swap limit, -1 for unlimited swap
+    """
+    pids: t.Optional[int] = None
+    """
+    Maximum number of processes
+    """
+    blkio_weight: t.Optional[int] = None
+    """
+    Relative block IO weight, between 10 and 1000
+    """
+
+    @field_validator("memory", "memory_reservation", "memory_swap")
+    @classmethod
+    def validate_memory(
+        cls, v: t.Optional[t.Union[int, str]]
+    ) -> t.Optional[t.Union[int, str]]:
+        """
+        Validate memory size
+
+        Raises:
+            ValueError: When memory size can not be parsed
+
+        Returns:
+            t.Optional[t.Union[int, str]]: memory size
+        """
+        if isinstance(v, str):
+            try:
+                parse_bytes(v)
+            except DockerException as err:
+                raise ValueError(str(err))
+        return v
+
+    @field_validator("cpus")
+    @classmethod
+    def validate_cpus(cls, v: t.Optional[float]) -> t.Optional[float]:
+        """
+        Validate CPUs
+
+        Raises:
+            ValueError: When CPUs is not positive
+
+        Returns:
+            t.Optional[float]: CPUs
+        """
+        if v is not None and v <= 0:
+            raise ValueError("CPUs must be positive")
+        return v
+
+    @field_validator("blkio_weight")
+    @classmethod
+    def validate_blkio_weight(cls, v: t.Optional[int]) -> t.Optional[int]:
+        """
+        Validate block IO weight
+
+        Raises:
+            ValueError: When weight is out of range
+
+        Returns:
+            t.Optional[int]: block IO weight
+        """
+        if v is not None and not 10 <= v <= 1000:
+            raise ValueError("Block IO weight must be between 10 and 1000")
+        return v
 
 
 class StackServiceConfig(BaseModel, abc.ABC):
@@ -16,6 +102,95 @@ class StackServiceConfig(BaseModel, abc.ABC):
     """
     Map local port to container sercice port
     """
+    resources: t.Optional[ResourcesConfig] = None
+    """
+    Container resources limits and reservations
+    """
+
+
+class WalArchiveConfig(BaseModel):
+    """
+    WAL archiving configuration, allows point in time recovery
+    """
+
+    archive_timeout: int = 60
+    """
+    Force WAL segment switch after this many seconds, bounds data loss on recovery
+    """
+    base_backup_interval: int = 24
+    """
+    Hours after which a new base backup is taken when stack starts
+    """
+    keep_base_backups: int = 2
+    """
+    Base backups kept, WAL files older than the oldest one are removed
+    """
+
+    @field_validator("archive_timeout", "base_backup_interval", "keep_base_backups")
+    @classmethod
+    def validate_positive(cls, v: int) -> int:
+        """
+        Validate durations and base backups count
+
+        Raises:
+            ValueError: When value is not positive
+
+        Returns:
+            int: value
+        """
+        if v < 1:
+            raise ValueError("Value must be positive")
+        return v
+
+
+class StatementsConfig(BaseModel):
+    """
+    SQL statements statistics with pg_stat_statements and slow statements logging
+    """
+
+    max: int = 5000
+    """
+    Maximum number of distinct statements tracked
+    """
+    log_min_duration: t.Optional[int] = 500
+    """
+    Log statements slower than this many milliseconds, null disables logging
+    """
+
+
+class TemplateCacheConfig(BaseModel):
+    """
+    Cache of databases with pre-installed modules used as templates,
+    least recently used ones are dropped beyond limits
+    """
+
+    max_count: int = 5
+    """
+    Maximum number of cached templates
+    """
+    max_size: t.Union[int, str] = "10g"
+    """
+    Maximum total size of cached templates, in bytes or with unit, ie. 10g
+    """
+
+    @field_validator("max_size")
+    @classmethod
+    def validate_max_size(cls, v: t.Union[int, str]) -> t.Union[int, str]:
+        """
+        Validate max size
+
+        Raises:
+            ValueError: When size can not be parsed
+
+        Returns:
+            t.Union[int, str]: max size
+        """
+        if isinstance(v, str):
+            try:
+                parse_bytes(v)
+            except DockerException as err:
+                raise ValueError(str(err))
+        return v
 
 
 class PostgresStackConfig(StackServiceConfig):
@@ -48,6 +223,59 @@ class PostgresStackConfig(StackServiceConfig):
     """
     Database user password
     """
+    post_restore: t.List[restore.PostRestoreStepConfig] = [
+        restore.PostRestoreStepConfig(name="base_url")
+    ]
+    """
+    Steps run in one transaction after a database restore
+    """
+    max_connections: int = 100
+    """
+    Maximum concurrent connections, applied to local database and used to
+    size Odoo connection pools
+    """
+    wal_archive: t.Optional[WalArchiveConfig] = None
+    """
+    Archive WAL in a local volume (only availible in local type)
+    """
+    template_cache: TemplateCacheConfig = TemplateCacheConfig()
+    """
+    Pre-installed databases templates cache limits
+    """
+    statements: t.Optional[StatementsConfig] = None
+    """
+    Collect SQL statements statistics (only availible in local type)
+    """
+
+    @model_validator(mode="after")
+    def validate_wal_archive(self) -> "PostgresStackConfig":
+        """
+        Validate WAL archiving is used with a supported local database
+
+        Raises:
+            ValueError: When WAL archiving is not supported
+
+        Returns:
+            PostgresStackConfig: config
+        """
+        if self.wal_archive is not None and (self.type != "local" or self.version < 10):
+            raise ValueError("WAL archiving requires a local database version >= 10")
+        return self
+
+    @model_validator(mode="after")
+    def validate_statements(self) -> "PostgresStackConfig":
+        """
+        Validate statements statistics are used with a local database
+
+        Raises:
+            ValueError: When statements statistics are not supported
+
+        Returns:
+            PostgresStackConfig: config
+        """
+        if self.statements is not None and self.type != "local":
+            raise ValueError("Statements statistics require a local database")
+        return self
 
 
 class OdooStackConfig(StackServiceConfig):
@@ -63,6 +291,15 @@ class OdooStackConfig(StackServiceConfig):
     """
     Odoo-bin cmdline
     """
+    tuning: t.Optional[t.Literal["auto"]] = None
+    """
+    Compute workers, memory limits and connection pool size from host
+    resources, options set in cmdline or options take precedence
+    """
+    options: t.Dict[str, t.Any] = {}
+    """
+    Options written in odoo.conf, applied on restart, cmdline takes precedence
+    """
     addons: t.List[_addons.AddonsConfig] = []
     """
     Odoo addons configurations
@@ -71,6 +308,14 @@ class OdooStackConfig(StackServiceConfig):
     """
     Odoo dependencies configurations
     """
+    profiling: bool = False
+    """
+    Install py-spy in image and allow it to trace Odoo, required by stack profile
+    """
+    replicas: int = 1
+    """
+    Number of Odoo containers sharing the filestore, served behind the load balancer
+    """
 
     @field_validator("version")
     @classmethod
@@ -88,11 +333,72 @@ class OdooStackConfig(StackServiceConfig):
             raise ValueError(f"Unsuported Odoo version {v}")
         return v
 
+    @field_validator("replicas")
+    @classmethod
+    def validate_replicas(cls, v: int) -> int:
+        """
+        Validate replicas
+
+        Raises:
+            ValueError: When replicas is not positive
+
+        Returns:
+            int: replicas
+        """
+        if v < 1:
+            raise ValueError("Replicas must be positive")
+        return v
+
 
 class MailStackConfig(StackServiceConfig):
     version: str = "latest"
 
 
+class PgBouncerStackConfig(StackServiceConfig):
+    """
+    PgBouncer stack configuration
+    When defined, Odoo connects to the database through the pooler
+    """
+
+    version: str = "latest"
+    """
+    PgBouncer image version
+    """
+    pool_mode: t.Literal["session", "transaction"] = "session"
+    """
+    Pooling mode. Note that transaction mode breaks LISTEN/NOTIFY used by Odoo bus
+    """
+    default_pool_size: int = 20
+    """
+    Server connections allowed per user/database pair
+    """
+    max_client_conn: int = 200
+    """
+    Maximum number of client connections
+    """
+
+
+class GeventStackConfig(StackServiceConfig):
+    """
+    Gevent stack configuration
+    When defined, Odoo bus (longpolling or websocket) runs in its own
+    container built from Odoo image and is routed by the load balancer
+    """
+
+
+class LoadBalancerStackConfig(StackServiceConfig):
+    """
+    Load balancer stack configuration
+    When defined, Odoo replicas are served through nginx and the load balancer
+    publishes Odoo service port
+    """
+
+    version: str = "alpine"
+    """
+    Nginx image version, must be >= 1.27.3 to resolve replicas dynamically
+    """
+
+
 class StackServicesConfig(BaseModel):
     """
     Stack services configuration
@@ -110,3 +416,27 @@ class StackServicesConfig(BaseModel):
     """
     Optional mailhog config
     """
+    pgbouncer: t.Optional[PgBouncerStackConfig] = None
+    """
+    Optional PgBouncer config
+    """
+    gevent: t.Optional[GeventStackConfig] = None
+    """
+    Optional dedicated Odoo bus container config
+    """
+    lb: t.Optional[LoadBalancerStackConfig] = None
+    """
+    Optional load balancer config, enabled when Odoo has replicas or gevent
+    """
+
+    @model_validator(mode="after")
+    def validate_lb(self) -> "StackServicesConfig":
+        """
+        Enable load balancer when Odoo has replicas or a gevent container
+
+        Returns:
+            StackServicesConfig: config
+        """
+        if (self.odoo.replicas > 1 or self.gevent is not None) and self.lb is None:
+            self.lb = LoadBalancerStackConfig()
+        return self
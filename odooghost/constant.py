@@ -13,6 +13,8 @@ LABEL_NAME: str = "odooghost"
 LABEL_STACKNAME: str = f"{LABEL_NAME}_stackname"
 LABEL_STACK_SERVICE_TYPE: str = f"{LABEL_NAME}_stack_type"
 LABEL_ONE_OFF: str = f"{LABEL_NAME}_one_off"
+LABEL_REPLICA: str = f"{LABEL_NAME}_replica"
+LABEL_IMAGE_DIGEST: str = f"{LABEL_NAME}_image_digest"
 COMMON_NETWORK_NAME: str = f"{LABEL_NAME}_bridge"
 IS_WINDOWS_PLATFORM = sys.platform == "win32"
 IS_DARWIN_PLARFORM = sys.platform == "darwin"
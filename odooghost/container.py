@@ -106,6 +106,9 @@ class Container:
     def restart(self, **options) -> None:
         return self.client.restart(self.id, **options)
 
+    def update(self, **options) -> t.Dict[str, t.Any]:
+        return self.client.update_container(self.id, **options)
+
     def remove(self, **options) -> None:
         return self.client.remove_container(self.id, **options)
 
@@ -128,6 +131,7 @@ class Container:
         stream: bool = False,
         workdir: t.Optional[str] = None,
         pseudo_tty: bool = False,
+        environment: t.Optional[t.Dict[str, str]] = None,
     ) -> t.Tuple[t.Optional[int], t.Union[bytes, t.Generator, None]]:
         exec_id = self.create_exec(
             command,
@@ -138,6 +142,7 @@ class Container:
             user=user,
             tty=tty,
             workdir=workdir,
+            environment=environment,
         )
         if detach or not pseudo_tty:
             exec_output = self.start_exec(
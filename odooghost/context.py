@@ -223,6 +223,31 @@ class Context:
         """
         return Path("/tmp/odooghost")  # nosec B108
 
+    def get_metrics_path(self) -> Path:
+        """
+        Get metrics path, created if needed
+
+        Returns:
+            Path: Path to metrics folder
+        """
+        path = self._data_dir / "metrics"
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def get_stack_data_path(self, stack_name: str) -> Path:
+        """
+        Get Stack data path, created if needed
+
+        Args:
+            stack_name (str): Stack name
+
+        Returns:
+            Path: Path to Stack data folder
+        """
+        path = self._data_dir / "stacks" / stack_name
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
     @property
     def docker(self) -> "docker.DockerClient":
         """
@@ -66,6 +66,42 @@ class StackContainerStartError(StackException):
     ...
 
 
+class StackContainerUpdateError(StackException):
+    ...
+
+
+class StackContainerHealthError(StackException):
+    ...
+
+
+class StackServiceNotFound(StackException):
+    ...
+
+
+class StackPoolStatsError(StackException):
+    ...
+
+
+class StackLoadBalancerError(StackException):
+    ...
+
+
+class StackBenchError(StackException):
+    ...
+
+
+class StackDatabaseError(StackException):
+    ...
+
+
+class StackDatabaseQueryError(StackDatabaseError):
+    ...
+
+
+class StackDatabaseTemplateError(StackDatabaseError):
+    ...
+
+
 class AddonsError(StackException):
     ...
 
@@ -0,0 +1,191 @@
+import json
+import typing as t
+from datetime import datetime, timezone
+from pathlib import Path
+
+from odooghost.context import ctx
+
+
+class BootRecord(t.NamedTuple):
+    date: datetime
+    durations: t.Dict[str, float]
+
+
+def _get_boot_path(stack_name: str) -> Path:
+    return ctx.get_metrics_path() / f"{stack_name}_boot.jsonl"
+
+
+def record_boot(stack_name: str, durations: t.Dict[str, float]) -> BootRecord:
+    """
+    Append services time to ready of a Stack start to its boot history
+
+    Args:
+        stack_name (str): Stack name
+        durations (t.Dict[str, float]): seconds to ready by service name
+
+    Returns:
+        BootRecord: stored record
+    """
+    record = BootRecord(date=datetime.now(timezone.utc), durations=durations)
+    with open(_get_boot_path(stack_name=stack_name), "a") as stream:
+        stream.write(
+            json.dumps(dict(date=record.date.isoformat(), durations=durations)) + "\n"
+        )
+    return record
+
+
+def list_boots(stack_name: str, limit: t.Optional[int] = None) -> t.List[BootRecord]:
+    """
+    List Stack boot history, oldest first
+
+    Args:
+        stack_name (str): Stack name
+        limit (t.Optional[int], optional): only last records. Defaults to None.
+
+    Returns:
+        t.List[BootRecord]: boot records
+    """
+    path = _get_boot_path(stack_name=stack_name)
+    if not path.exists():
+        return []
+    with open(path, "r") as stream:
+        records = [
+            BootRecord(
+                date=datetime.fromisoformat(data["date"]), durations=data["durations"]
+            )
+            for data in map(json.loads, filter(None, map(str.strip, stream)))
+        ]
+    return records[-limit:] if limit else records
+
+
+def _get_test_durations_path(stack_name: str) -> Path:
+    return ctx.get_metrics_path() / f"{stack_name}_tests.json"
+
+
+def get_test_durations(stack_name: str) -> t.Dict[str, float]:
+    """
+    Get last known test duration of Stack modules
+
+    Args:
+        stack_name (str): Stack name
+
+    Returns:
+        t.Dict[str, float]: seconds by module name
+    """
+    path = _get_test_durations_path(stack_name=stack_name)
+    if not path.exists():
+        return {}
+    with open(path, "r") as stream:
+        return json.load(stream)
+
+
+def record_test_durations(stack_name: str, durations: t.Dict[str, float]) -> None:
+    """
+    Update Stack modules test durations
+
+    Args:
+        stack_name (str): Stack name
+        durations (t.Dict[str, float]): seconds by module name
+    """
+    known = get_test_durations(stack_name=stack_name)
+    known.update(durations)
+    with open(_get_test_durations_path(stack_name=stack_name), "w") as stream:
+        json.dump(known, stream)
+
+
+class UpgradeRecord(t.NamedTuple):
+    date: datetime
+    dbname: str
+    modules: t.List[str]
+    duration: float
+    heads: t.Dict[str, str]
+
+
+def _get_upgrade_path(stack_name: str) -> Path:
+    return ctx.get_metrics_path() / f"{stack_name}_upgrade.jsonl"
+
+
+def record_upgrade(
+    stack_name: str,
+    dbname: str,
+    modules: t.List[str],
+    duration: float,
+    heads: t.Dict[str, str],
+) -> UpgradeRecord:
+    """
+    Append a successful modules upgrade to Stack upgrade history
+
+    Args:
+        stack_name (str): Stack name
+        dbname (str): upgraded database
+        modules (t.List[str]): upgraded modules
+        duration (float): upgrade duration in seconds
+        heads (t.Dict[str, str]): addons git HEAD by repository path
+
+    Returns:
+        UpgradeRecord: stored record
+    """
+    record = UpgradeRecord(
+        date=datetime.now(timezone.utc),
+        dbname=dbname,
+        modules=modules,
+        duration=duration,
+        heads=heads,
+    )
+    with open(_get_upgrade_path(stack_name=stack_name), "a") as stream:
+        stream.write(
+            json.dumps({**record._asdict(), "date": record.date.isoformat()}) + "\n"
+        )
+    return record
+
+
+def get_last_upgrade(stack_name: str, dbname: str) -> t.Optional[UpgradeRecord]:
+    """
+    Get last successful modules upgrade of a Stack database
+
+    Args:
+        stack_name (str): Stack name
+        dbname (str): database name
+
+    Returns:
+        t.Optional[UpgradeRecord]: record or None when never upgraded
+    """
+    path = _get_upgrade_path(stack_name=stack_name)
+    if not path.exists():
+        return None
+    with open(path, "r") as stream:
+        records = [
+            UpgradeRecord(**{**data, "date": datetime.fromisoformat(data["date"])})
+            for data in map(json.loads, filter(None, map(str.strip, stream)))
+            if data["dbname"] == dbname
+        ]
+    return records[-1] if records else None
+
+
+def get_sql_snapshot_path(stack_name: str, dbname: str, name: str) -> Path:
+    """
+    Get path of a named SQL statements snapshot of a Stack database
+
+    Args:
+        stack_name (str): Stack name
+        dbname (str): database name
+        name (str): snapshot name
+
+    Returns:
+        Path: snapshot path
+    """
+    return ctx.get_metrics_path() / f"{stack_name}_{dbname}_sql_{name}.json"
+
+
+def get_bench_path(stack_name: str, name: str) -> Path:
+    """
+    Get path of a named bench report of a Stack
+
+    Args:
+        stack_name (str): Stack name
+        name (str): report name
+
+    Returns:
+        Path: report path
+    """
+    return ctx.get_metrics_path() / f"{stack_name}_bench_{name}.json"
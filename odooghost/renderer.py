@@ -19,3 +19,13 @@ def render_dockerfile(**kw) -> str:
         str: Rendered dockerfile
     """
     return env.get_template("Dockerfile.j2").render(**kw)
+
+
+def render_nginx_conf(**kw) -> str:
+    """
+    Render nginx config of load balancer
+
+    Returns:
+        str: Rendered config
+    """
+    return env.get_template("nginx.conf.j2").render(**kw)
@@ -1,11 +1,14 @@
 import abc
 import shutil
 import sys
+import time
 import typing as t
 from contextlib import contextmanager
 from pathlib import Path
 
 from docker.errors import APIError, ImageNotFound, NotFound
+from docker.types import Healthcheck
+from docker.utils import parse_bytes
 from loguru import logger
 
 from odooghost import constant, exceptions, utils
@@ -16,7 +19,11 @@ from odooghost.types import Filters, Labels
 from odooghost.utils.misc import get_random_string, labels_as_list
 
 if t.TYPE_CHECKING:
-    from odooghost.config import StackConfig, StackServiceConfig
+    from odooghost.config import ResourcesConfig, StackConfig, StackServiceConfig
+
+CPU_PERIOD: int = 100000
+# docker expresses healthcheck durations in nanoseconds
+SECOND: int = 1_000_000_000
 
 
 class BaseService(abc.ABC):
@@ -62,9 +69,62 @@ class BaseService(abc.ABC):
         """
         return {f"{self.container_port}/tcp": self.config.service_port}
 
+    def _get_resources_options(
+        self, resources: t.Optional["ResourcesConfig"] = None
+    ) -> t.Dict[str, t.Any]:
+        """
+        Get container host config options from resources config.
+        CPUs are set as quota over a fixed period so they can be updated
+        on a running container.
+
+        Args:
+            resources (t.Optional[ResourcesConfig], optional): resources config.
+                Defaults to service config resources.
+
+        Returns:
+            t.Dict[str, t.Any]: host config options
+        """
+        resources = resources or self.config.resources
+        if resources is None:
+            return {}
+        options = dict(
+            mem_limit=resources.memory,
+            mem_reservation=resources.memory_reservation,
+            memswap_limit=resources.memory_swap,
+            pids_limit=resources.pids,
+            blkio_weight=resources.blkio_weight,
+        )
+        if resources.cpus:
+            options.update(
+                cpu_period=CPU_PERIOD, cpu_quota=int(resources.cpus * CPU_PERIOD)
+            )
+        # docker defaults swap to memory limit at creation only
+        if resources.memory is not None and resources.memory_swap is None:
+            options.update(memswap_limit=2 * parse_bytes(resources.memory))
+        return {key: value for key, value in options.items() if value is not None}
+
+    def _get_healthcheck(self) -> t.Optional[Healthcheck]:
+        """
+        Get container healthcheck running service health command
+
+        Returns:
+            t.Optional[Healthcheck]: healthcheck
+        """
+        if self.health_command is None:
+            return None
+        return Healthcheck(
+            test=["CMD", *self.health_command],
+            interval=10 * SECOND,
+            timeout=5 * SECOND,
+            retries=3,
+            start_period=60 * SECOND,
+        )
+
     @abc.abstractmethod
     def _get_container_options(self, one_off: bool = False) -> t.Dict[str, t.Any]:
         return dict(
+            **self._get_resources_options(),
+            healthcheck=self._get_healthcheck() if not one_off else None,
             name=self.container_name
             if not one_off
             else f"{self.container_name}_run_{get_random_string()}",
@@ -151,7 +211,12 @@ class BaseService(abc.ABC):
             )
 
     def build_image(
-        self, path: Path, rm: bool = True, no_cache: bool = True, forcerm: bool = True
+        self,
+        path: Path,
+        rm: bool = True,
+        no_cache: bool = True,
+        forcerm: bool = True,
+        labels: t.Optional[Labels] = None,
     ) -> str:
         """
         Build service image
@@ -160,6 +225,8 @@ class BaseService(abc.ABC):
             path (Path): build context path
             rm (bool, optional): remove intermediate container. Defaults to True.
             no_cache (bool, optional): do not ser build cache. Defaults to True.
+            labels (t.Optional[Labels], optional): extra image labels.
+                Defaults to None.
 
         Raises:
             exceptions.StackImageBuildError: When build fail
@@ -178,7 +245,7 @@ class BaseService(abc.ABC):
                         rm=rm,
                         forcerm=forcerm,
                         nocache=no_cache,
-                        labels=self.labels(),
+                        labels={**self.labels(), **(labels or {})},
                     ),
                     sys.stdout,
                 )
@@ -336,6 +403,94 @@ class BaseService(abc.ABC):
                 f"Failed to start container {container.id}"
             )
 
+    def update_resources(self, resources: "ResourcesConfig") -> None:
+        """
+        Update service container resources without restarting it.
+        Processes limit can only be changed by recreating the container.
+
+        Args:
+            resources (ResourcesConfig): resources config
+
+        Raises:
+            exceptions.StackContainerUpdateError: When update fail
+        """
+        container = self.get_container()
+        options = self._get_resources_options(resources=resources)
+        if options.pop("pids_limit", None) is not None:
+            logger.warning(
+                f"Processes limit of {self.name} is applied when container is recreated"
+            )
+        if not options:
+            return
+        try:
+            container.update(**options)
+        except APIError as err:
+            raise exceptions.StackContainerUpdateError(
+                f"Failed to update container {container.name} resources: {err}"
+            )
+
+    def is_ready(self, container: Container) -> bool:
+        """
+        Check service is ready to serve, running its health command
+
+        Args:
+            container (Container): service container
+
+        Returns:
+            bool: service is ready
+        """
+        if self.health_command is None:
+            return True
+        try:
+            exit_code, _ = container.exec_run(command=self.health_command)
+        except APIError:
+            return False
+        return exit_code == 0
+
+    def wait_ready(
+        self,
+        timeout: float = 300,
+        start: t.Optional[float] = None,
+        max_delay: float = 5,
+        container: t.Optional[Container] = None,
+    ) -> float:
+        """
+        Wait until service is ready, polling with exponential backoff
+
+        Args:
+            timeout (float, optional): timeout in seconds. Defaults to 300.
+            start (t.Optional[float], optional): monotonic time the service
+                was started at. Defaults to now.
+            max_delay (float, optional): maximum delay between polls in seconds.
+                Defaults to 5.
+            container (t.Optional[Container], optional): container waited for.
+                Defaults to service container.
+
+        Raises:
+            exceptions.StackContainerHealthError: When container stops or is not
+                ready in time
+
+        Returns:
+            float: seconds to ready since start
+        """
+        start = time.monotonic() if start is None else start
+        container = container or self.get_container()
+        delay = 0.1
+        while True:
+            container.inspect()
+            if not container.is_running:
+                raise exceptions.StackContainerHealthError(
+                    f"Container {container.name} exited with code {container.exit_code}"
+                )
+            if self.is_ready(container=container):
+                return time.monotonic() - start
+            if time.monotonic() - start > timeout:
+                raise exceptions.StackContainerHealthError(
+                    f"Service {self.name} not ready after {timeout}s"
+                )
+            time.sleep(delay)
+            delay = min(delay * 2, max_delay)
+
     def build(self, rm: bool = True, no_cache: bool = True) -> None:
         """
         Build service
@@ -375,6 +530,12 @@ class BaseService(abc.ABC):
             f"Service {self.name} container already created ! Use --force option to recreate."
         )
 
+    def prepare_start(self) -> None:
+        """
+        Prepare service before its containers are started
+        """
+        ...
+
     def drop(self, volumes: bool = True, force: bool = False) -> None:
         """
         Drop service
@@ -445,6 +606,14 @@ class BaseService(abc.ABC):
         """
         ...
 
+    @property
+    def health_command(self) -> t.Optional[t.List[str]]:
+        """
+        Command exiting with 0 once service is ready, None when running
+        container is considered ready
+        """
+        return None
+
     @property
     def volume_name(self) -> str:
         """
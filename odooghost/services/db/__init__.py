@@ -0,0 +1,34 @@
+from . import clone, neutralize, pitr, restore, statements, toc, upgrade
+from .admin import AdminClient, QueryResult
+from .restore import restore_database
+from .service import (
+    DatabaseInfo,
+    DbService,
+    DumpFormat,
+    create_database,
+    database_exists,
+    drop_database,
+    dump_database,
+    list_databases,
+)
+
+__all__ = (
+    "clone",
+    "neutralize",
+    "pitr",
+    "restore",
+    "statements",
+    "toc",
+    "upgrade",
+    "AdminClient",
+    "QueryResult",
+    "DatabaseInfo",
+    "DbService",
+    "DumpFormat",
+    "create_database",
+    "database_exists",
+    "drop_database",
+    "dump_database",
+    "list_databases",
+    "restore_database",
+)
@@ -0,0 +1,365 @@
+import codecs
+import os
+import re
+import typing as t
+
+from docker.utils.socket import frames_iter
+from loguru import logger
+
+from odooghost import exceptions
+
+if t.TYPE_CHECKING:
+    from odooghost.container import Container
+
+FIELD_SEPARATOR: str = "\x1f"
+RECORD_SEPARATOR: str = "\x1e"
+NULL_DISPLAY: str = "\x1a"
+END_MARKER: str = "\x1d__odooghost_eoq__"
+
+Params = t.Dict[str, t.Any]
+Row = t.Tuple[t.Optional[str], ...]
+
+
+class QueryResult(t.NamedTuple):
+    """
+    Result of one query sent through the admin channel
+    """
+
+    columns: t.List[str]
+    rows: t.List[Row]
+    error: t.Optional[str] = None
+
+    @property
+    def row_count(self) -> int:
+        return len(self.rows)
+
+    def as_dicts(self) -> t.List[t.Dict[str, t.Optional[str]]]:
+        """
+        Get rows as dicts keyed by column name
+
+        Returns:
+            t.List[t.Dict[str, t.Optional[str]]]: rows
+        """
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+    def scalar(self) -> t.Optional[str]:
+        """
+        Get first column of first row
+
+        Returns:
+            t.Optional[str]: value or None when there is no row
+        """
+        return self.rows[0][0] if self.rows else None
+
+
+def quote_param(value: t.Any) -> str:
+    """
+    Quote a value as a psql meta-command argument
+
+    Args:
+        value (t.Any): value to quote
+
+    Returns:
+        str: quoted value
+    """
+    value = (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("'", "''")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+    return f"'{value}'"
+
+
+class AdminClient:
+    """
+    Admin client keeps one psql session open inside a container.
+    Queries are written on the exec stdin and their results are
+    parsed from the output until the end marker of each query.
+
+    Parameters are bound with psql variables: `{"dbname": "foo"}` can be
+    used as a literal with `:'dbname'` or as an identifier with `:"dbname"`.
+    """
+
+    def __init__(
+        self,
+        container: "Container",
+        user: str = "odoo",
+        dbname: str = "postgres",
+        host: t.Optional[str] = None,
+        port: t.Optional[int] = None,
+        password: t.Optional[str] = None,
+        exec_user: t.Optional[str] = "postgres",
+        init_sql: t.Optional[str] = "SET client_min_messages TO error",
+    ) -> None:
+        self.container = container
+        self.user = user
+        self.dbname = dbname
+        self.maintenance_dbname = dbname
+        self.host = host
+        self.port = port
+        self.password = password
+        self.exec_user = exec_user
+        self.init_sql = init_sql
+        self._socket = None
+        self._frames = None
+        self._buffer = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def _get_command(self) -> t.List[str]:
+        command = [
+            "psql",
+            "-X",
+            "-q",
+            "-A",
+            "-v",
+            "ON_ERROR_STOP=0",
+            "-F",
+            FIELD_SEPARATOR,
+            "-R",
+            RECORD_SEPARATOR,
+            "-P",
+            f"null={NULL_DISPLAY}",
+            "-P",
+            "footer=off",
+            "-U",
+            self.user,
+            "-d",
+            self.dbname,
+        ]
+        if self.host:
+            command += ["-h", self.host]
+        if self.port:
+            command += ["-p", str(self.port)]
+        # stderr is merged into stdout to keep errors ordered with results
+        return ["sh", "-c", 'exec "$@" 2>&1', "psql"] + command
+
+    def _write(self, data: str) -> None:
+        data = data.encode()
+        while data:
+            if hasattr(self._socket, "send"):
+                written = self._socket.send(data)
+            else:
+                written = os.write(self._socket.fileno(), data)
+            data = data[written:]
+
+    def _fill_buffer(self) -> None:
+        try:
+            _, chunk = next(self._frames)
+        except StopIteration:
+            output = self._buffer.strip()
+            self.close()
+            raise exceptions.StackDatabaseError(
+                f"Admin session on {self.container.name} closed unexpectedly: {output}"
+            )
+        self._buffer += self._decoder.decode(chunk)
+
+    def _read_marker(self) -> t.Tuple[str, str]:
+        while True:
+            index = self._buffer.find(END_MARKER)
+            if index != -1:
+                end = self._buffer.find("\n", index)
+                if end != -1:
+                    break
+            self._fill_buffer()
+        block = self._buffer[:index]
+        value = self._buffer[index + len(END_MARKER) : end].strip()
+        self._buffer = self._buffer[end + 1 :]
+        return block, value
+
+    def _read_result(self) -> QueryResult:
+        block, error_flag = self._read_marker()
+        # ERROR variable is only set since psql 11
+        if error_flag == "true" or (
+            error_flag != "false" and re.search(r"^(psql:\S+ )?ERROR:", block, re.M)
+        ):
+            return QueryResult(columns=[], rows=[], error=block.strip())
+        block = block[:-1] if block.endswith("\n") else block
+        if not block:
+            return QueryResult(columns=[], rows=[])
+        header, *records = block.split(RECORD_SEPARATOR)
+        return QueryResult(
+            columns=header.split(FIELD_SEPARATOR),
+            rows=[
+                tuple(
+                    None if value == NULL_DISPLAY else value
+                    for value in record.split(FIELD_SEPARATOR)
+                )
+                for record in records
+            ],
+        )
+
+    def _format_params(self, params: t.Optional[Params]) -> t.List[str]:
+        lines = []
+        for name, value in (params or {}).items():
+            if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", name):
+                raise ValueError(f"Invalid query parameter name {name}")
+            lines.append(f"\\set {name} {quote_param(value)}")
+        return lines
+
+    def _format_query(self, sql: str) -> str:
+        sql = sql.strip()
+        # a comment could end the query, terminate it on its own line
+        return sql if sql.endswith(";") else f"{sql}\n;"
+
+    def open(self) -> "AdminClient":
+        """
+        Open psql session
+
+        Raises:
+            exceptions.StackDatabaseError: When session can not be opened
+
+        Returns:
+            AdminClient: self
+        """
+        if self.is_open:
+            return self
+        logger.debug(f"Opening admin session on {self.container.name}")
+        exec_id = self.container.create_exec(
+            self._get_command(),
+            stdin=True,
+            stdout=True,
+            stderr=True,
+            tty=False,
+            user=self.exec_user,
+            environment=dict(PGPASSWORD=self.password) if self.password else None,
+        )
+        self._socket = self.container.start_exec(exec_id, socket=True, tty=False)
+        self._frames = frames_iter(self._socket, tty=False)
+        if self.init_sql:
+            self.execute(self.init_sql)
+        else:
+            self.ping()
+        return self
+
+    def close(self) -> None:
+        """
+        Close psql session
+        """
+        if self._socket is None:
+            return
+        try:
+            self._write("\\q\n")
+        except OSError:
+            pass
+        finally:
+            self._socket.close()
+            self._socket = None
+            self._frames = None
+            self._buffer = ""
+
+    def ping(self) -> None:
+        """
+        Wait for the session to be ready
+        """
+        self._write(f"\\echo {END_MARKER} false\n")
+        self._read_marker()
+
+    def connect(self, dbname: str) -> None:
+        """
+        Switch session to another database
+
+        Args:
+            dbname (str): database name
+
+        Raises:
+            exceptions.StackDatabaseError: When database does not exists
+                or connection fail
+        """
+        if dbname == self.dbname:
+            return
+        # a failed \connect ends a non interactive psql session
+        exists = self.execute(
+            "SELECT count(*) FROM pg_database WHERE datname = :'odooghost_dbname'",
+            params=dict(odooghost_dbname=dbname),
+        )
+        if exists.scalar() != "1":
+            raise exceptions.StackDatabaseError(f"Database {dbname} does not exists")
+        self._write(
+            '\\connect :"odooghost_dbname"\n' + f"\\echo {END_MARKER} :DBNAME\n"
+        )
+        block, current_dbname = self._read_marker()
+        if current_dbname != dbname:
+            previous = self.dbname
+            self.close()
+            raise exceptions.StackDatabaseError(
+                f"Failed to connect admin session from {previous} to {dbname}: "
+                f"{block.strip()}"
+            )
+        self.dbname = dbname
+
+    def execute_many(
+        self,
+        queries: t.Sequence[t.Union[str, t.Tuple[str, t.Optional[Params]]]],
+        dbname: t.Optional[str] = None,
+        raise_on_error: bool = True,
+    ) -> t.List[QueryResult]:
+        """
+        Send a batch of queries at once and read all of their results
+
+        Args:
+            queries (t.Sequence[t.Union[str, t.Tuple[str, t.Optional[Params]]]]):
+                queries as SQL string or (SQL, params) tuple
+            dbname (t.Optional[str], optional): run queries on this database.
+                Defaults to current session database.
+            raise_on_error (bool, optional): raise on first failed query.
+                Defaults to True.
+
+        Raises:
+            exceptions.StackDatabaseQueryError: When a query fail
+
+        Returns:
+            t.List[QueryResult]: results in queries order
+        """
+        if not self.is_open:
+            self.open()
+        if dbname is not None:
+            self.connect(dbname=dbname)
+        payload = []
+        for query in queries:
+            sql, params = (query, None) if isinstance(query, str) else query
+            payload += self._format_params(params)
+            payload.append(self._format_query(sql))
+            payload.append(f"\\echo {END_MARKER} :ERROR")
+        self._write("\n".join(payload) + "\n")
+        results = [self._read_result() for _ in queries]
+        if raise_on_error:
+            for result in results:
+                if result.error:
+                    raise exceptions.StackDatabaseQueryError(result.error)
+        return results
+
+    def execute(
+        self,
+        sql: str,
+        params: t.Optional[Params] = None,
+        dbname: t.Optional[str] = None,
+        raise_on_error: bool = True,
+    ) -> QueryResult:
+        """
+        Execute one query
+
+        Args:
+            sql (str): SQL query
+            params (t.Optional[Params], optional): query parameters. Defaults to None.
+            dbname (t.Optional[str], optional): run query on this database.
+                Defaults to current session database.
+            raise_on_error (bool, optional): raise when query fail. Defaults to True.
+
+        Returns:
+            QueryResult: query result
+        """
+        return self.execute_many(
+            [(sql, params)], dbname=dbname, raise_on_error=raise_on_error
+        )[0]
+
+    @property
+    def is_open(self) -> bool:
+        return self._socket is not None
+
+    def __enter__(self) -> "AdminClient":
+        return self.open()
+
+    def __exit__(self, *args) -> None:
+        self.close()
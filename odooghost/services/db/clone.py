@@ -0,0 +1,272 @@
+import re
+import shlex
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+
+from odooghost import exceptions
+
+from .admin import AdminClient
+from .restore import PhaseReport
+
+if t.TYPE_CHECKING:
+    from odooghost import config
+    from odooghost.container import Container
+
+DD_BYTES_RE = re.compile(r"^(?P<size>\d+) bytes .* copied", re.M)
+DD_OUTPUT_RE = re.compile(r"^(\d+\+\d+ records (in|out)|\d+ bytes .* copied.*)$")
+SOURCE_PASSWORD_ENV: str = "ODOOGHOST_SOURCE_PASSWORD"
+# tables are passed as pg_dump arguments, keep them few
+MAX_BUCKET_TABLES: int = 64
+
+
+class CloneSource(t.NamedTuple):
+    host: str
+    user: str
+    password: t.Optional[str]
+    dbname: str
+
+    @classmethod
+    def from_config(
+        cls, db_config: "config.PostgresStackConfig", dbname: str
+    ) -> "CloneSource":
+        """
+        Get clone source from a remote database config
+
+        Args:
+            db_config (config.PostgresStackConfig): remote database config
+            dbname (str): source database name
+
+        Raises:
+            exceptions.StackDatabaseError: When database config is not remote
+
+        Returns:
+            CloneSource: clone source
+        """
+        if db_config.type != "remote" or not db_config.host:
+            raise exceptions.StackDatabaseError(
+                "Clone source database must be of remote type with a host"
+            )
+        return cls(
+            host=db_config.host,
+            user=db_config.user or "odoo",
+            password=db_config.password,
+            dbname=dbname,
+        )
+
+
+def _get_tables(admin: AdminClient) -> t.List[t.Tuple[str, int]]:
+    result = admin.execute(
+        """
+        SELECT '"' || replace(n.nspname, '"', '""') || '"."'
+            || replace(c.relname, '"', '""') || '"',
+            pg_table_size(c.oid)
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind = 'r'
+            AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+            AND n.nspname NOT LIKE 'pg_toast%'
+        ORDER BY 2 DESC
+        """
+    )
+    return [(table, int(size)) for table, size in result.rows]
+
+
+def _get_big_tables(
+    tables: t.List[t.Tuple[str, int]], jobs: int
+) -> t.List[t.Tuple[str, int]]:
+    """
+    Get biggest tables streamed by buckets, the others are small enough
+    to be streamed together by a single pipe
+    """
+    tables = sorted(tables, key=lambda item: item[1], reverse=True)
+    rest = sum(size for _, size in tables)
+    share = rest / (jobs + 1)
+    big = []
+    for table, size in tables[:MAX_BUCKET_TABLES]:
+        if rest <= share:
+            break
+        big.append((table, size))
+        rest -= size
+    return big
+
+
+def _get_buckets(tables: t.List[t.Tuple[str, int]], jobs: int) -> t.List[t.List[str]]:
+    """
+    Spread tables over buckets of even size, biggest tables first
+    """
+    buckets = [([], 0) for _ in range(min(jobs, len(tables)))]
+    for table, size in sorted(tables, key=lambda item: item[1], reverse=True):
+        index = min(range(len(buckets)), key=lambda i: buckets[i][1])
+        buckets[index] = (buckets[index][0] + [table], buckets[index][1] + size)
+    return [bucket for bucket, _ in buckets]
+
+
+def _pipe(
+    source: CloneSource, snapshot: str, dbname: str, args: t.List[str]
+) -> t.List[str]:
+    dump = [
+        "pg_dump",
+        "-h",
+        source.host,
+        "-U",
+        source.user,
+        "-Fc",
+        f"--snapshot={snapshot}",
+        *args,
+        source.dbname,
+    ]
+    restore = ["pg_restore", "-U", "odoo", f"--dbname={dbname}"]
+    # dd reports streamed bytes, nothing is written on disk
+    return [
+        "bash",
+        "-c",
+        f'set -o pipefail; PGPASSWORD="${SOURCE_PASSWORD_ENV}" {shlex.join(dump)}'
+        f" | dd bs=1M | {shlex.join(restore)}",
+    ]
+
+
+def _run_phase(
+    container: "Container",
+    name: str,
+    commands: t.List[t.List[str]],
+    environment: t.Optional[t.Dict[str, str]] = None,
+) -> PhaseReport:
+    logger.info(f"Cloning {name} ...")
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+        results = list(
+            executor.map(
+                lambda command: container.exec_run(
+                    command=command, user="postgres", environment=environment
+                ),
+                commands,
+            )
+        )
+    exit_code, size = 0, None
+    for code, res in results:
+        output = res.decode()
+        for match in DD_BYTES_RE.finditer(output):
+            size = (size or 0) + int(match["size"])
+        output = "\n".join(
+            line for line in output.splitlines() if not DD_OUTPUT_RE.match(line)
+        ).strip()
+        if output:
+            print(output)
+        exit_code = exit_code or code
+    return PhaseReport(
+        name=name,
+        duration=time.monotonic() - start,
+        exit_code=exit_code,
+        size=size,
+    )
+
+
+def clone_database(
+    container: "Container",
+    source: CloneSource,
+    dbname: str,
+    jobs: int = 1,
+    analyze: bool = True,
+) -> t.List[PhaseReport]:
+    """
+    Clone a remote database into an existing local database.
+    pg_dump output is piped into pg_restore so nothing lands on disk.
+    All phases dump from one exported snapshot, which allows biggest
+    tables data to be streamed by `jobs` concurrent pipes, next to one
+    pipe streaming every other table.
+
+    Args:
+        container (Container): local db container
+        source (CloneSource): remote database
+        dbname (str): local database name
+        jobs (int, optional): concurrent data pipes. Defaults to 1.
+        analyze (bool, optional): analyze database once cloned. Defaults to True.
+
+    Raises:
+        exceptions.StackDatabaseError: When remote session fail
+
+    Returns:
+        t.List[PhaseReport]: phases reports
+    """
+    environment = {SOURCE_PASSWORD_ENV: source.password or ""}
+    reports = []
+    # snapshot is valid as long as its exporting transaction is open
+    with AdminClient(
+        container=container,
+        user=source.user,
+        dbname=source.dbname,
+        host=source.host,
+        password=source.password,
+    ) as admin:
+        admin.execute("BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        snapshot = admin.execute("SELECT pg_export_snapshot()").scalar()
+        tables = _get_tables(admin=admin)
+
+        reports.append(
+            _run_phase(
+                container=container,
+                name="pre-data",
+                commands=[_pipe(source, snapshot, dbname, ["--section=pre-data"])],
+                environment=environment,
+            )
+        )
+        big_tables = _get_big_tables(tables=tables, jobs=jobs)
+        data_commands = [
+            _pipe(
+                source,
+                snapshot,
+                dbname,
+                ["--data-only"] + [f"--table={table}" for table in bucket],
+            )
+            for bucket in _get_buckets(tables=big_tables, jobs=jobs)
+        ]
+        # small tables, standalone sequences values and large objects
+        data_commands.append(
+            _pipe(
+                source,
+                snapshot,
+                dbname,
+                ["--data-only"]
+                + [f"--exclude-table={table}" for table, _ in big_tables],
+            )
+        )
+        reports.append(
+            _run_phase(
+                container=container,
+                name="data",
+                commands=data_commands,
+                environment=environment,
+            )
+        )
+        reports.append(
+            _run_phase(
+                container=container,
+                name="post-data",
+                commands=[_pipe(source, snapshot, dbname, ["--section=post-data"])],
+                environment=environment,
+            )
+        )
+        admin.execute("COMMIT")
+
+    if analyze:
+        reports.append(
+            _run_phase(
+                container=container,
+                name="analyze",
+                commands=[
+                    [
+                        "vacuumdb",
+                        "-q",
+                        "-U",
+                        "odoo",
+                        "--analyze-only",
+                        f"--jobs={jobs}",
+                        dbname,
+                    ]
+                ],
+            )
+        )
+    return reports
@@ -0,0 +1,206 @@
+import typing as t
+
+from odooghost import exceptions
+
+if t.TYPE_CHECKING:
+    from odooghost.config.restore import PostRestoreStepConfig
+
+    from .admin import AdminClient
+
+CLOCK_QUERY: str = "SELECT extract(epoch FROM clock_timestamp())"
+
+
+class StepReport(t.NamedTuple):
+    name: str
+    duration: t.Optional[float]
+    error: t.Optional[str] = None
+
+
+def if_table_exists(table: str, sql: str) -> str:
+    """
+    Wrap SQL in a block that only runs when the table exists.
+    Neutralized tables belong to modules that may not be installed.
+
+    Args:
+        table (str): table name
+        sql (str): SQL to run
+
+    Returns:
+        str: guarded SQL
+    """
+    return f"""
+DO $odooghost$
+BEGIN
+    IF to_regclass('{table}') IS NOT NULL THEN
+        EXECUTE $sql${sql}$sql$;
+    END IF;
+END $odooghost$
+"""
+
+
+def base_url(odoo_version: float) -> str:
+    return "DELETE FROM ir_config_parameter WHERE key = 'web.base.url.freeze'"
+
+
+def crons(odoo_version: float) -> str:
+    return if_table_exists(
+        "ir_cron",
+        "UPDATE ir_cron SET active = false WHERE active AND id NOT IN ("
+        "SELECT res_id FROM ir_model_data WHERE model = 'ir.cron' "
+        "AND module = 'base' AND name = 'autovacuum_job')",
+    )
+
+
+def mail_servers(odoo_version: float) -> str:
+    return ";\n".join(
+        if_table_exists(table, f"UPDATE {table} SET active = false WHERE active")
+        for table in ("ir_mail_server", "fetchmail_server")
+    )
+
+
+def payment_providers(odoo_version: float) -> str:
+    table = "payment_provider" if odoo_version >= 16.0 else "payment_acquirer"
+    return if_table_exists(
+        table,
+        f"UPDATE {table} SET state = 'disabled' "
+        "WHERE state NOT IN ('test', 'disabled')",
+    )
+
+
+def database_uuid(odoo_version: float) -> str:
+    return """
+UPDATE ir_config_parameter
+SET value = md5(random()::text || clock_timestamp()::text)::uuid::text
+WHERE key = 'database.uuid';
+DELETE FROM ir_config_parameter
+WHERE key IN ('database.enterprise_code', 'database.expiration_date',
+              'database.expiration_reason')
+"""
+
+
+def anonymize_partners(odoo_version: float) -> str:
+    # Only existing columns are updated, res_partner changes between versions
+    return """
+DO $odooghost$
+DECLARE
+    assignments text;
+BEGIN
+    IF to_regclass('res_partner') IS NULL THEN
+        RETURN;
+    END IF;
+    SELECT string_agg(format('%I = %s', c.column_name, m.expression), ', ')
+    INTO assignments
+    FROM (VALUES
+        ('name', $e$'Partner ' || id$e$),
+        ('display_name', $e$'Partner ' || id$e$),
+        ('complete_name', $e$'Partner ' || id$e$),
+        ('email', $e$CASE WHEN email IS NOT NULL THEN 'partner' || id || '@example.com' END$e$),
+        ('phone', 'NULL'),
+        ('mobile', 'NULL'),
+        ('street', 'NULL'),
+        ('street2', 'NULL'),
+        ('vat', 'NULL'),
+        ('website', 'NULL'),
+        ('comment', 'NULL')
+    ) AS m(column_name, expression)
+    JOIN information_schema.columns c
+        ON c.table_schema = current_schema()
+        AND c.table_name = 'res_partner'
+        AND c.column_name = m.column_name;
+    EXECUTE format(
+        'UPDATE res_partner SET %s WHERE id NOT IN ('
+        'SELECT partner_id FROM res_users WHERE partner_id IS NOT NULL '
+        'UNION SELECT partner_id FROM res_company WHERE partner_id IS NOT NULL)',
+        assignments
+    );
+END $odooghost$
+"""
+
+
+BUILTIN_STEPS: t.Dict[str, t.Callable[[float], str]] = dict(
+    base_url=base_url,
+    crons=crons,
+    mail_servers=mail_servers,
+    payment_providers=payment_providers,
+    database_uuid=database_uuid,
+    anonymize_partners=anonymize_partners,
+)
+
+
+def compile_pipeline(
+    steps: t.List["PostRestoreStepConfig"], odoo_version: float
+) -> t.List[t.Tuple[str, str]]:
+    """
+    Compile post restore steps to SQL
+
+    Args:
+        steps (t.List[PostRestoreStepConfig]): steps config
+        odoo_version (float): Odoo version of restored database
+
+    Returns:
+        t.List[t.Tuple[str, str]]: (step name, SQL) tuples
+    """
+    return [
+        (
+            step.name,
+            BUILTIN_STEPS[step.name](odoo_version) if step.is_builtin else step.sql,
+        )
+        for step in steps
+    ]
+
+
+def run_pipeline(
+    admin: "AdminClient",
+    dbname: str,
+    steps: t.List["PostRestoreStepConfig"],
+    odoo_version: float,
+) -> t.List[StepReport]:
+    """
+    Run post restore steps in one transaction, sent as one batch.
+    A clock query is run between steps to time them on server side.
+
+    Args:
+        admin (AdminClient): admin client
+        dbname (str): database name
+        steps (t.List[PostRestoreStepConfig]): steps config
+        odoo_version (float): Odoo version of restored database
+
+    Raises:
+        exceptions.StackDatabaseQueryError: When a step fail, the whole
+            transaction is rolled back
+
+    Returns:
+        t.List[StepReport]: step reports
+    """
+    compiled = compile_pipeline(steps=steps, odoo_version=odoo_version)
+    if not compiled:
+        return []
+    queries = ["BEGIN", CLOCK_QUERY]
+    for _, sql in compiled:
+        queries += [sql, CLOCK_QUERY]
+    # COMMIT will rollback the transaction if a step failed
+    queries.append("COMMIT")
+    results = admin.execute_many(queries, dbname=dbname, raise_on_error=False)
+    if results[0].error:
+        raise exceptions.StackDatabaseQueryError(results[0].error)
+
+    reports = []
+    clocks = results[1::2]
+    for index, (name, _) in enumerate(compiled):
+        step_result, start, end = (
+            results[2 + index * 2],
+            clocks[index],
+            clocks[index + 1],
+        )
+        duration = None
+        if not start.error and not end.error:
+            duration = float(end.scalar()) - float(start.scalar())
+        reports.append(
+            StepReport(name=name, duration=duration, error=step_result.error)
+        )
+    failed = next((report for report in reports if report.error), None)
+    if failed is not None:
+        raise exceptions.StackDatabaseQueryError(
+            f"Post restore step {failed.name} failed, rolled back: {failed.error}"
+        )
+    return reports
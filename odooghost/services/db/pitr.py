@@ -0,0 +1,228 @@
+import shlex
+import time
+import typing as t
+from datetime import datetime, timezone
+from pathlib import PurePosixPath
+
+from loguru import logger
+
+from odooghost import exceptions
+
+if t.TYPE_CHECKING:
+    from odooghost import config
+    from odooghost.container import Container
+
+DATA_PATH = PurePosixPath("/var/lib/postgresql/data")
+ARCHIVE_PATH = PurePosixPath("/var/lib/postgresql/archive")
+WAL_PATH = ARCHIVE_PATH / "wal"
+BASE_PATH = ARCHIVE_PATH / "base"
+BACKUP_NAME_FORMAT: str = "%Y%m%dT%H%M%SZ"
+
+
+class BaseBackup(t.NamedTuple):
+    name: str
+    date: datetime
+
+    @property
+    def path(self) -> PurePosixPath:
+        return BASE_PATH / self.name
+
+
+def get_server_options(wal_config: "config.WalArchiveConfig") -> t.List[str]:
+    """
+    Get postgres server options enabling WAL archiving
+
+    Args:
+        wal_config (config.WalArchiveConfig): WAL archive config
+
+    Returns:
+        t.List[str]: postgres command line options
+    """
+    return [
+        "-c",
+        "wal_level=replica",
+        "-c",
+        "archive_mode=on",
+        "-c",
+        f"archive_command=test ! -f {WAL_PATH}/%f && cp %p {WAL_PATH}/%f",
+        "-c",
+        f"archive_timeout={wal_config.archive_timeout}",
+    ]
+
+
+def get_container_command(options: t.List[str]) -> t.List[str]:
+    """
+    Get db container command.
+    Archive volume is owned by root when created, it is prepared before
+    running the image entrypoint which drops privileges to postgres.
+
+    Args:
+        options (t.List[str]): postgres command line options
+
+    Returns:
+        t.List[str]: container command
+    """
+    return [
+        "sh",
+        "-c",
+        f"mkdir -p {WAL_PATH} {BASE_PATH} && "
+        f"chown postgres:postgres {ARCHIVE_PATH} {WAL_PATH} {BASE_PATH} && "
+        'exec docker-entrypoint.sh "$@"',
+        "sh",
+        "postgres",
+        *options,
+    ]
+
+
+def get_base_backup_command(user: str, keep: int) -> t.List[str]:
+    """
+    Get base backup command, to run as postgres in db container.
+    Backup is named after its end date, older backups and WAL files
+    only needed by them are removed.
+
+    Args:
+        user (str): database superuser
+        keep (int): base backups to keep
+
+    Returns:
+        t.List[str]: command
+    """
+    user = shlex.quote(user)
+    script = f"""
+set -e
+until pg_isready -q -U {user}; do sleep 1; done
+start_wal=$(psql -XAtq -U {user} -d postgres \
+    -c "SELECT pg_walfile_name(pg_current_wal_lsn())")
+partial={BASE_PATH}/.partial_$$
+rm -rf "$partial"
+pg_basebackup -U {user} -D "$partial" -Ft -z -X fetch
+echo "$start_wal" > "$partial/start_wal"
+mv "$partial" {BASE_PATH}/$(date -u +{BACKUP_NAME_FORMAT})
+cd {BASE_PATH}
+ls -1 | sort | head -n -{keep} | xargs -r rm -rf
+oldest=$(ls -1 | sort | head -n 1)
+pg_archivecleanup {WAL_PATH} "$(cat "$oldest/start_wal")"
+"""
+    return ["sh", "-c", script]
+
+
+def list_base_backups(container: "Container") -> t.List[BaseBackup]:
+    """
+    List base backups, oldest first
+
+    Args:
+        container (Container): db container
+
+    Returns:
+        t.List[BaseBackup]: base backups
+    """
+    exit_code, res = container.exec_run(command=["ls", "-1", BASE_PATH.as_posix()])
+    if exit_code != 0:
+        return []
+    backups = []
+    for name in res.decode().split():
+        try:
+            date = datetime.strptime(name, BACKUP_NAME_FORMAT)
+        except ValueError:
+            continue
+        backups.append(BaseBackup(name=name, date=date.replace(tzinfo=timezone.utc)))
+    return sorted(backups, key=lambda backup: backup.date)
+
+
+def find_base_backup(
+    backups: t.List[BaseBackup], target: datetime
+) -> t.Optional[BaseBackup]:
+    """
+    Find nearest base backup completed before target
+
+    Args:
+        backups (t.List[BaseBackup]): base backups, oldest first
+        target (datetime): aware recovery target
+
+    Returns:
+        t.Optional[BaseBackup]: base backup
+    """
+    candidates = [backup for backup in backups if backup.date <= target]
+    return candidates[-1] if candidates else None
+
+
+def get_recovery_command(
+    backup: BaseBackup, target: datetime, version: int
+) -> t.List[str]:
+    """
+    Get command replacing cluster data with a base backup configured
+    to replay archived WAL until target, to run as root in a one off
+    container with db volumes.
+
+    Args:
+        backup (BaseBackup): base backup
+        target (datetime): aware recovery target
+        version (int): postgres major version
+
+    Returns:
+        t.List[str]: command
+    """
+    settings = "\n".join(
+        [
+            f"restore_command = 'cp {WAL_PATH}/%f %p'",
+            f"recovery_target_time = '{target.isoformat()}'",
+            "recovery_target_action = 'promote'",
+        ]
+    )
+    if version >= 12:
+        signal = f"touch {DATA_PATH}/recovery.signal\ncat >> {DATA_PATH}/postgresql.auto.conf"
+    else:
+        signal = f"cat > {DATA_PATH}/recovery.conf"
+    script = f"""
+set -e
+find {DATA_PATH} -mindepth 1 -delete
+tar -xzf {backup.path}/base.tar.gz -C {DATA_PATH}
+if [ -f {backup.path}/pg_wal.tar.gz ]; then
+    tar -xzf {backup.path}/pg_wal.tar.gz -C {DATA_PATH}/pg_wal
+fi
+{signal} <<'EOF'
+{settings}
+EOF
+chown -R postgres:postgres {DATA_PATH}
+chmod 700 {DATA_PATH}
+"""
+    return ["sh", "-c", script]
+
+
+def wait_recovery(container: "Container", user: str, timeout: int = 600) -> float:
+    """
+    Wait until cluster is out of recovery
+
+    Args:
+        container (Container): db container
+        user (str): database superuser
+        timeout (int, optional): timeout in seconds. Defaults to 600.
+
+    Raises:
+        exceptions.StackDatabaseError: When recovery does not end in time
+
+    Returns:
+        float: recovery duration
+    """
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        exit_code, res = container.exec_run(
+            command=[
+                "psql",
+                "-XAtq",
+                "-U",
+                user,
+                "-d",
+                "postgres",
+                "-c",
+                "SELECT pg_is_in_recovery()",
+            ],
+            user="postgres",
+        )
+        if exit_code == 0 and res.decode().strip() == "f":
+            return time.monotonic() - start
+        logger.debug("Waiting for WAL replay ...")
+        time.sleep(1)
+    raise exceptions.StackDatabaseError(
+        f"Recovery did not end after {timeout}s, check db container logs"
+    )
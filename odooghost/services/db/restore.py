@@ -0,0 +1,340 @@
+import re
+import shutil
+import tempfile
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from loguru import logger
+
+from . import toc
+
+if t.TYPE_CHECKING:
+    from odooghost.container import Container
+
+SPLIT_SUFFIX: str = ".split"
+SPLIT_THRESHOLD: int = 64 * 1024 * 1024
+ENTRY_HEADER_RE = re.compile(
+    r"^-- (?:Data for )?Name: (?P<name>[^;]+); Type: (?P<type>[^;]+); Schema: "
+)
+
+
+class PhaseReport(t.NamedTuple):
+    name: str
+    duration: float
+    exit_code: int
+    size: t.Optional[int] = None
+
+
+class SplitDump(t.NamedTuple):
+    path: Path
+    data_files: t.List[str]
+    excluded: t.Set[str]
+
+
+def get_container_cpus(container: "Container") -> int:
+    """
+    Get CPUs available to a container, regarding its limits
+
+    Args:
+        container (Container): container
+
+    Returns:
+        int: CPU count
+    """
+    nano_cpus = container.get("HostConfig.NanoCpus") or 0
+    if nano_cpus:
+        return max(1, int(nano_cpus / 1e9))
+    cpu_quota = container.get("HostConfig.CpuQuota") or 0
+    cpu_period = container.get("HostConfig.CpuPeriod") or 100000
+    if cpu_quota > 0:
+        return max(1, int(cpu_quota / cpu_period))
+    exit_code, res = container.exec_run(command=["nproc"])
+    if exit_code != 0 or not res.decode().strip().isdigit():
+        return 1
+    return int(res.decode().strip())
+
+
+def get_restore_jobs(container: "Container", jobs: int = 0) -> int:
+    """
+    Get restore jobs, sized from container CPUs when not given
+
+    Args:
+        container (Container): db container
+        jobs (int, optional): requested jobs, 0 means auto. Defaults to 0.
+
+    Returns:
+        int: jobs
+    """
+    if jobs > 0:
+        return jobs
+    jobs = get_container_cpus(container=container)
+    logger.debug(f"Sized restore jobs to {jobs} from container CPUs")
+    return jobs
+
+
+def _is_split_worth(dump_path: Path, jobs: int) -> bool:
+    return (
+        dump_path.is_file()
+        and dump_path.suffix == ".sql"
+        and jobs > 1
+        and dump_path.stat().st_size >= SPLIT_THRESHOLD
+    )
+
+
+def _iter_entries(
+    stream: t.IO,
+) -> t.Generator[t.Tuple[str, str, t.List[str]], None, None]:
+    """
+    Iter over plain dump entries.
+    First entry is the preamble with name and type set to None.
+
+    Yields:
+        t.Tuple[str, str, t.List[str]]: entry name, type and lines
+    """
+    name, type_, lines, in_copy = None, None, [], False
+    for line in stream:
+        if in_copy:
+            in_copy = line != "\\.\n"
+        elif line.startswith("COPY ") and line.rstrip().endswith("FROM stdin;"):
+            in_copy = True
+        else:
+            match = ENTRY_HEADER_RE.match(line)
+            if match:
+                yield name, type_, lines
+                name, type_, lines = match["name"], match["type"], []
+        lines.append(line)
+    yield name, type_, lines
+
+
+def split_plain_dump(
+    dump_path: Path,
+    dest: Path,
+    jobs: int,
+    exclude_patterns: t.Optional[t.List[str]] = None,
+) -> SplitDump:
+    """
+    Split a plain SQL dump in pre-data, data and post-data files.
+    Tables data is spread over `jobs` files so it can be loaded by
+    concurrent psql sessions. Foreign keys referencing excluded tables
+    are restored NOT VALID at the end of post-data.
+
+    Args:
+        dump_path (Path): plain SQL dump path
+        dest (Path): destination folder
+        jobs (int): number of data files
+        exclude_patterns (t.Optional[t.List[str]], optional): tables patterns
+            whose data is skipped. Defaults to None.
+
+    Returns:
+        SplitDump: split dump
+    """
+    excluded = set()
+    if exclude_patterns:
+        tables = []
+        with open(dump_path, "r", encoding="utf-8") as stream:
+            for name, type_, lines in _iter_entries(stream):
+                if type_ == "TABLE DATA":
+                    tables.append(name)
+        excluded = toc.get_excluded_tables(tables=tables, patterns=exclude_patterns)
+    dangling = []
+
+    dest.mkdir(parents=True)
+    data_files = [f"data_{index:02d}.sql" for index in range(jobs)]
+    data_streams = [open(dest / name, "w", encoding="utf-8") for name in data_files]
+    data_sizes = [0] * jobs
+    pre_stream = open(dest / "pre.sql", "w", encoding="utf-8")
+    post_stream = open(dest / "post.sql", "w", encoding="utf-8")
+    try:
+        current = pre_stream
+        with open(dump_path, "r", encoding="utf-8") as stream:
+            for name, type_, lines in _iter_entries(stream):
+                if name is None:
+                    # preamble sets session parameters, each session needs it
+                    for output in data_streams + [post_stream]:
+                        output.writelines(lines)
+                elif type_ == "TABLE DATA":
+                    current = post_stream
+                    if name in excluded:
+                        continue
+                    index = data_sizes.index(min(data_sizes))
+                    data_streams[index].writelines(lines)
+                    data_sizes[index] += sum(map(len, lines))
+                    continue
+                elif type_ == "FK CONSTRAINT" and excluded:
+                    foreign_keys = toc.get_dangling_foreign_keys(
+                        foreign_keys=toc.parse_foreign_keys("".join(lines)),
+                        excluded=excluded,
+                    )
+                    if foreign_keys:
+                        dangling += foreign_keys
+                        continue
+                current.writelines(lines)
+            # restored last, once every other constraint exists
+            post_stream.write(toc.get_foreign_keys_sql(foreign_keys=dangling))
+    finally:
+        for output in data_streams + [pre_stream, post_stream]:
+            output.close()
+    return SplitDump(path=dest, data_files=data_files, excluded=excluded)
+
+
+@contextmanager
+def prepare_dump(
+    dump_path: Path,
+    jobs: int,
+    exclude_patterns: t.Optional[t.List[str]] = None,
+) -> t.Generator[t.Tuple[Path, t.Set[str]], None, None]:
+    """
+    Prepare dump on host before transfer.
+    Big plain SQL dumps are split to be restored by phases in parallel.
+
+    Args:
+        dump_path (Path): dump path
+        jobs (int): restore jobs
+        exclude_patterns (t.Optional[t.List[str]], optional): tables patterns
+            whose data is skipped (only for split dumps). Defaults to None.
+
+    Yields:
+        t.Tuple[Path, t.Set[str]]: path to transfer and excluded tables
+    """
+    if not _is_split_worth(dump_path=dump_path, jobs=jobs):
+        yield dump_path, set()
+        return
+    tempdir = Path(tempfile.mkdtemp())
+    try:
+        logger.info(f"Splitting plain dump in {jobs} parts ...")
+        split = split_plain_dump(
+            dump_path=dump_path,
+            dest=tempdir / f"{dump_path.stem}{SPLIT_SUFFIX}",
+            jobs=jobs,
+            exclude_patterns=exclude_patterns,
+        )
+        yield split.path, split.excluded
+    finally:
+        shutil.rmtree(tempdir)
+
+
+def _run_phase(
+    container: "Container", name: str, commands: t.List[t.List[str]]
+) -> PhaseReport:
+    logger.info(f"Restoring {name} ...")
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+        results = list(
+            executor.map(
+                lambda command: container.exec_run(command=command, user="postgres"),
+                commands,
+            )
+        )
+    exit_code = 0
+    for code, res in results:
+        output = res.decode().strip()
+        if output:
+            print(output)
+        exit_code = exit_code or code
+    return PhaseReport(
+        name=name, duration=time.monotonic() - start, exit_code=exit_code
+    )
+
+
+def _psql(dbname: str, path: Path) -> t.List[str]:
+    # results of set_config/setval calls are discarded, errors are kept
+    return [
+        "psql",
+        "-q",
+        "-o",
+        "/dev/null",
+        "-U",
+        "odoo",
+        f"--dbname={dbname}",
+        "-f",
+        path.as_posix(),
+    ]
+
+
+def restore_database(
+    container: "Container",
+    dbname: str,
+    dump_path: Path,
+    jobs: int = 1,
+    use_list: t.Optional[str] = None,
+    foreign_keys_path: t.Optional[str] = None,
+    analyze: bool = True,
+) -> t.List[PhaseReport]:
+    """
+    Restore database by phases: pre-data, data, post-data then analyze.
+    Data and post-data (index builds) phases run with `jobs` workers
+    when the dump format allows it.
+
+    Args:
+        container (Container): db container
+        dbname (str): database name
+        dump_path (Path): dump path in container
+        jobs (int, optional): parallel jobs. Defaults to 1.
+        use_list (t.Optional[str], optional): filtered table of contents path.
+            Defaults to None.
+        foreign_keys_path (t.Optional[str], optional): SQL restoring foreign
+            keys left out of filtered table of contents. Defaults to None.
+        analyze (bool, optional): analyze database once restored. Defaults to True.
+
+    Returns:
+        t.List[PhaseReport]: phases reports
+    """
+    reports = []
+    if dump_path.name.endswith(SPLIT_SUFFIX):
+        phases = [
+            ("pre-data", [_psql(dbname, dump_path / "pre.sql")]),
+            (
+                "data",
+                [
+                    _psql(dbname, dump_path / f"data_{index:02d}.sql")
+                    for index in range(jobs)
+                ],
+            ),
+            ("post-data", [_psql(dbname, dump_path / "post.sql")]),
+        ]
+    elif dump_path.suffix == ".sql":
+        phases = [("plain", [_psql(dbname, dump_path)])]
+    else:
+        command = ["pg_restore", "-U", "odoo", f"--dbname={dbname}"]
+        if use_list:
+            command.append(f"--use-list={use_list}")
+        # tar format does not support parallel restore
+        section_jobs = jobs if dump_path.suffix != ".tar" else 1
+        phases = [
+            (
+                section,
+                [
+                    command
+                    + [f"--section={section}", f"--jobs={section_jobs}"]
+                    + [dump_path.as_posix()]
+                ],
+            )
+            for section in ("pre-data", "data", "post-data")
+        ]
+        if foreign_keys_path:
+            phases.append(("foreign-keys", [_psql(dbname, Path(foreign_keys_path))]))
+    for name, commands in phases:
+        reports.append(_run_phase(container=container, name=name, commands=commands))
+
+    if analyze:
+        reports.append(
+            _run_phase(
+                container=container,
+                name="analyze",
+                commands=[
+                    [
+                        "vacuumdb",
+                        "-q",
+                        "-U",
+                        "odoo",
+                        "--analyze-only",
+                        f"--jobs={jobs}",
+                        dbname,
+                    ]
+                ],
+            )
+        )
+    return reports
@@ -0,0 +1,453 @@
+import enum
+import time
+import typing as t
+from datetime import datetime, timedelta, timezone
+
+from docker.errors import APIError, ImageNotFound, NotFound
+from docker.types import Mount
+from loguru import logger
+
+from odooghost import exceptions
+from odooghost.context import ctx
+from odooghost.services.base import BaseService
+from odooghost.utils import misc
+
+from . import pitr, restore, statements, upgrade
+from .admin import AdminClient
+
+if t.TYPE_CHECKING:
+    from odooghost import config
+    from odooghost.container import Container
+
+
+class DumpFormat(str, enum.Enum):
+    d = "d"
+    c = "c"
+    p = "p"
+    t = "t"
+
+
+class DatabaseInfo(t.NamedTuple):
+    name: str
+    owner: str
+    size: int
+
+
+def list_databases(admin: "AdminClient") -> t.List[DatabaseInfo]:
+    """
+    List databases with their owner and size in one query
+
+    Args:
+        admin (AdminClient): admin client
+
+    Returns:
+        t.List[DatabaseInfo]: databases
+    """
+    result = admin.execute(
+        "SELECT datname, pg_get_userbyid(datdba), pg_database_size(datname) "
+        "FROM pg_database WHERE NOT datistemplate ORDER BY datname"
+    )
+    return [
+        DatabaseInfo(name=name, owner=owner, size=int(size))
+        for name, owner, size in result.rows
+    ]
+
+
+def database_exists(admin: "AdminClient", dbname: str) -> bool:
+    result = admin.execute(
+        "SELECT count(*) FROM pg_database WHERE datname = :'dbname'",
+        params=dict(dbname=dbname),
+    )
+    return result.scalar() == "1"
+
+
+def drop_database(admin: "AdminClient", dbname: str) -> None:
+    params = dict(dbname=dbname)
+    admin.execute_many(
+        [
+            (
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE pid <> pg_backend_pid() AND datname = :'dbname'",
+                params,
+            ),
+            ('DROP DATABASE :"dbname"', params),
+        ],
+        dbname=admin.maintenance_dbname,
+    )
+
+
+def create_database(
+    admin: "AdminClient", dbname: str, template: str = "template1"
+) -> None:
+    admin.execute(
+        'CREATE DATABASE :"dbname" TEMPLATE :"template"',
+        params=dict(dbname=dbname, template=template),
+        dbname=admin.maintenance_dbname,
+    )
+
+
+def dump_database(
+    container: "Container",
+    dbname: str,
+    jobs: int = 4,
+    format: DumpFormat = DumpFormat.d,
+) -> tuple[int, str]:
+    dump_path = f"/tmp/odooghost_dump_{dbname}_{misc.get_now()}"  # nosec B108
+    if format == DumpFormat.p:
+        dump_path += ".sql"
+    elif format == DumpFormat.t:
+        dump_path += ".tar"
+
+    exit_code, data = container.exec_run(
+        command=f"pg_dump -U odoo -F{format.value} {f'-j {jobs}' if format == DumpFormat.d else ''} -f {dump_path}  {dbname}",
+        user="postgres",
+    )
+    if exit_code != 0:
+        logger.warning(data.decode())
+    return exit_code, dump_path
+
+
+class DbService(BaseService):
+    name = "db"
+
+    def __init__(self, stack_config: "config.StackConfig") -> None:
+        super().__init__(stack_config=stack_config)
+
+    def _get_environment(self) -> t.Dict[str, t.Any]:
+        return dict(
+            POSTGRES_DB=self.config.db,
+            POSTGRES_USER=self.config.user or "odoo",
+            POSTGRES_PASSWORD=self.config.password or "odoo",
+        )
+
+    def _get_server_options(self) -> t.List[str]:
+        """
+        Get postgres command line options
+
+        Returns:
+            t.List[str]: postgres options
+        """
+        options = ["-c", f"max_connections={self.config.max_connections}"]
+        if self.config.wal_archive:
+            options += pitr.get_server_options(wal_config=self.config.wal_archive)
+        if self.config.statements:
+            options += statements.get_server_options(
+                statements_config=self.config.statements
+            )
+        return options
+
+    def _get_container_options(self, one_off: bool = False) -> t.Dict[str, t.Any]:
+        options = super()._get_container_options(one_off)
+        mounts = [
+            Mount(
+                source=self.volume_name,
+                target=pitr.DATA_PATH.as_posix(),
+                type="volume",
+            )
+        ]
+        if self.config.wal_archive:
+            mounts.append(
+                Mount(
+                    source=self.archive_volume_name,
+                    target=pitr.ARCHIVE_PATH.as_posix(),
+                    type="volume",
+                )
+            )
+            command = pitr.get_container_command(options=self._get_server_options())
+        else:
+            command = ["postgres", *self._get_server_options()]
+        options.update(dict(command=command, mounts=mounts))
+        return options
+
+    def create_volumes(self) -> None:
+        super().create_volumes()
+        if not self.config.wal_archive:
+            return
+        try:
+            ctx.docker.volumes.create(
+                name=self.archive_volume_name,
+                driver="local",
+                labels=self.labels(),
+            )
+        except APIError as err:
+            raise exceptions.StackVolumeCreateError(
+                f"Failed to create {self.name} archive volume: {err}"
+            )
+
+    def drop_volumes(self) -> None:
+        super().drop_volumes()
+        try:
+            ctx.docker.volumes.get(self.archive_volume_name).remove()
+        except NotFound:
+            pass
+        except APIError as err:
+            logger.error(f"Failed to drop volume {self.archive_volume_name}: {err}")
+
+    def base_backup(self, detach: bool = False) -> None:
+        """
+        Take a base backup of the cluster in archive volume
+
+        Args:
+            detach (bool, optional): run backup in background. Defaults to False.
+
+        Raises:
+            exceptions.StackDatabaseError: When WAL archiving is disabled
+                or backup fail
+        """
+        if not self.config.wal_archive:
+            raise exceptions.StackDatabaseError(
+                f"WAL archiving is not enabled in stack {self.stack_name}"
+            )
+        exit_code, res = self.get_container().exec_run(
+            command=pitr.get_base_backup_command(
+                user=self.config.user or "odoo",
+                keep=self.config.wal_archive.keep_base_backups,
+            ),
+            user="postgres",
+            detach=detach,
+        )
+        if not detach and exit_code != 0:
+            raise exceptions.StackDatabaseError(
+                f"Failed to take base backup: {res.decode()}"
+            )
+
+    def ensure_base_backup(self) -> None:
+        """
+        Take a base backup in background when the last one is older than
+        configured interval
+        """
+        if not self.config.wal_archive:
+            return
+        backups = pitr.list_base_backups(container=self.get_container())
+        interval = timedelta(hours=self.config.wal_archive.base_backup_interval)
+        if backups and datetime.now(timezone.utc) - backups[-1].date < interval:
+            return
+        logger.info("Taking base backup in background ...")
+        self.base_backup(detach=True)
+
+    def recover(self, target: datetime, timeout: int = 600) -> "pitr.BaseBackup":
+        """
+        Rebuild cluster from nearest base backup and replay archived WAL
+        until target. Container is stopped during recovery.
+
+        Args:
+            target (datetime): aware recovery target
+            timeout (int, optional): replay timeout in seconds. Defaults to 600.
+
+        Raises:
+            exceptions.StackDatabaseError: When there is no base backup
+                before target or recovery fail
+
+        Returns:
+            pitr.BaseBackup: base backup used
+        """
+        if not self.config.wal_archive:
+            raise exceptions.StackDatabaseError(
+                f"WAL archiving is not enabled in stack {self.stack_name}"
+            )
+        container = self.get_container()
+        backup = pitr.find_base_backup(
+            backups=pitr.list_base_backups(container=container), target=target
+        )
+        if backup is None:
+            raise exceptions.StackDatabaseError(
+                f"No base backup completed before {target.isoformat()}"
+            )
+        with self.admin() as admin:
+            # archive current WAL segment so recent target can be reached
+            admin.execute("SELECT pg_switch_wal()")
+        logger.info(f"Stopping {container.name} ...")
+        container.stop()
+        container.wait()
+
+        logger.info(f"Restoring base backup {backup.name} ...")
+        helper = self.create_container(
+            one_off=True,
+            command=pitr.get_recovery_command(
+                backup=backup, target=target, version=self.config.version
+            ),
+        )
+        try:
+            helper.start()
+            exit_code = helper.wait()
+            if exit_code != 0:
+                raise exceptions.StackDatabaseError(
+                    f"Failed to restore base backup: {helper.logs().decode()}"
+                )
+        finally:
+            # anonymous volumes declared by image are removed, named ones are kept
+            helper.remove(v=True, force=True)
+
+        logger.info("Replaying WAL ...")
+        container.start()
+        pitr.wait_recovery(
+            container=container, user=self.config.user or "odoo", timeout=timeout
+        )
+        return backup
+
+    def prepare_upgrade(self, version: int) -> str:
+        """
+        Check cluster can be upgraded and ensure upgrade and target postgres
+        images exist, before the data volume is touched
+
+        Args:
+            version (int): target postgres major version
+
+        Raises:
+            exceptions.StackDatabaseError: When database is remote or version
+                is not newer
+            exceptions.StackImagePullError: When an image can not be pulled
+
+        Returns:
+            str: upgrade image tag
+        """
+        if self.is_remote:
+            raise exceptions.StackDatabaseError("Can not upgrade a remote database")
+        if version <= self.config.version:
+            raise exceptions.StackDatabaseError(
+                f"Target version {version} must be newer than {self.config.version}"
+            )
+        image = upgrade.get_upgrade_image(
+            old_version=self.config.version, new_version=version
+        )
+        for image_tag in (image, f"postgres:{version}"):
+            try:
+                ctx.docker.images.get(image_tag)
+                continue
+            except ImageNotFound:
+                pass
+            try:
+                self._do_pull(image_tag=image_tag)
+                ctx.docker.images.get(image_tag)
+            except (APIError, exceptions.StackImageBuildError) as err:
+                raise exceptions.StackImagePullError(
+                    f"Failed to pull image {image_tag}: {err}"
+                )
+        return image
+
+    def upgrade_cluster(self, version: int, jobs: int = 1) -> "restore.PhaseReport":
+        """
+        Upgrade cluster data volume to a new postgres major version in place
+        with pg_upgrade --link, data files are hard linked instead of copied.
+        Container is stopped and must be recreated with new version.
+
+        Args:
+            version (int): target postgres major version
+            jobs (int, optional): pg_upgrade jobs. Defaults to 1.
+
+        Raises:
+            exceptions.StackDatabaseError: When database is remote, version
+                is not newer or upgrade fail
+
+        Returns:
+            restore.PhaseReport: upgrade report
+        """
+        image = self.prepare_upgrade(version=version)
+
+        container = self.get_container()
+        if container.is_running:
+            logger.info(f"Stopping {container.name} ...")
+            container.stop()
+            container.wait()
+
+        mounts = [
+            Mount(
+                source=self.volume_name,
+                target=upgrade.VOLUME_PATH.as_posix(),
+                type="volume",
+            )
+        ]
+        if self.config.wal_archive:
+            mounts.append(
+                Mount(
+                    source=self.archive_volume_name,
+                    target=pitr.ARCHIVE_PATH.as_posix(),
+                    type="volume",
+                )
+            )
+        logger.info(f"Upgrading cluster from {self.config.version} to {version} ...")
+        start = time.monotonic()
+        helper = self.create_container(
+            one_off=True,
+            image=image,
+            entrypoint=upgrade.get_upgrade_command(
+                old_version=self.config.version,
+                new_version=version,
+                user=self.config.user or "odoo",
+                jobs=jobs,
+                purge_archive=bool(self.config.wal_archive),
+            ),
+            command=None,
+            user="root",
+            mounts=mounts,
+        )
+        try:
+            helper.start()
+            exit_code = helper.wait()
+            if exit_code != 0:
+                raise exceptions.StackDatabaseError(
+                    f"Failed to upgrade cluster, it was left in version "
+                    f"{self.config.version}: {helper.logs().decode()}"
+                )
+        finally:
+            # image declared data volumes are anonymous, remove them too
+            helper.remove(v=True, force=True)
+        return restore.PhaseReport(
+            name="upgrade", duration=time.monotonic() - start, exit_code=exit_code
+        )
+
+    def admin(self, dbname: str = "postgres") -> AdminClient:
+        """
+        Get an admin client on service container.
+        The session is opened when entering the client context.
+
+        Args:
+            dbname (str, optional): initial database. Defaults to "postgres".
+
+        Returns:
+            AdminClient: admin client
+        """
+        return AdminClient(
+            container=self.get_container(),
+            user=self.config.user or "odoo",
+            dbname=dbname,
+        )
+
+    def ensure_base_image(self, do_pull: bool = False) -> None:
+        if self.config.type == "remote":
+            logger.warning("Skip postgres image as it's remote type")
+        return super().ensure_base_image(do_pull)
+
+    @property
+    def config(self) -> "config.PostgresStackConfig":
+        return super().config
+
+    @property
+    def archive_volume_name(self) -> str:
+        """
+        WAL archive volume name
+        """
+        return f"odooghost_{self.stack_name}_{self.name}_archive"
+
+    @property
+    def is_remote(self) -> bool:
+        return self.config.type == "remote"
+
+    @property
+    def base_image_tag(self) -> str:
+        return f"postgres:{self.config.version}"
+
+    @property
+    def has_custom_image(self) -> bool:
+        return False
+
+    @property
+    def container_port(self) -> int:
+        return 5432
+
+    @property
+    def health_command(self) -> t.Optional[t.List[str]]:
+        if self.is_remote:
+            return None
+        # entrypoint init server only listens on unix socket
+        return ["pg_isready", "-q", "-h", "127.0.0.1", "-U", self.config.user or "odoo"]
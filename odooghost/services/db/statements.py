@@ -0,0 +1,237 @@
+import enum
+import json
+import re
+import typing as t
+from pathlib import Path
+
+if t.TYPE_CHECKING:
+    from odooghost import config
+
+    from .admin import AdminClient
+
+EXTENSION = "pg_stat_statements"
+WHITESPACE_RE = re.compile(r"\s+")
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+PARAM_RE = re.compile(r"\$\d+")
+# IN (?, ?, ?) and VALUES (?, ?), (?, ?) lists vary with ids count
+LIST_RE = re.compile(
+    r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*"
+)
+
+
+class SortKey(str, enum.Enum):
+    total = "total"
+    mean = "mean"
+    calls = "calls"
+
+
+class StatementStats(t.NamedTuple):
+    query: str
+    calls: int
+    total_time: float
+    rows: int
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+def get_server_options(statements_config: "config.StatementsConfig") -> t.List[str]:
+    """
+    Get postgres options loading pg_stat_statements and logging slow statements
+
+    Args:
+        statements_config (config.StatementsConfig): statements config
+
+    Returns:
+        t.List[str]: postgres options
+    """
+    options = [
+        "-c",
+        f"shared_preload_libraries={EXTENSION}",
+        "-c",
+        f"{EXTENSION}.max={statements_config.max}",
+        "-c",
+        f"{EXTENSION}.track=top",
+    ]
+    if statements_config.log_min_duration is not None:
+        options += [
+            "-c",
+            f"log_min_duration_statement={statements_config.log_min_duration}",
+        ]
+    return options
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize statement so that statements only differing by literals
+    or values lists length are aggregated
+
+    Args:
+        query (str): statement
+
+    Returns:
+        str: normalized statement
+    """
+    query = STRING_RE.sub("?", query)
+    query = PARAM_RE.sub("?", query)
+    query = NUMBER_RE.sub("?", query)
+    query = WHITESPACE_RE.sub(" ", query).strip()
+    return LIST_RE.sub("(...)", query)
+
+
+def aggregate(rows: t.Iterable[StatementStats]) -> t.List[StatementStats]:
+    """
+    Aggregate statements by normalized query
+
+    Args:
+        rows (t.Iterable[StatementStats]): statements
+
+    Returns:
+        t.List[StatementStats]: aggregated statements
+    """
+    statements: t.Dict[str, StatementStats] = {}
+    for row in rows:
+        query = normalize_query(row.query)
+        current = statements.get(query)
+        statements[query] = StatementStats(
+            query=query,
+            calls=row.calls + (current.calls if current else 0),
+            total_time=row.total_time + (current.total_time if current else 0.0),
+            rows=row.rows + (current.rows if current else 0),
+        )
+    return list(statements.values())
+
+
+def ensure_extension(admin: "AdminClient") -> None:
+    """
+    Create pg_stat_statements extension in maintenance database,
+    statistics of every database are read from there
+
+    Args:
+        admin (AdminClient): admin client
+    """
+    admin.execute(
+        f"CREATE EXTENSION IF NOT EXISTS {EXTENSION}",
+        dbname=admin.maintenance_dbname,
+    )
+
+
+def get_statements(
+    admin: "AdminClient", dbname: str, version: int
+) -> t.List[StatementStats]:
+    """
+    Get aggregated statements statistics of a database
+
+    Args:
+        admin (AdminClient): admin client
+        dbname (str): database name
+        version (int): postgres major version
+
+    Returns:
+        t.List[StatementStats]: statements
+    """
+    ensure_extension(admin=admin)
+    total_column = "total_exec_time" if version >= 13 else "total_time"
+    result = admin.execute(
+        f"SELECT s.query, s.calls, s.{total_column}, s.rows FROM {EXTENSION} s "
+        "JOIN pg_database d ON d.oid = s.dbid WHERE d.datname = :'dbname'",
+        params=dict(dbname=dbname),
+        dbname=admin.maintenance_dbname,
+    )
+    return aggregate(
+        StatementStats(
+            query=query or "",
+            calls=int(calls),
+            total_time=float(total_time),
+            rows=int(rows),
+        )
+        for query, calls, total_time, rows in result.rows
+    )
+
+
+def reset(admin: "AdminClient") -> None:
+    """
+    Reset statements statistics of every database
+
+    Args:
+        admin (AdminClient): admin client
+    """
+    ensure_extension(admin=admin)
+    admin.execute(
+        f"SELECT {EXTENSION}_reset()",
+        dbname=admin.maintenance_dbname,
+    )
+
+
+def diff(
+    before: t.List[StatementStats], after: t.List[StatementStats]
+) -> t.List[StatementStats]:
+    """
+    Get statements statistics accumulated between two snapshots
+
+    Args:
+        before (t.List[StatementStats]): first snapshot
+        after (t.List[StatementStats]): second snapshot
+
+    Returns:
+        t.List[StatementStats]: statements run in between
+    """
+    previous = {statement.query: statement for statement in before}
+    statements = []
+    for statement in after:
+        old = previous.get(statement.query)
+        # counters went backward when statistics were reset in between
+        if old is None or old.calls > statement.calls:
+            statements.append(statement)
+            continue
+        if statement.calls == old.calls:
+            continue
+        statements.append(
+            StatementStats(
+                query=statement.query,
+                calls=statement.calls - old.calls,
+                total_time=statement.total_time - old.total_time,
+                rows=statement.rows - old.rows,
+            )
+        )
+    return statements
+
+
+def top(
+    statements: t.List[StatementStats],
+    sort: SortKey = SortKey.total,
+    limit: int = 20,
+) -> t.List[StatementStats]:
+    """
+    Get top statements
+
+    Args:
+        statements (t.List[StatementStats]): statements
+        sort (SortKey, optional): sort key. Defaults to SortKey.total.
+        limit (int, optional): maximum statements. Defaults to 20.
+
+    Returns:
+        t.List[StatementStats]: statements
+    """
+    attributes = {
+        SortKey.total: "total_time",
+        SortKey.mean: "mean_time",
+        SortKey.calls: "calls",
+    }
+    return sorted(
+        statements,
+        key=lambda statement: getattr(statement, attributes[sort]),
+        reverse=True,
+    )[:limit]
+
+
+def save_snapshot(path: Path, statements: t.List[StatementStats]) -> None:
+    with open(path, "w") as stream:
+        json.dump([statement._asdict() for statement in statements], stream)
+
+
+def load_snapshot(path: Path) -> t.List[StatementStats]:
+    with open(path, "r") as stream:
+        return [StatementStats(**data) for data in json.load(stream)]
@@ -0,0 +1,269 @@
+import enum
+import fnmatch
+import re
+import typing as t
+from pathlib import Path
+
+from odooghost import exceptions
+from odooghost.utils import exec
+
+if t.TYPE_CHECKING:
+    from odooghost.container import Container
+
+TABLE_DATA_RE = re.compile(r"^\d+; \d+ \d+ TABLE DATA (?P<schema>\S+) (?P<table>\S+) ")
+FK_CONSTRAINT_RE = re.compile(
+    r"^\d+; \d+ \d+ FK CONSTRAINT (?P<schema>\S+) (?P<table>\S+) (?P<name>\S+) "
+)
+FOREIGN_KEY_RE = re.compile(
+    r"(?P<sql>ALTER TABLE (?:ONLY )?(?P<relation>\S+)\s+"
+    r"ADD CONSTRAINT (?P<name>\S+) FOREIGN KEY \((?P<columns>[^)]*)\) "
+    r"REFERENCES (?P<referenced>[^\s(]+)[^;]*);",
+    re.S,
+)
+
+
+class RestoreProfile(str, enum.Enum):
+    lean = "lean"
+
+
+RESTORE_PROFILES: t.Dict[RestoreProfile, t.List[str]] = {
+    RestoreProfile.lean: [
+        "mail_message",
+        "mail_tracking_value",
+        "mail_mail",
+        "ir_attachment",
+        "ir_logging",
+        "bus_bus",
+    ],
+}
+
+
+class ForeignKey(t.NamedTuple):
+    table: str
+    name: str
+    referenced: str
+    relation: str
+    columns: t.List[str]
+    sql: str
+
+
+class FilteredToc(t.NamedTuple):
+    path: str
+    excluded: t.Set[str]
+    foreign_keys_path: t.Optional[str]
+
+
+def _unqualify(name: str) -> str:
+    return name.split(".")[-1].strip('"')
+
+
+def get_toc(container: "Container", dump_path: Path) -> str:
+    """
+    Get dump table of contents (pg_restore --list)
+
+    Args:
+        container (Container): db container
+        dump_path (Path): dump path in container
+
+    Raises:
+        exceptions.StackDatabaseError: When pg_restore fail
+
+    Returns:
+        str: table of contents
+    """
+    exit_code, res = container.exec_run(
+        command=["pg_restore", "--list", dump_path.as_posix()], user="postgres"
+    )
+    if exit_code != 0:
+        raise exceptions.StackDatabaseError(
+            f"Failed to list dump content: {res.decode()}"
+        )
+    return res.decode()
+
+
+def parse_foreign_keys(sql: str) -> t.List[ForeignKey]:
+    """
+    Parse foreign keys from SQL statements
+
+    Args:
+        sql (str): SQL statements
+
+    Returns:
+        t.List[ForeignKey]: foreign keys
+    """
+    return [
+        ForeignKey(
+            table=_unqualify(match["relation"]),
+            name=match["name"].strip('"'),
+            referenced=_unqualify(match["referenced"]),
+            relation=match["relation"],
+            columns=[column.strip() for column in match["columns"].split(",")],
+            sql=match["sql"],
+        )
+        for match in FOREIGN_KEY_RE.finditer(sql)
+    ]
+
+
+def get_foreign_keys(container: "Container", dump_path: Path) -> t.List[ForeignKey]:
+    """
+    Get foreign keys from dump post-data section
+
+    Args:
+        container (Container): db container
+        dump_path (Path): dump path in container
+
+    Returns:
+        t.List[ForeignKey]: foreign keys
+    """
+    exit_code, res = container.exec_run(
+        command=[
+            "pg_restore",
+            "--section=post-data",
+            "--file=-",
+            dump_path.as_posix(),
+        ],
+        user="postgres",
+    )
+    if exit_code != 0:
+        raise exceptions.StackDatabaseError(
+            f"Failed to read dump post-data: {res.decode()}"
+        )
+    return parse_foreign_keys(sql=res.decode())
+
+
+def get_excluded_tables(tables: t.Iterable[str], patterns: t.List[str]) -> t.Set[str]:
+    """
+    Get tables whose data is excluded
+
+    Args:
+        tables (t.Iterable[str]): dumped tables
+        patterns (t.List[str]): table patterns (fnmatch)
+
+    Returns:
+        t.Set[str]: excluded tables
+    """
+    return {
+        table
+        for table in tables
+        if any(fnmatch.fnmatchcase(table, pattern) for pattern in patterns)
+    }
+
+
+def get_dangling_foreign_keys(
+    foreign_keys: t.List[ForeignKey], excluded: t.Set[str]
+) -> t.List[ForeignKey]:
+    """
+    Get foreign keys of kept tables referencing an excluded table,
+    they would fail to be created in post-data
+
+    Args:
+        foreign_keys (t.List[ForeignKey]): foreign keys
+        excluded (t.Set[str]): excluded tables
+
+    Returns:
+        t.List[ForeignKey]: dangling foreign keys
+    """
+    return [
+        foreign_key
+        for foreign_key in foreign_keys
+        if foreign_key.referenced in excluded and foreign_key.table not in excluded
+    ]
+
+
+def get_foreign_keys_sql(foreign_keys: t.List[ForeignKey]) -> str:
+    """
+    Get SQL restoring dangling foreign keys once data is loaded.
+    Nullable columns are cleared as referenced rows are gone, then
+    constraints are added NOT VALID so remaining rows are not checked.
+
+    Args:
+        foreign_keys (t.List[ForeignKey]): dangling foreign keys
+
+    Returns:
+        str: SQL statements
+    """
+    statements = []
+    for foreign_key in foreign_keys:
+        assignments = ", ".join(f"{column} = NULL" for column in foreign_key.columns)
+        conditions = " OR ".join(
+            f"{column} IS NOT NULL" for column in foreign_key.columns
+        )
+        statements.append(
+            "DO $$ BEGIN\n"
+            f"    UPDATE ONLY {foreign_key.relation} SET {assignments} "
+            f"WHERE {conditions};\n"
+            "EXCEPTION WHEN not_null_violation THEN NULL;\n"
+            "END $$;\n"
+            f"{foreign_key.sql} NOT VALID;\n"
+        )
+    return "".join(statements)
+
+
+def filter_toc(
+    toc: str, patterns: t.List[str], foreign_keys: t.List[ForeignKey]
+) -> t.Tuple[str, t.Set[str], t.List[ForeignKey]]:
+    """
+    Comment out TABLE DATA entries of excluded tables and FK CONSTRAINT
+    entries referencing them. Schema, sequences, indexes and other
+    constraints are kept.
+
+    Args:
+        toc (str): table of contents
+        patterns (t.List[str]): table patterns (fnmatch)
+        foreign_keys (t.List[ForeignKey]): foreign keys
+
+    Returns:
+        t.Tuple[str, t.Set[str], t.List[ForeignKey]]: filtered table of
+            contents, excluded tables and dangling foreign keys
+    """
+    lines = toc.splitlines()
+    tables = [match["table"] for match in map(TABLE_DATA_RE.match, lines) if match]
+    excluded = get_excluded_tables(tables=tables, patterns=patterns)
+    dangling = get_dangling_foreign_keys(foreign_keys=foreign_keys, excluded=excluded)
+    dangling_names = {(foreign_key.table, foreign_key.name) for foreign_key in dangling}
+    filtered = []
+    for line in lines:
+        match = TABLE_DATA_RE.match(line)
+        if match and match["table"] in excluded:
+            line = f";{line}"
+        match = FK_CONSTRAINT_RE.match(line)
+        if match and (match["table"], match["name"]) in dangling_names:
+            line = f";{line}"
+        filtered.append(line)
+    return "\n".join(filtered) + "\n", excluded, dangling
+
+
+def write_filtered_toc(
+    container: "Container", dump_path: Path, patterns: t.List[str]
+) -> FilteredToc:
+    """
+    Write a filtered table of contents next to the dump, with SQL
+    restoring dangling foreign keys when any
+
+    Args:
+        container (Container): db container
+        dump_path (Path): dump path in container
+        patterns (t.List[str]): table patterns (fnmatch)
+
+    Returns:
+        FilteredToc: table of contents path, excluded tables and
+            foreign keys SQL path
+    """
+    toc, excluded, dangling = filter_toc(
+        toc=get_toc(container=container, dump_path=dump_path),
+        patterns=patterns,
+        foreign_keys=get_foreign_keys(container=container, dump_path=dump_path),
+    )
+    toc_path = f"{dump_path.as_posix()}.toc"
+    exec.write_file(container=container, path=toc_path, content=toc)
+    foreign_keys_path = None
+    if dangling:
+        foreign_keys_path = f"{dump_path.as_posix()}.fk.sql"
+        exec.write_file(
+            container=container,
+            path=foreign_keys_path,
+            content=get_foreign_keys_sql(foreign_keys=dangling),
+        )
+    return FilteredToc(
+        path=toc_path, excluded=excluded, foreign_keys_path=foreign_keys_path
+    )
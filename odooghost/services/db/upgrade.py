@@ -0,0 +1,171 @@
+import shlex
+import time
+import typing as t
+from pathlib import PurePosixPath
+
+from loguru import logger
+
+from . import pitr
+from .restore import PhaseReport
+
+if t.TYPE_CHECKING:
+    from odooghost.container import Container
+
+UPGRADE_IMAGE: str = "tianon/postgres-upgrade"
+# data volume root, old and new clusters live side by side in it
+VOLUME_PATH = PurePosixPath("/var/lib/postgresql/upgrade")
+
+
+def get_upgrade_image(old_version: int, new_version: int) -> str:
+    """
+    Get image shipping both postgres versions binaries
+
+    Args:
+        old_version (int): current postgres major version
+        new_version (int): target postgres major version
+
+    Returns:
+        str: image tag
+    """
+    return f"{UPGRADE_IMAGE}:{old_version}-to-{new_version}"
+
+
+def get_bin_path(version: int) -> str:
+    return f"/usr/lib/postgresql/{version}/bin"
+
+
+def get_upgrade_command(
+    old_version: int,
+    new_version: int,
+    user: str,
+    jobs: int = 1,
+    purge_archive: bool = False,
+) -> t.List[str]:
+    """
+    Get command upgrading cluster of data volume with pg_upgrade --link,
+    to run as root in a one off container of upgrade image.
+    Hard links can not cross volumes, so current cluster is moved aside
+    and new cluster is initialized in the same volume before linking.
+    Current cluster is put back if pg_upgrade fail.
+    Archived WAL and base backups can not be replayed by the new version,
+    they are purged when requested.
+
+    Args:
+        old_version (int): current postgres major version
+        new_version (int): target postgres major version
+        user (str): database superuser
+        jobs (int, optional): pg_upgrade jobs. Defaults to 1.
+        purge_archive (bool, optional): purge WAL archive volume mounted
+            in container. Defaults to False.
+
+    Returns:
+        t.List[str]: command
+    """
+    old_bin, new_bin = get_bin_path(old_version), get_bin_path(new_version)
+    initdb = [f"{new_bin}/initdb", "-D", f"{VOLUME_PATH}/.new", "-U", user]
+    pg_upgrade = [
+        f"{new_bin}/pg_upgrade",
+        "--link",
+        f"--jobs={jobs}",
+        "-U",
+        user,
+        "-b",
+        old_bin,
+        "-B",
+        new_bin,
+        "-d",
+        f"{VOLUME_PATH}/.old",
+        "-D",
+        f"{VOLUME_PATH}/.new",
+    ]
+    # initdb enables checksums by default since 18
+    no_checksums = "--no-data-checksums" if new_version >= 18 else ""
+    script = f"""
+set -e
+cd {VOLUME_PATH}
+if [ -e .old ] || [ -e .new ]; then
+    echo "Leftovers of a previous upgrade found in data volume" >&2
+    exit 1
+fi
+mkdir .old
+find . -mindepth 1 -maxdepth 1 ! -name .old -exec mv -t .old {{}} +
+rollback() {{
+    rm -rf .new
+    if [ -f .old/global/pg_control.old ]; then
+        mv .old/global/pg_control.old .old/global/pg_control
+    fi
+    find .old -mindepth 1 -maxdepth 1 -exec mv -t . {{}} +
+    rmdir .old
+}}
+mkdir .new
+chown postgres:postgres . .old .new
+chmod 700 .old .new
+if {old_bin}/pg_controldata .old | grep -q "checksum version: *[1-9]"; then
+    checksums=--data-checksums
+else
+    checksums={no_checksums}
+fi
+cd /tmp
+if ! gosu postgres {shlex.join(initdb)} $checksums \\
+    || ! gosu postgres {shlex.join(pg_upgrade)}; then
+    cat /tmp/*.log {VOLUME_PATH}/.new/pg_upgrade_output.d/*/log/*.log 2>/dev/null || true
+    cd {VOLUME_PATH}
+    rollback
+    exit 1
+fi
+cd {VOLUME_PATH}
+cp .old/pg_hba.conf .new/pg_hba.conf
+echo "listen_addresses = '*'" >> .new/postgresql.conf
+rm -rf .old .new/pg_upgrade_output.d
+find .new -mindepth 1 -maxdepth 1 -exec mv -t . {{}} +
+rmdir .new
+"""
+    if purge_archive:
+        script += f"rm -rf {pitr.WAL_PATH} {pitr.BASE_PATH}\n"
+    return ["bash", "-c", script]
+
+
+def analyze_cluster(
+    container: "Container", user: str, jobs: int = 1, timeout: int = 60
+) -> PhaseReport:
+    """
+    Rebuild optimizer statistics of all databases, pg_upgrade does not
+    transfer them. Minimal statistics are generated first so the cluster
+    is usable early.
+
+    Args:
+        container (Container): upgraded db container
+        user (str): database superuser
+        jobs (int, optional): vacuumdb jobs. Defaults to 1.
+        timeout (int, optional): server start timeout in seconds. Defaults to 60.
+
+    Returns:
+        PhaseReport: analyze report
+    """
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        exit_code, _ = container.exec_run(
+            command=["pg_isready", "-q", "-U", user], user="postgres"
+        )
+        if exit_code == 0:
+            break
+        time.sleep(1)
+    logger.info("Analyzing databases ...")
+    start = time.monotonic()
+    exit_code, res = container.exec_run(
+        command=[
+            "vacuumdb",
+            "-q",
+            "-U",
+            user,
+            "--all",
+            "--analyze-in-stages",
+            f"--jobs={jobs}",
+        ],
+        user="postgres",
+    )
+    if exit_code != 0:
+        logger.warning(res.decode())
+    return PhaseReport(
+        name="analyze", duration=time.monotonic() - start, exit_code=exit_code
+    )
@@ -0,0 +1,121 @@
+import typing as t
+
+from docker.errors import APIError
+from loguru import logger
+
+from odooghost import exceptions, renderer
+
+from .base import BaseService
+from .odoo import tuning
+from .odoo.service import LONGPOLLING_PORT, get_replica_hostname
+
+if t.TYPE_CHECKING:
+    from odooghost import config
+
+CONF_PATH: str = "/etc/nginx/conf.d/default.conf"
+# config is kept across container restarts, reload replaces it
+START_COMMAND: str = (
+    f'grep -qs "upstream odooghost" {CONF_PATH} '
+    f'|| printf "%s" "$NGINX_CONF" > {CONF_PATH}; '
+    'exec nginx -g "daemon off;"'
+)
+RELOAD_COMMAND: str = (
+    f"cp {CONF_PATH} {CONF_PATH}.bak "
+    f'&& printf "%s" "$NGINX_CONF" > {CONF_PATH} '
+    "&& nginx -t -q && nginx -s reload "
+    f"|| {{ cp {CONF_PATH}.bak {CONF_PATH}; exit 1; }}"
+)
+
+
+class LoadBalancerService(BaseService):
+    name = "lb"
+
+    def __init__(self, stack_config: "config.StackConfig") -> None:
+        super().__init__(stack_config=stack_config)
+
+    def _get_container_options(self, one_off: bool = False) -> t.Dict[str, t.Any]:
+        options = super()._get_container_options(one_off)
+        options.update(command=["sh", "-c", START_COMMAND])
+        return options
+
+    def _get_environment(self) -> t.Dict[str, t.Any]:
+        return dict(NGINX_CONF=self.render_config())
+
+    def _get_ports_map(self) -> dict:
+        return {
+            f"{self.container_port}/tcp": self.config.service_port
+            or self.stack_config.services.odoo.service_port
+        }
+
+    def render_config(self) -> str:
+        """
+        Render nginx config balancing requests over Odoo replicas
+
+        Returns:
+            str: nginx config
+        """
+        odoo_config = self.stack_config.services.odoo
+        odoo_port = 8069
+        hosts = [
+            get_replica_hostname(stack_config=self.stack_config, replica=replica)
+            for replica in range(1, odoo_config.replicas + 1)
+        ]
+        if self.stack_config.services.gevent is not None:
+            bus_servers = [
+                f"{self.stack_config.get_service_hostname(service='gevent')}:"
+                f"{LONGPOLLING_PORT}"
+            ]
+        else:
+            bus_port = (
+                LONGPOLLING_PORT
+                if tuning.has_workers(odoo_config=odoo_config)
+                else odoo_port
+            )
+            bus_servers = [f"{host}:{bus_port}" for host in hosts]
+        return renderer.render_nginx_conf(
+            http_servers=[f"{host}:{odoo_port}" for host in hosts],
+            bus_servers=bus_servers,
+            bus_path="/websocket" if odoo_config.version >= 16 else "/longpolling",
+            listen_port=self.container_port,
+        )
+
+    def reload(self) -> None:
+        """
+        Apply config to running load balancer without dropping connections
+
+        Raises:
+            exceptions.StackLoadBalancerError: When config is rejected by nginx
+        """
+        container = self.get_container(raise_not_found=False)
+        if container is None or not container.is_running:
+            return
+        logger.info("Reloading load balancer ...")
+        try:
+            exit_code, output = container.exec_run(
+                command=["sh", "-c", RELOAD_COMMAND],
+                environment=self._get_environment(),
+            )
+        except APIError as err:
+            raise exceptions.StackLoadBalancerError(
+                f"Failed to reload load balancer: {err}"
+            )
+        if exit_code != 0:
+            raise exceptions.StackLoadBalancerError(
+                f"Failed to reload load balancer: {output.decode(errors='replace')}"
+            )
+
+    @property
+    def config(self) -> "config.LoadBalancerStackConfig":
+        return super().config
+
+    @property
+    def base_image_tag(self) -> str:
+        return f"nginx:{self.config.version}"
+
+    @property
+    def has_custom_image(self) -> bool:
+        return False
+
+    @property
+    def container_port(self) -> int:
+        return 8069
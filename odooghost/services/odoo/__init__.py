@@ -1,3 +1,31 @@
+from . import (
+    addons_sync,
+    bench,
+    conf,
+    filestore,
+    http_stats,
+    modules,
+    profiling,
+    templates,
+    testing,
+    tuning,
+)
+from .gevent import GeventService
 from .service import OdooService, get_filestore_path
 
-__all__ = ("OdooService", "get_filestore_path")
+__all__ = (
+    "addons_sync",
+    "bench",
+    "conf",
+    "filestore",
+    "gevent",
+    "http_stats",
+    "modules",
+    "profiling",
+    "templates",
+    "testing",
+    "tuning",
+    "GeventService",
+    "OdooService",
+    "get_filestore_path",
+)
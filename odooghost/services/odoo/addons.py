@@ -1,6 +1,8 @@
+import hashlib
 import typing as t
 from pathlib import Path
 
+from git import InvalidGitRepositoryError
 from loguru import logger
 
 from odooghost.context import ctx
@@ -65,6 +67,101 @@ class AddonsHandler:
         logger.info(addons_path)
         return ",".join(addons_path)
 
+    def get_revisions(self, mode: t.Optional[str] = None) -> t.Dict[str, str]:
+        """
+        Get addons revisions: git HEAD with submodules commits, suffixed
+        with a digest of uncommitted changes. Addons outside of a git
+        repository get a digest of their files size and mtime.
+
+        Args:
+            mode (t.Optional[str], optional): only addons of this mode.
+                Defaults to None.
+
+        Returns:
+            t.Dict[str, str]: revision by addons name hash
+        """
+        revisions = {}
+        for addon in self._get_addons(mode=mode):
+            path = addon.path or self.get_context_path(addon)
+            digest = hashlib.sha256()
+            try:
+                repo = Repo(path.as_posix())
+            except InvalidGitRepositoryError:
+                for file in sorted(path.rglob("*")):
+                    if file.is_file():
+                        stat = file.stat()
+                        digest.update(
+                            f"{file} {stat.st_size} {stat.st_mtime_ns}".encode()
+                        )
+                revisions[addon.name_hash] = digest.hexdigest()
+                continue
+            revision = "-".join(
+                [repo.head.commit.hexsha, *(sm.hexsha for sm in repo.submodules)]
+            )
+            if repo.is_dirty(untracked_files=True):
+                digest.update(repo.git.diff("HEAD").encode())
+                digest.update("\n".join(repo.untracked_files).encode())
+                revision += f"-dirty-{digest.hexdigest()[:12]}"
+            revisions[addon.name_hash] = revision
+        return revisions
+
+    def _get_repos(self) -> t.Generator[Repo, None, None]:
+        for addon in self._get_addons():
+            path = addon.path or self.get_context_path(addon)
+            try:
+                repo = Repo(path.as_posix())
+            except InvalidGitRepositoryError:
+                logger.warning(f"Addons {addon.name} is not a git repository")
+                continue
+            yield repo
+            for sm in repo.submodules:
+                if sm.module_exists():
+                    yield sm.module()
+
+    def get_heads(self) -> t.Dict[str, str]:
+        """
+        Get git HEAD of addons repositories and their submodules
+
+        Returns:
+            t.Dict[str, str]: commit by repository path
+        """
+        return {
+            repo.working_tree_dir: repo.head.commit.hexsha for repo in self._get_repos()
+        }
+
+    def get_changed_modules(self, since: t.Union[str, t.Dict[str, str]]) -> t.List[str]:
+        """
+        Get modules changed in addons repositories working trees,
+        untracked files included
+
+        Args:
+            since (t.Union[str, t.Dict[str, str]]): git ref compared in
+                every repository or commit by repository path, repositories
+                without commit are skipped
+
+        Returns:
+            t.List[str]: changed modules names
+        """
+        modules = set()
+        for repo in self._get_repos():
+            root = Path(repo.working_tree_dir)
+            ref = since if isinstance(since, str) else since.get(root.as_posix())
+            if ref is None:
+                logger.warning(f"No known revision for {root}, skipping it")
+                continue
+            files = repo.git.diff("--name-only", ref).splitlines()
+            for file in (*files, *repo.untracked_files):
+                path = root / file
+                for folder in path.parents:
+                    if folder == root or root not in folder.parents:
+                        break
+                    if (folder / "__manifest__.py").exists() or (
+                        folder / "__openerp__.py"
+                    ).exists():
+                        modules.add(folder.name)
+                        break
+        return sorted(modules)
+
     def get_context_path(self, addons_config: "AddonsConfig") -> Path:
         real_path = ctx.config.working_dir / str(self.odoo_version) / addons_config.org
         if not real_path.exists():
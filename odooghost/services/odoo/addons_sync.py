@@ -0,0 +1,154 @@
+import json
+import typing as t
+from pathlib import Path, PurePosixPath
+
+from docker.errors import APIError
+from loguru import logger
+
+from odooghost import exceptions
+from odooghost.utils import exec, manifest
+from odooghost.utils.stream import tar_stream
+
+if t.TYPE_CHECKING:
+    from odooghost.container import Container
+
+# versioning and bytecode files are neither synced nor deleted
+IGNORED_NAMES: t.FrozenSet[str] = frozenset((".git", "__pycache__"))
+
+
+class AddonsSyncReport(t.NamedTuple):
+    transfered: int
+    size: int
+    deleted: int
+
+
+def get_manifest_path(dest: str) -> str:
+    # stored next to addons folder so Odoo never scans it
+    return f"{dest}.manifest.json"
+
+
+def _filter_manifest(items: manifest.Manifest) -> manifest.Manifest:
+    return {
+        path: item
+        for path, item in items.items()
+        if IGNORED_NAMES.isdisjoint(path.split("/"))
+    }
+
+
+def get_source_manifest(source: Path, jobs: int = 4) -> manifest.Manifest:
+    """
+    Build manifest of addons folder on host
+
+    Args:
+        source (Path): addons folder on host
+        jobs (int, optional): concurrent hashing threads. Defaults to 4.
+
+    Returns:
+        manifest.Manifest: manifest
+    """
+    return _filter_manifest(manifest.build_manifest(root=source, jobs=jobs))
+
+
+def get_container_manifest(container: "Container", dest: str) -> manifest.Manifest:
+    """
+    Get manifest stored in container by last sync, built from addons
+    files in container when missing
+
+    Args:
+        container (Container): odoo container
+        dest (str): addons path in container
+
+    Raises:
+        exceptions.StackException: When manifest can not be built
+
+    Returns:
+        manifest.Manifest: manifest
+    """
+    exit_code, res = container.exec_run(
+        command=["cat", get_manifest_path(dest)], stderr=False
+    )
+    if exit_code == 0:
+        try:
+            return {
+                path: tuple(item) for path, item in json.loads(res.decode()).items()
+            }
+        except ValueError:
+            logger.warning(f"Ignoring invalid addons manifest in {container.name}")
+    return _filter_manifest(
+        manifest.get_container_manifest(container=container, root=dest)
+    )
+
+
+def sync_addons(
+    container: "Container",
+    source: Path,
+    dest: str,
+    source_manifest: manifest.Manifest,
+    dry_run: bool = False,
+) -> AddonsSyncReport:
+    """
+    Sync copy mode addons folder in container.
+    Changed files are sent in one tar stream, files missing from source
+    are deleted and source manifest is stored for next sync.
+
+    Args:
+        container (Container): odoo container
+        source (Path): addons folder on host
+        dest (str): addons path in container
+        source_manifest (manifest.Manifest): manifest of source
+        dry_run (bool, optional): only compute changes. Defaults to False.
+
+    Raises:
+        exceptions.StackException: When files upload or deletion fail
+
+    Returns:
+        AddonsSyncReport: sync report
+    """
+    diff = manifest.diff_manifests(
+        source=source_manifest,
+        dest=get_container_manifest(container=container, dest=dest),
+    )
+    report = AddonsSyncReport(
+        transfered=len(diff.changed), size=diff.size, deleted=len(diff.extra)
+    )
+    if dry_run or not (diff.changed or diff.extra):
+        return report
+
+    dest_path = PurePosixPath(dest)
+    if diff.changed:
+        try:
+            container.put_archive(
+                path=dest_path.parent.as_posix(),
+                data=tar_stream(
+                    source=source, arcname=dest_path.name, paths=diff.changed
+                ),
+            )
+        except APIError as err:
+            raise exceptions.StackException(
+                f"Failed to upload addons in {container.name}: {err}"
+            )
+        exec.set_permissions(container=container, path=dest)
+    for index in range(0, len(diff.extra), 1000):
+        exit_code, res = container.exec_run(
+            command=["rm", "-f", "--"]
+            + [
+                (dest_path / path).as_posix()
+                for path in diff.extra[index : index + 1000]
+            ],
+            user="root",
+        )
+        if exit_code != 0:
+            raise exceptions.StackException(
+                f"Failed to delete addons files in {container.name}: {res.decode()}"
+            )
+    try:
+        exec.write_file(
+            container=container,
+            path=get_manifest_path(dest),
+            content=json.dumps(source_manifest),
+        )
+    except APIError as err:
+        raise exceptions.StackException(
+            f"Failed to store addons manifest in {container.name}: {err}"
+        )
+    return report
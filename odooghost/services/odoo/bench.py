@@ -0,0 +1,315 @@
+import asyncio
+import json
+import random
+import time
+import typing as t
+from pathlib import Path
+
+from odooghost import exceptions
+from odooghost.utils.http import ConnectionPool, HttpResponse
+from odooghost.utils.misc import get_now
+from odooghost.utils.sketch import QuantileSketch
+
+if t.TYPE_CHECKING:
+    from odooghost import config
+
+QUANTILES: t.Tuple[float, ...] = (0.5, 0.95, 0.99)
+
+
+class ScenarioStats:
+    """
+    Latency distribution and errors of a bench scenario
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.errors = 0
+        self.latency = QuantileSketch()
+
+    @property
+    def requests(self) -> int:
+        return self.latency.count + self.errors
+
+    def summarize(self, duration: float) -> "ScenarioSummary":
+        return ScenarioSummary(
+            name=self.name,
+            requests=self.requests,
+            errors=self.errors,
+            throughput=self.requests / duration if duration else 0.0,
+            mean=self.latency.mean,
+            max=self.latency.max,
+            percentiles={
+                f"p{int(quantile * 100)}": self.latency.quantile(quantile)
+                for quantile in QUANTILES
+            },
+        )
+
+
+class ScenarioSummary(t.NamedTuple):
+    name: str
+    requests: int
+    errors: int
+    throughput: float
+    mean: float
+    max: float
+    percentiles: t.Dict[str, float]
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+
+class BenchReport(t.NamedTuple):
+    date: str
+    duration: float
+    concurrency: int
+    rate: t.Optional[float]
+    total: ScenarioSummary
+    scenarios: t.List[ScenarioSummary]
+
+    def to_dict(self) -> t.Dict[str, t.Any]:
+        return dict(
+            self._asdict(),
+            total=self.total._asdict(),
+            scenarios=[scenario._asdict() for scenario in self.scenarios],
+        )
+
+    @classmethod
+    def from_dict(cls, data: t.Dict[str, t.Any]) -> "BenchReport":
+        return cls(
+            **dict(
+                data,
+                total=ScenarioSummary(**data["total"]),
+                scenarios=[
+                    ScenarioSummary(**scenario) for scenario in data["scenarios"]
+                ],
+            )
+        )
+
+
+class RateLimiter:
+    """
+    Spread requests of all clients evenly to reach a global rate
+    """
+
+    def __init__(self, rate: t.Optional[float]) -> None:
+        self.interval = 1 / rate if rate else 0.0
+        self._next = time.monotonic()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(self._next, now)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def _json_rpc(params: t.Dict[str, t.Any]) -> bytes:
+    return json.dumps(
+        dict(jsonrpc="2.0", method="call", id=random.randint(0, 1000000), params=params)
+    ).encode()
+
+
+def get_request(
+    scenario: "config.BenchScenarioConfig",
+) -> t.Tuple[str, str, t.Optional[bytes]]:
+    """
+    Get HTTP request of a scenario
+
+    Args:
+        scenario (config.BenchScenarioConfig): scenario
+
+    Returns:
+        t.Tuple[str, str, t.Optional[bytes]]: method, path and body
+    """
+    if scenario.type == "page":
+        return "GET", scenario.path, None
+    if scenario.type == "report":
+        ids = ",".join(str(record_id) for record_id in scenario.ids)
+        return "GET", f"/report/pdf/{scenario.report}/{ids}", None
+    return (
+        "POST",
+        f"/web/dataset/call_kw/{scenario.model}/{scenario.method}",
+        _json_rpc(
+            dict(
+                model=scenario.model,
+                method=scenario.method,
+                args=scenario.args,
+                kwargs=scenario.kwargs,
+            )
+        ),
+    )
+
+
+def is_error(scenario: "config.BenchScenarioConfig", response: HttpResponse) -> bool:
+    if response.status >= 400:
+        return True
+    if scenario.type == "rpc":
+        try:
+            return "error" in json.loads(response.body)
+        except ValueError:
+            return True
+    return False
+
+
+async def login(
+    pool: ConnectionPool, bench_config: "config.BenchConfig", dbname: str
+) -> str:
+    """
+    Authenticate bench user
+
+    Args:
+        pool (ConnectionPool): connection pool
+        bench_config (config.BenchConfig): bench config
+        dbname (str): database name
+
+    Raises:
+        exceptions.StackBenchError: When authentication fails
+
+    Returns:
+        str: session id
+    """
+    try:
+        response = await pool.request(
+            method="POST",
+            path="/web/session/authenticate",
+            body=_json_rpc(
+                dict(
+                    db=dbname,
+                    login=bench_config.login,
+                    password=bench_config.password,
+                )
+            ),
+            headers={"Content-Type": "application/json"},
+        )
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as err:
+        raise exceptions.StackBenchError(f"Failed to reach Odoo: {err}") from err
+    try:
+        result = json.loads(response.body)
+    except ValueError:
+        result = {}
+    if response.status != 200 or not (result.get("result") or {}).get("uid"):
+        message = (result.get("error") or {}).get("data", {}).get("message")
+        raise exceptions.StackBenchError(
+            f"Failed to log in {bench_config.login} on {dbname}: "
+            f"{message or f'HTTP {response.status}'}"
+        )
+    session_id = response.cookies.get("session_id")
+    if not session_id:
+        raise exceptions.StackBenchError("Odoo did not return a session cookie")
+    return session_id
+
+
+async def _client(
+    pool: ConnectionPool,
+    scenarios: t.List["config.BenchScenarioConfig"],
+    stats: t.Dict[str, ScenarioStats],
+    session_id: str,
+    limiter: RateLimiter,
+    deadline: float,
+) -> None:
+    weights = [scenario.weight for scenario in scenarios]
+    headers = {"Cookie": f"session_id={session_id}"}
+    while time.monotonic() < deadline:
+        await limiter.wait()
+        if time.monotonic() >= deadline:
+            return
+        scenario = random.choices(scenarios, weights=weights)[0]
+        method, path, body = get_request(scenario)
+        start = time.perf_counter()
+        try:
+            response = await pool.request(
+                method=method,
+                path=path,
+                body=body,
+                headers=dict(headers, **{"Content-Type": "application/json"})
+                if body
+                else headers,
+            )
+        except (OSError, asyncio.TimeoutError, ValueError, asyncio.IncompleteReadError):
+            stats[scenario.name].errors += 1
+            continue
+        if is_error(scenario=scenario, response=response):
+            stats[scenario.name].errors += 1
+        else:
+            stats[scenario.name].latency.add(time.perf_counter() - start)
+
+
+async def run_bench(
+    host: str,
+    port: int,
+    bench_config: "config.BenchConfig",
+    dbname: str,
+    concurrency: int = 10,
+    duration: float = 30,
+    rate: t.Optional[float] = None,
+) -> BenchReport:
+    """
+    Replay bench scenarios against Odoo with concurrent clients
+    sharing a pool of keep-alive connections
+
+    Args:
+        host (str): Odoo host
+        port (int): Odoo port
+        bench_config (config.BenchConfig): bench config
+        dbname (str): database name
+        concurrency (int, optional): concurrent clients. Defaults to 10.
+        duration (float, optional): bench seconds. Defaults to 30.
+        rate (t.Optional[float], optional): maximum requests per second,
+            unlimited when not set. Defaults to None.
+
+    Returns:
+        BenchReport: report
+    """
+    pool = ConnectionPool(host=host, port=port, size=concurrency)
+    try:
+        session_id = await login(pool=pool, bench_config=bench_config, dbname=dbname)
+        stats = {
+            scenario.name: ScenarioStats(name=scenario.name)
+            for scenario in bench_config.scenarios
+        }
+        limiter = RateLimiter(rate=rate)
+        start = time.monotonic()
+        await asyncio.gather(
+            *(
+                _client(
+                    pool=pool,
+                    scenarios=bench_config.scenarios,
+                    stats=stats,
+                    session_id=session_id,
+                    limiter=limiter,
+                    deadline=start + duration,
+                )
+                for _ in range(concurrency)
+            )
+        )
+        elapsed = time.monotonic() - start
+    finally:
+        await pool.close()
+    total = ScenarioStats(name="total")
+    for scenario_stats in stats.values():
+        total.errors += scenario_stats.errors
+        total.latency.merge(scenario_stats.latency)
+    return BenchReport(
+        date=get_now(),
+        duration=elapsed,
+        concurrency=concurrency,
+        rate=rate,
+        total=total.summarize(duration=elapsed),
+        scenarios=[
+            scenario_stats.summarize(duration=elapsed)
+            for scenario_stats in stats.values()
+        ],
+    )
+
+
+def save_report(path: Path, report: BenchReport) -> None:
+    with open(path, "w") as stream:
+        json.dump(report.to_dict(), stream, indent=2)
+
+
+def load_report(path: Path) -> BenchReport:
+    with open(path, "r") as stream:
+        return BenchReport.from_dict(json.load(stream))
@@ -0,0 +1,65 @@
+import configparser
+import io
+import typing as t
+from pathlib import Path
+
+from odooghost.context import ctx
+
+CONTAINER_PATH: str = "/etc/odoo/odoo.conf"
+
+
+def get_path(stack_name: str, one_off: bool = False) -> Path:
+    """
+    Get host path of Odoo config file, one off containers get their own
+    file without tuning
+
+    Args:
+        stack_name (str): Stack name
+        one_off (bool, optional): one off container config. Defaults to False.
+
+    Returns:
+        Path: config file path
+    """
+    return ctx.get_stack_data_path(stack_name=stack_name) / (
+        "odoo-run.conf" if one_off else "odoo.conf"
+    )
+
+
+def render(options: t.Dict[str, t.Any]) -> str:
+    """
+    Render Odoo config file, options without value are left out
+    and lists are comma separated
+
+    Args:
+        options (t.Dict[str, t.Any]): options
+
+    Returns:
+        str: config file content
+    """
+    parser = configparser.ConfigParser(interpolation=None)
+    parser["options"] = {
+        name: ",".join(map(str, value)) if isinstance(value, list) else str(value)
+        for name, value in options.items()
+        if value is not None
+    }
+    stream = io.StringIO()
+    parser.write(stream)
+    return stream.getvalue()
+
+
+def write(path: Path, options: t.Dict[str, t.Any]) -> bool:
+    """
+    Write Odoo config file when its content changed
+
+    Args:
+        path (Path): config file path
+        options (t.Dict[str, t.Any]): options
+
+    Returns:
+        bool: file changed
+    """
+    content = render(options=options)
+    if path.exists() and path.read_text() == content:
+        return False
+    path.write_text(content)
+    return True
@@ -0,0 +1,249 @@
+import tarfile
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+
+from docker.errors import APIError
+from loguru import logger
+
+from odooghost import exceptions
+from odooghost.utils import exec, manifest
+from odooghost.utils.stream import ChunksReader, tar_stream
+
+if t.TYPE_CHECKING:
+    from odooghost.container import Container
+
+# extraction filter is only availible in security releases since python 3.8.17
+EXTRACT_OPTIONS = dict(filter="data") if hasattr(tarfile, "data_filter") else {}
+
+
+def list_shards(container: "Container", path: str) -> t.List[str]:
+    """
+    List filestore shards, Odoo stores attachments in hash prefix folders
+
+    Args:
+        container (Container): odoo container
+        path (str): filestore path
+
+    Raises:
+        exceptions.StackException: When listing fail
+
+    Returns:
+        t.List[str]: shards names
+    """
+    exit_code, res = container.exec_run(
+        command=["find", path, "-mindepth", "1", "-maxdepth", "1", "-print0"]
+    )
+    if exit_code != 0:
+        raise exceptions.StackException(
+            f"Failed to list filestore {path}: {res.decode()}"
+        )
+    return sorted(
+        PurePosixPath(shard).name for shard in res.decode().split("\0") if shard
+    )
+
+
+def _map(jobs: int, func: t.Callable, items: t.List[t.Any]) -> t.List[t.Any]:
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(items)))) as executor:
+        return list(executor.map(func, items))
+
+
+def dump_filestore(container: "Container", path: str, dest: Path, jobs: int = 4) -> int:
+    """
+    Dump filestore in a folder with one tar stream per shard
+
+    Args:
+        container (Container): odoo container
+        path (str): filestore path in container
+        dest (Path): destination folder, created if needed
+        jobs (int, optional): concurrent streams. Defaults to 4.
+
+    Returns:
+        int: transfered shards count
+    """
+    shards = list_shards(container=container, path=path)
+    dest.mkdir(parents=True, exist_ok=True)
+
+    def _dump_shard(shard: str) -> None:
+        try:
+            data, _ = container.get_archive(
+                path=(PurePosixPath(path) / shard).as_posix()
+            )
+            with tarfile.open(fileobj=ChunksReader(data), mode="r|") as tar:
+                tar.extractall(path=dest, **EXTRACT_OPTIONS)  # nosec B202
+        except APIError as err:
+            raise exceptions.StackException(
+                f"Failed to dump filestore shard {shard}: {err}"
+            )
+        logger.debug(f"Dumped filestore shard {shard}")
+
+    _map(jobs, _dump_shard, shards)
+    return len(shards)
+
+
+def upload_shards(
+    container: "Container",
+    source: Path,
+    dest: str,
+    shards: t.Union[t.List[str], t.Dict[str, t.List[str]]],
+    jobs: int = 4,
+    user: str = "odoo",
+    group: str = "odoo",
+) -> int:
+    """
+    Upload filestore shards with one tar stream each.
+    Ownership is fixed on uploaded shards only.
+
+    Args:
+        container (Container): odoo container
+        source (Path): filestore folder on host
+        dest (str): filestore path in container, must exist
+        shards (t.Union[t.List[str], t.Dict[str, t.List[str]]]): shards names
+            to upload, or only some of their files paths by shard name
+        jobs (int, optional): concurrent streams. Defaults to 4.
+        user (str, optional): files owner. Defaults to "odoo".
+        group (str, optional): files group. Defaults to "odoo".
+
+    Raises:
+        exceptions.StackException: When a shard upload fail
+
+    Returns:
+        int: uploaded shards count
+    """
+
+    def _upload_shard(shard: str) -> None:
+        try:
+            container.put_archive(
+                path=dest,
+                data=tar_stream(
+                    source=source / shard,
+                    arcname=shard,
+                    paths=shards[shard] if isinstance(shards, dict) else None,
+                ),
+            )
+        except APIError as err:
+            raise exceptions.StackException(
+                f"Failed to upload filestore shard {shard}: {err}"
+            )
+        exec.set_permissions(
+            container=container,
+            path=(PurePosixPath(dest) / shard).as_posix(),
+            user=user,
+            group=group,
+        )
+        logger.debug(f"Uploaded filestore shard {shard}")
+
+    _map(jobs, _upload_shard, list(shards))
+    return len(shards)
+
+
+def restore_filestore(
+    container: "Container", source: Path, dest: str, jobs: int = 4
+) -> int:
+    """
+    Restore a filestore folder with one tar stream per shard
+
+    Args:
+        container (Container): odoo container
+        source (Path): filestore folder on host
+        dest (str): filestore path in container
+        jobs (int, optional): concurrent streams. Defaults to 4.
+
+    Returns:
+        int: uploaded shards count
+    """
+    exec.create_folder(container=container, folder_path=dest)
+    exec.set_permissions(container=container, path=dest, recursive=False)
+    return upload_shards(
+        container=container,
+        source=source,
+        dest=dest,
+        shards=sorted(item.name for item in source.iterdir()),
+        jobs=jobs,
+    )
+
+
+class SyncReport(t.NamedTuple):
+    transfered: int
+    size: int
+    deleted: int
+    shards: int
+
+
+def sync_filestore(
+    container: "Container",
+    source: Path,
+    dest: str,
+    jobs: int = 4,
+    delete: bool = False,
+    dry_run: bool = False,
+) -> SyncReport:
+    """
+    Sync a filestore folder in container.
+    Only missing or changed files are transfered, comparing manifests
+    of both sides. Attachments are named after their sha1, only their
+    path and size are compared.
+
+    Args:
+        container (Container): odoo container
+        source (Path): filestore folder on host
+        dest (str): filestore path in container
+        jobs (int, optional): concurrent hashing threads and streams.
+            Defaults to 4.
+        delete (bool, optional): delete files missing from source.
+            Defaults to False.
+        dry_run (bool, optional): only compute changes. Defaults to False.
+
+    Raises:
+        exceptions.StackException: When files deletion fail
+
+    Returns:
+        SyncReport: sync report
+    """
+    diff = manifest.diff_manifests(
+        source=manifest.build_manifest(root=source, jobs=jobs, content_addressed=True),
+        dest=manifest.get_container_manifest(
+            container=container, root=dest, content_addressed=True
+        ),
+    )
+    extra = diff.extra if delete else []
+    shards: t.Dict[str, t.List[str]] = {}
+    for path in diff.changed:
+        shard, _, rel = path.partition("/")
+        shards.setdefault(shard, []).append(rel or ".")
+    report = SyncReport(
+        transfered=len(diff.changed),
+        size=diff.size,
+        deleted=len(extra),
+        shards=len(shards),
+    )
+    if dry_run:
+        return report
+
+    if shards:
+        exec.create_folder(container=container, folder_path=dest)
+        exec.set_permissions(container=container, path=dest, recursive=False)
+        upload_shards(
+            container=container, source=source, dest=dest, shards=shards, jobs=jobs
+        )
+    for index in range(0, len(extra), 1000):
+        exit_code, res = container.exec_run(
+            command=["rm", "-f", "--"]
+            + [
+                (PurePosixPath(dest) / path).as_posix()
+                for path in extra[index : index + 1000]
+            ],
+            user="root",
+        )
+        if exit_code != 0:
+            raise exceptions.StackException(
+                f"Failed to delete filestore files: {res.decode()}"
+            )
+    if extra:
+        container.exec_run(
+            command=["find", dest, "-mindepth", "1", "-type", "d", "-empty", "-delete"],
+            user="root",
+        )
+    return report
@@ -0,0 +1,84 @@
+import shlex
+import typing as t
+
+from odooghost.services.base import BaseService
+
+from .service import LONGPOLLING_PORT, OdooService, get_health_command
+
+if t.TYPE_CHECKING:
+    from odooghost import config
+
+
+class GeventService(BaseService):
+    """
+    Odoo bus served by a dedicated evented Odoo process, so chat and
+    notifications do not compete with HTTP workers
+    """
+
+    name = "gevent"
+
+    def __init__(self, stack_config: "config.StackConfig") -> None:
+        super().__init__(stack_config=stack_config)
+        self.odoo = OdooService(stack_config=stack_config)
+
+    def _get_environment(self) -> t.Dict[str, t.Any]:
+        return self.odoo._get_environment()
+
+    def _get_container_options(self, one_off: bool = False) -> t.Dict[str, t.Any]:
+        options = super()._get_container_options(one_off)
+        options.update(
+            dict(
+                command=self.get_command(),
+                mounts=self.odoo._get_mounts(one_off=one_off),
+                tty=True,
+            )
+        )
+        return options
+
+    def get_command(self) -> t.List[str]:
+        """
+        Get command running Odoo evented server, option naming the bus
+        port changed in Odoo 16
+
+        Returns:
+            t.List[str]: command
+        """
+        port_option = (
+            "--gevent-port" if self.odoo.config.version >= 16 else "--longpolling-port"
+        )
+        return [
+            "odoo",
+            "gevent",
+            *shlex.split(self.odoo.config.cmdline or ""),
+            f"{port_option}={self.container_port}",
+        ]
+
+    def ensure_base_image(self, do_pull: bool = False) -> None:
+        # Odoo service builds the image
+        ...
+
+    def drop_images(self) -> None:
+        ...
+
+    def pull(self) -> None:
+        ...
+
+    @property
+    def config(self) -> "config.GeventStackConfig":
+        return super().config
+
+    @property
+    def base_image_tag(self) -> str:
+        return self.odoo.image_tag
+
+    @property
+    def has_custom_image(self) -> bool:
+        return False
+
+    @property
+    def container_port(self) -> int:
+        return LONGPOLLING_PORT
+
+    @property
+    def health_command(self) -> t.List[str]:
+        return get_health_command(port=self.container_port)
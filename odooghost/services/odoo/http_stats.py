@@ -0,0 +1,201 @@
+import enum
+import re
+import typing as t
+from datetime import datetime
+
+from odooghost.utils.sketch import QuantileSketch
+from odooghost.utils.stream import split_buffer
+
+if t.TYPE_CHECKING:
+    from odooghost.container import Container
+
+ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+# werkzeug: 172.18.0.1 - - [05/May/2023 10:11:12] "POST /web/... HTTP/1.1" 200 - 5 0.003 0.020
+# the last three fields are Odoo perf info: SQL queries, SQL time, remaining time
+ACCESS_RE = re.compile(
+    r" werkzeug: \S+ - - \[[^\]]*\] "
+    r'"(?P<method>[A-Z]+) (?P<path>\S+)[^"]*" (?P<status>\d{3}) \S+ '
+    r"(?P<queries>\d+) (?P<query_time>\d+\.\d+) (?P<remaining>\d+\.\d+)"
+)
+ID_SEGMENT_RE = re.compile(r"^\d[\w-]*$")
+QUANTILES: t.Tuple[float, ...] = (0.5, 0.95, 0.99)
+
+
+class SortKey(str, enum.Enum):
+    count = "count"
+    latency = "latency"
+    sql_count = "sql_count"
+    sql_time = "sql_time"
+
+
+class RequestRecord(t.NamedTuple):
+    method: str
+    route: str
+    status: int
+    queries: int
+    query_time: float
+    remaining_time: float
+
+    @property
+    def latency(self) -> float:
+        return self.query_time + self.remaining_time
+
+
+def normalize_route(path: str) -> str:
+    """
+    Normalize request path: query string dropped and record ids,
+    ie. /web/image/res.partner/3/avatar_128, replaced by :id
+
+    Args:
+        path (str): request path
+
+    Returns:
+        str: route
+    """
+    path = path.split("?", 1)[0]
+    return "/".join(
+        ":id" if ID_SEGMENT_RE.match(segment) else segment
+        for segment in path.split("/")
+    )
+
+
+def parse_line(line: str) -> t.Optional[RequestRecord]:
+    """
+    Parse an Odoo werkzeug access log line
+
+    Args:
+        line (str): log line
+
+    Returns:
+        t.Optional[RequestRecord]: request or None when line is not an
+            access log line with perf info
+    """
+    match = ACCESS_RE.search(ANSI_RE.sub("", line))
+    if match is None:
+        return None
+    return RequestRecord(
+        method=match["method"],
+        route=normalize_route(match["path"]),
+        status=int(match["status"]),
+        queries=int(match["queries"]),
+        query_time=float(match["query_time"]),
+        remaining_time=float(match["remaining"]),
+    )
+
+
+class RouteStats:
+    """
+    Fixed size latency, SQL queries count and SQL time distributions of a route
+    """
+
+    def __init__(self, method: str, route: str) -> None:
+        self.method = method
+        self.route = route
+        self.errors = 0
+        self.latency = QuantileSketch()
+        self.sql_count = QuantileSketch()
+        self.sql_time = QuantileSketch()
+
+    def add(self, record: RequestRecord) -> None:
+        if record.status >= 500:
+            self.errors += 1
+        self.latency.add(record.latency)
+        self.sql_count.add(record.queries)
+        self.sql_time.add(record.query_time)
+
+    @property
+    def count(self) -> int:
+        return self.latency.count
+
+
+class HttpStats:
+    """
+    Per route requests statistics fed with Odoo log lines
+    """
+
+    def __init__(self) -> None:
+        self.routes: t.Dict[t.Tuple[str, str], RouteStats] = {}
+        self.lines = 0
+        self.requests = 0
+
+    def feed(self, line: str) -> t.Optional[RequestRecord]:
+        """
+        Feed one log line
+
+        Args:
+            line (str): log line
+
+        Returns:
+            t.Optional[RequestRecord]: parsed request
+        """
+        self.lines += 1
+        record = parse_line(line)
+        if record is None:
+            return None
+        self.requests += 1
+        key = (record.method, record.route)
+        if key not in self.routes:
+            self.routes[key] = RouteStats(method=record.method, route=record.route)
+        self.routes[key].add(record)
+        return record
+
+    def top(
+        self, sort: SortKey = SortKey.latency, limit: int = 20
+    ) -> t.List[RouteStats]:
+        """
+        Get top routes
+
+        Args:
+            sort (SortKey, optional): count or p95 of latency, sql_count or
+                sql_time. Defaults to SortKey.latency.
+            limit (int, optional): maximum routes. Defaults to 20.
+
+        Returns:
+            t.List[RouteStats]: routes
+        """
+        return sorted(
+            self.routes.values(),
+            key=lambda stats: stats.count
+            if sort == SortKey.count
+            else getattr(stats, sort.value).quantile(0.95),
+            reverse=True,
+        )[:limit]
+
+
+def iter_lines(
+    container: "Container",
+    since: t.Optional[datetime] = None,
+    follow: bool = False,
+) -> t.Generator[str, None, None]:
+    """
+    Iterate container log lines as they arrive
+
+    Args:
+        container (Container): Odoo container
+        since (t.Optional[datetime], optional): only lines logged after.
+            Defaults to None.
+        follow (bool, optional): wait for new lines. Defaults to False.
+
+    Yields:
+        str: log line
+    """
+    yield from split_buffer(
+        container.logs(stream=True, follow=follow, since=since, tail="all")
+    )
+
+
+def collect(container: "Container", since: t.Optional[datetime] = None) -> HttpStats:
+    """
+    Collect requests statistics from Odoo container logs
+
+    Args:
+        container (Container): Odoo container
+        since (t.Optional[datetime], optional): window start. Defaults to None.
+
+    Returns:
+        HttpStats: statistics
+    """
+    stats = HttpStats()
+    for line in iter_lines(container=container, since=since):
+        stats.feed(line)
+    return stats
@@ -0,0 +1,232 @@
+import re
+import typing as t
+from datetime import datetime
+
+from loguru import logger
+
+if t.TYPE_CHECKING:
+    from .service import OdooService
+
+# 2024-01-01 10:00:00,123 1 INFO db odoo.modules.loading: message
+LINE_RE = re.compile(
+    r"^(?P<date>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) \d+ \w+ \S+ "
+    r"(?P<logger>[\w.]+): (?P<message>.*)$"
+)
+MODULE_RE = re.compile(r"^Loading module (?P<module>\w+) \(\d+/\d+\)")
+DATA_RE = re.compile(r"^loading (?P<module>\w+)/(?P<name>\S+)$")
+MIGRATION_RE = re.compile(
+    r"^module (?P<module>\w+): Running migration (?P<version>\S+) (?P<name>.+)$"
+)
+LOADED_RE = re.compile(r"^(\d+ modules loaded in|Modules loaded\.)")
+REGISTRY_RE = re.compile(r"^Registry loaded in (?P<duration>\d+(?:\.\d+)?)s")
+
+
+class UpgradeStep(t.NamedTuple):
+    kind: str
+    module: t.Optional[str]
+    name: str
+    duration: float
+
+
+class UpgradeReport(t.NamedTuple):
+    exit_code: int
+    duration: float
+    steps: t.List[UpgradeStep]
+
+    def get_slowest(
+        self, limit: int = 20, kinds: t.Optional[t.Tuple[str, ...]] = None
+    ) -> t.List[UpgradeStep]:
+        """
+        Get slowest steps
+
+        Args:
+            limit (int, optional): maximum steps. Defaults to 20.
+            kinds (t.Optional[t.Tuple[str, ...]], optional): only these
+                steps kinds. Defaults to None.
+
+        Returns:
+            t.List[UpgradeStep]: steps, slowest first
+        """
+        steps = [step for step in self.steps if kinds is None or step.kind in kinds]
+        return sorted(steps, key=lambda step: step.duration, reverse=True)[:limit]
+
+
+class LogTimeline:
+    """
+    Build upgrade steps from Odoo log lines timestamps: a step lasts until
+    the next one of the same level starts. Modules steps contain data files
+    and migration scripts steps.
+    """
+
+    def __init__(self) -> None:
+        self.steps: t.List[UpgradeStep] = []
+        self.current: t.Optional[str] = None
+        self._module: t.Optional[t.Tuple[str, datetime]] = None
+        self._detail: t.Optional[t.Tuple[str, str, str, datetime]] = None
+        self._loaded: t.Optional[datetime] = None
+
+    def _close_detail(self, date: datetime) -> None:
+        if self._detail is not None:
+            kind, module, name, start = self._detail
+            self.steps.append(
+                UpgradeStep(
+                    kind=kind,
+                    module=module,
+                    name=name,
+                    duration=(date - start).total_seconds(),
+                )
+            )
+            self._detail = None
+
+    def _close_module(self, date: datetime) -> None:
+        self._close_detail(date=date)
+        if self._module is not None:
+            module, start = self._module
+            self.steps.append(
+                UpgradeStep(
+                    kind="module",
+                    module=module,
+                    name="load",
+                    duration=(date - start).total_seconds(),
+                )
+            )
+            self._module = None
+            self.current = None
+
+    def feed(self, line: str) -> None:
+        """
+        Feed one Odoo log line
+
+        Args:
+            line (str): log line
+        """
+        match = LINE_RE.match(line.strip())
+        if match is None:
+            return
+        date = datetime.strptime(match["date"], "%Y-%m-%d %H:%M:%S,%f")
+        name, message = match["logger"], match["message"]
+        if name == "odoo.modules.loading":
+            if event := MODULE_RE.match(message):
+                self._close_module(date=date)
+                self._module = (event["module"], date)
+                self.current = event["module"]
+            elif event := DATA_RE.match(message):
+                self._close_detail(date=date)
+                self._detail = ("data", event["module"], event["name"], date)
+            elif LOADED_RE.match(message):
+                self._close_module(date=date)
+                self._loaded = date
+        elif name == "odoo.modules.migration":
+            if event := MIGRATION_RE.match(message):
+                self._close_detail(date=date)
+                self._detail = (
+                    "migration",
+                    event["module"],
+                    f"{event['version']} {event['name']}",
+                    date,
+                )
+        elif name == "odoo.modules.registry":
+            if REGISTRY_RE.match(message):
+                self._close_module(date=date)
+                if self._loaded is not None:
+                    self.steps.append(
+                        UpgradeStep(
+                            kind="registry",
+                            module=None,
+                            name="setup models and finalize",
+                            duration=(date - self._loaded).total_seconds(),
+                        )
+                    )
+                    self._loaded = None
+
+    def close(self, line: t.Optional[str] = None) -> None:
+        """
+        Close steps left open when Odoo stopped logging, ie. on crash
+
+        Args:
+            line (t.Optional[str], optional): last log line. Defaults to None.
+        """
+        match = LINE_RE.match((line or "").strip())
+        if match is not None:
+            self._close_module(
+                date=datetime.strptime(match["date"], "%Y-%m-%d %H:%M:%S,%f")
+            )
+
+
+def parse_log(log: str) -> t.List[UpgradeStep]:
+    """
+    Parse upgrade steps from Odoo log
+
+    Args:
+        log (str): Odoo log, modules loading logger at debug level
+
+    Returns:
+        t.List[UpgradeStep]: steps in log order of completion
+    """
+    timeline = LogTimeline()
+    lines = log.splitlines()
+    for line in lines:
+        timeline.feed(line)
+    timeline.close(line=next((line for line in reversed(lines) if line), None))
+    return timeline.steps
+
+
+def run_upgrade(
+    odoo_service: "OdooService",
+    dbname: str,
+    modules: t.List[str],
+    install: bool = False,
+    odoo_args: t.Optional[t.List[str]] = None,
+    on_module: t.Optional[t.Callable[[str], None]] = None,
+) -> t.Tuple[UpgradeReport, str]:
+    """
+    Install or upgrade modules in a one off container, timing each
+    module load, data file, migration script and registry rebuild
+    from its log stream
+
+    Args:
+        odoo_service (OdooService): odoo service
+        dbname (str): database name
+        modules (t.List[str]): modules to install or upgrade
+        install (bool, optional): install instead of upgrade. Defaults to False.
+        odoo_args (t.Optional[t.List[str]], optional): additional odoo-bin
+            arguments. Defaults to None.
+        on_module (t.Optional[t.Callable[[str], None]], optional): called
+            when a module starts loading. Defaults to None.
+
+    Returns:
+        t.Tuple[UpgradeReport, str]: report and Odoo log
+    """
+    timeline = LogTimeline()
+    last_line = None
+
+    def _on_line(line: str) -> None:
+        nonlocal last_line
+        current = timeline.current
+        timeline.feed(line)
+        if line.strip():
+            last_line = line
+        if on_module is not None and timeline.current not in (None, current):
+            on_module(timeline.current)
+
+    logger.info(f"{'Installing' if install else 'Upgrading'} {', '.join(modules)} ...")
+    exit_code, log, duration = odoo_service.run_one_off(
+        command=[
+            "odoo",
+            "-d",
+            dbname,
+            "-i" if install else "-u",
+            ",".join(modules),
+            "--stop-after-init",
+            "--workers=0",
+            "--max-cron-threads=0",
+            "--log-handler=odoo.modules.loading:DEBUG",
+            *(odoo_args or []),
+        ],
+        on_line=_on_line,
+    )
+    timeline.close(line=last_line)
+    return (
+        UpgradeReport(exit_code=exit_code, duration=duration, steps=timeline.steps),
+        log,
+    )
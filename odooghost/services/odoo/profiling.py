@@ -0,0 +1,145 @@
+import io
+import tarfile
+import typing as t
+from collections import Counter
+from pathlib import Path
+
+from docker.errors import APIError, NotFound
+from loguru import logger
+
+from odooghost import exceptions
+from odooghost.utils.stream import ChunksReader
+
+if t.TYPE_CHECKING:
+    from odooghost.container import Container
+
+PROFILE_PATH: str = "/tmp/odooghost_profile.folded"  # nosec B108
+# py-spy adds these pseudo frames on top of stacks with --subprocesses/--threads
+PSEUDO_FRAMES: t.Tuple[str, ...] = ("process ", "thread ")
+
+
+class FunctionStats(t.NamedTuple):
+    name: str
+    own: int
+    total: int
+
+
+class ProfileReport(t.NamedTuple):
+    samples: int
+    functions: t.List[FunctionStats]
+
+
+def summarize(folded: str, limit: int = 20) -> ProfileReport:
+    """
+    Summarize collapsed stacks, one stack per line with frames separated
+    by ; followed by its samples count
+
+    Args:
+        folded (str): collapsed stacks
+        limit (int, optional): maximum functions. Defaults to 20.
+
+    Returns:
+        ProfileReport: samples count and functions sorted by own samples
+    """
+    own, total = Counter(), Counter()
+    samples = 0
+    for line in folded.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if not stack or not count.isdigit():
+            continue
+        count = int(count)
+        samples += count
+        frames = [
+            frame for frame in stack.split(";") if not frame.startswith(PSEUDO_FRAMES)
+        ]
+        if not frames:
+            continue
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    return ProfileReport(
+        samples=samples,
+        functions=[
+            FunctionStats(name=name, own=count, total=total[name])
+            for name, count in own.most_common(limit)
+        ],
+    )
+
+
+def _check_py_spy(container: "Container") -> None:
+    exit_code, _ = container.exec_run(["py-spy", "--version"], user="root")
+    if exit_code != 0:
+        raise exceptions.StackException(
+            "py-spy not found in Odoo image, enable odoo profiling in "
+            "Stack config and update Stack"
+        )
+    if "SYS_PTRACE" not in (container.get("HostConfig.CapAdd") or []):
+        raise exceptions.StackException(
+            "Odoo container can not be traced, update Stack to recreate it"
+        )
+
+
+def record_profile(
+    container: "Container",
+    dest: Path,
+    duration: int = 30,
+    rate: int = 100,
+    idle: bool = False,
+    native: bool = False,
+) -> str:
+    """
+    Sample Odoo processes stacks with py-spy without restarting them
+    and write collapsed stacks, flamegraph compatible, to dest
+
+    Args:
+        container (Container): running Odoo container
+        dest (Path): local file
+        duration (int, optional): recording seconds. Defaults to 30.
+        rate (int, optional): samples per second. Defaults to 100.
+        idle (bool, optional): include idle threads. Defaults to False.
+        native (bool, optional): include native frames. Defaults to False.
+
+    Raises:
+        exceptions.StackException: When profile can not be recorded
+
+    Returns:
+        str: collapsed stacks
+    """
+    _check_py_spy(container=container)
+    command = [
+        "py-spy",
+        "record",
+        "--pid",
+        "1",
+        "--subprocesses",
+        "--nolineno",
+        "--format",
+        "raw",
+        "--duration",
+        str(duration),
+        "--rate",
+        str(rate),
+        "--output",
+        PROFILE_PATH,
+    ]
+    if idle:
+        command.append("--idle")
+    if native:
+        command.append("--native")
+    logger.info(f"Sampling Odoo for {duration}s ...")
+    exit_code, output = container.exec_run(command, user="root")
+    if exit_code != 0:
+        raise exceptions.StackException(
+            f"py-spy exited with code {exit_code}: {output.decode(errors='replace')}"
+        )
+    try:
+        data, _ = container.get_archive(path=PROFILE_PATH)
+        with tarfile.open(fileobj=ChunksReader(data), mode="r|") as tar:
+            member = tar.next()
+            folded = io.TextIOWrapper(tar.extractfile(member)).read()
+    except (APIError, NotFound) as err:
+        raise exceptions.StackException(f"Failed to fetch profile: {err}")
+    finally:
+        container.exec_run(["rm", "-f", PROFILE_PATH], user="root")
+    dest.write_text(folded)
+    return folded
@@ -1,25 +1,67 @@
+import codecs
+import hashlib
 import shutil
+import tarfile
+import time
 import typing as t
 from pathlib import Path
 
+from docker.errors import APIError, ImageNotFound
 from docker.types import Mount
 from loguru import logger
 
-from odooghost import renderer
+from odooghost import constant, exceptions, renderer
+from odooghost.container import Container
+from odooghost.context import ctx
 from odooghost.services.base import BaseService
+from odooghost.utils.stream import ChunksReader
 
+from . import conf, tuning
 from .addons import AddonsHandler
+from .filestore import EXTRACT_OPTIONS
 
 if t.TYPE_CHECKING:
     from odooghost import config
 
 VOLUME_PATH: Path = Path("/var/lib/odoo")
+# gevent process port serving longpolling and websocket when Odoo runs workers
+LONGPOLLING_PORT: int = 8072
 
 
 def get_filestore_path(dbname: str) -> str:
     return (VOLUME_PATH / "filestore" / dbname).as_posix()
 
 
+def get_health_command(port: int) -> t.List[str]:
+    url = f"http://localhost:{port}"
+    # /web/health is not availible in older versions
+    return [
+        "sh",
+        "-c",
+        f"curl -fsS -o /dev/null {url}/web/health "
+        f"|| curl -fsS -o /dev/null {url}/web/login",
+    ]
+
+
+def get_replica(container: Container) -> int:
+    return int(container.labels.get(constant.LABEL_REPLICA, 1))
+
+
+def get_replica_hostname(stack_config: "config.StackConfig", replica: int) -> str:
+    """
+    Get Odoo replica hostname, first replica keeps service hostname
+
+    Args:
+        stack_config (config.StackConfig): stack config
+        replica (int): replica number starting at 1
+
+    Returns:
+        str: hostname
+    """
+    hostname = stack_config.get_service_hostname(service="odoo")
+    return hostname if replica == 1 else f"{hostname}-{replica}"
+
+
 class OdooService(BaseService):
     name = "odoo"
 
@@ -59,25 +101,33 @@ class OdooService(BaseService):
                 )
         with open((self.build_context_path / "Dockerfile").as_posix(), "w") as stream:
             logger.debug("Rendering Dockerfile ...")
-            stream.write(
-                renderer.render_dockerfile(
-                    odoo_version=self.config.version,
-                    dependencies=self.config.dependencies,
-                    copy_addons=self.addons.has_copy_addons
-                    and list(self.addons.get_copy_addons())
-                    or None,
-                    mount_addons=self.addons.has_mount_addons,
-                    addons_path=self.addons.get_addons_path(),
-                )
-            )
+            stream.write(self._render_dockerfile())
 
-    def _get_mounts(self) -> t.List[Mount]:
+    def _render_dockerfile(self) -> str:
+        return renderer.render_dockerfile(
+            odoo_version=self.config.version,
+            dependencies=self.config.dependencies,
+            copy_addons=self.addons.has_copy_addons
+            and list(self.addons.get_copy_addons())
+            or None,
+            profiling=self.config.profiling,
+        )
+
+    def _get_mounts(self, one_off: bool = False) -> t.List[Mount]:
         mounts = [
             Mount(
                 source=self.volume_name,
                 target=VOLUME_PATH.as_posix(),
                 type="volume",
-            )
+            ),
+            Mount(
+                source=conf.get_path(
+                    stack_name=self.stack_name, one_off=one_off
+                ).as_posix(),
+                target=conf.CONTAINER_PATH,
+                type="bind",
+                read_only=True,
+            ),
         ]
         for addons_path in self.addons.get_mount_addons():
             mounts.append(
@@ -91,30 +141,315 @@ class OdooService(BaseService):
             )
         return mounts
 
+    def _get_db_host(self) -> str:
+        """
+        Get database host, PgBouncer takes precedence when configured
+
+        Returns:
+            str: database hostname
+        """
+        if self.stack_config.services.pgbouncer:
+            return self.stack_config.get_service_hostname(service="pgbouncer")
+        return self.stack_config.services.db.host or (
+            self.stack_config.get_service_hostname(service="db")
+        )
+
     def _get_environment(self) -> dict[str, any]:
         db_service_config = self.stack_config.services.db
         return dict(
-            HOST=db_service_config.host
-            or self.stack_config.get_service_hostname(service="db"),
+            HOST=self._get_db_host(),
             USER=db_service_config.user or "odoo",
             password=db_service_config.password or "odoo",
         )
 
+    def get_db_args(self) -> t.List[str]:
+        """
+        Get odoo-bin database arguments, image entrypoint only adds them
+        to odoo commands
+
+        Returns:
+            t.List[str]: arguments
+        """
+        environment = self._get_environment()
+        return [
+            f"--db_host={environment['HOST']}",
+            f"--db_user={environment['USER']}",
+            f"--db_password={environment['password']}",
+        ]
+
+    def get_config_options(self, one_off: bool = False) -> t.Dict[str, t.Any]:
+        """
+        Get odoo.conf options from Stack config, auto tuning is left out
+        of one off containers config
+
+        Args:
+            one_off (bool, optional): one off container config. Defaults to False.
+
+        Returns:
+            t.Dict[str, t.Any]: options
+        """
+        environment = self._get_environment()
+        options = dict(
+            addons_path=self.addons.get_addons_path() or "/mnt/extra-addons",
+            data_dir=VOLUME_PATH.as_posix(),
+            db_host=environment["HOST"],
+            db_user=environment["USER"],
+            db_password=environment["password"],
+        )
+        if self.config.tuning == "auto" and not one_off:
+            stack_tuning = tuning.get_tuning(stack_config=self.stack_config)
+            for reason in stack_tuning.reasons:
+                logger.info(f"Tuning {reason}")
+            options.update(stack_tuning.as_options())
+        options.update(self.config.options)
+        return options
+
+    def write_config(self) -> None:
+        """
+        Write odoo.conf of Stack and one off containers, mounted in
+        containers so options only require a restart to apply
+        """
+        for one_off in (False, True):
+            path = conf.get_path(stack_name=self.stack_name, one_off=one_off)
+            if conf.write(path=path, options=self.get_config_options(one_off=one_off)):
+                logger.debug(f"Wrote Odoo config {path.as_posix()}")
+
+    def get_image_digest(self) -> str:
+        """
+        Get digest of image build inputs: Dockerfile, base image, copied
+        addons revisions and requirements files. Mounted addons are left
+        out as they are not part of the image.
+
+        Returns:
+            str: digest
+        """
+        digest = hashlib.sha256()
+        digest.update(self._render_dockerfile().encode())
+        try:
+            digest.update(ctx.docker.images.get(self.base_image_tag).id.encode())
+        except ImageNotFound:
+            pass
+        for name, revision in sorted(self.addons.get_revisions(mode="copy").items()):
+            digest.update(f"{name}={revision}".encode())
+        if self.config.dependencies.python:
+            for requirments_file in self.config.dependencies.python.files or []:
+                digest.update(requirments_file.read_bytes())
+        return digest.hexdigest()
+
     def _get_container_options(self, one_off: bool = False) -> t.Dict[str, t.Any]:
         options = super()._get_container_options(one_off)
         options.update(
             dict(
                 command=self.config.cmdline,
-                mounts=self._get_mounts(),
+                mounts=self._get_mounts(one_off=one_off),
                 tty=True,
             )
         )
+        if self.config.profiling and not one_off:
+            # py-spy attaches to running Odoo processes
+            options.update(cap_add=["SYS_PTRACE"])
+        if self.stack_config.services.lb is not None:
+            # load balancer publishes Odoo port
+            options.update(ports=None)
         return options
 
+    def create_container(
+        self, one_off: bool = False, replica: int = 1, **options
+    ) -> Container:
+        """
+        Create Odoo container
+
+        Args:
+            one_off (bool, optional): one off container. Defaults to False.
+            replica (int, optional): replica number. Defaults to 1.
+
+        Returns:
+            Container: Container instance
+        """
+        if not one_off and replica > 1:
+            options = dict(
+                name=f"{self.container_name}_{replica}",
+                hostname=get_replica_hostname(
+                    stack_config=self.stack_config, replica=replica
+                ),
+                labels={**self.labels(), constant.LABEL_REPLICA: str(replica)},
+                **options,
+            )
+        return super().create_container(one_off=one_off, **options)
+
+    def get_replicas(self, stopped: bool = True) -> t.List[Container]:
+        """
+        Get Odoo replicas containers ordered by replica number
+
+        Args:
+            stopped (bool, optional): stopped containers. Defaults to True.
+
+        Returns:
+            t.List[Container]: containers
+        """
+        return sorted(self.containers(stopped=stopped), key=get_replica)
+
+    def scale(self, replicas: int, start: bool = False) -> None:
+        """
+        Create missing replicas containers and remove extra ones,
+        first replica is never removed
+
+        Args:
+            replicas (int): replicas count
+            start (bool, optional): start created replicas. Defaults to False.
+
+        Raises:
+            exceptions.StackContainerStartError: When a replica fails to start
+        """
+        containers = {
+            get_replica(container): container for container in self.get_replicas()
+        }
+        for replica in range(2, replicas + 1):
+            container = containers.get(replica)
+            if container is None:
+                logger.info(f"Creating Odoo replica {replica}")
+                container = self.create_container(replica=replica)
+            if start and not container.is_running:
+                logger.info(f"Starting container {container.name}")
+                try:
+                    container.start()
+                except APIError as err:
+                    raise exceptions.StackContainerStartError(
+                        f"Failed to start container {container.name}: {err}"
+                    )
+        for replica, container in containers.items():
+            if replica > max(1, replicas):
+                logger.info(f"Removing Odoo replica {replica}")
+                try:
+                    container.remove(force=True)
+                except APIError as err:
+                    logger.error(f"Failed to remove container {container.name}: {err}")
+
+    def wait_ready(
+        self,
+        timeout: float = 300,
+        start: t.Optional[float] = None,
+        max_delay: float = 5,
+        container: t.Optional[Container] = None,
+    ) -> float:
+        if container is not None:
+            return super().wait_ready(
+                timeout=timeout, start=start, max_delay=max_delay, container=container
+            )
+        # replicas boot concurrently, last one ready gives service time to ready
+        start = time.monotonic() if start is None else start
+        duration = 0.0
+        for replica in self.get_replicas():
+            duration = super().wait_ready(
+                timeout=timeout, start=start, max_delay=max_delay, container=replica
+            )
+        return duration
+
+    def run_one_off(
+        self,
+        command: t.List[str],
+        fetch: t.Optional[t.Tuple[str, Path]] = None,
+        on_line: t.Optional[t.Callable[[str], None]] = None,
+    ) -> t.Tuple[int, str, float]:
+        """
+        Run a command in a one off container and remove it
+
+        Args:
+            command (t.List[str]): command
+            fetch (t.Optional[t.Tuple[str, Path]], optional): container path
+                extracted in local folder on success. Defaults to None.
+            on_line (t.Optional[t.Callable[[str], None]], optional): called
+                with each log line while the command runs. Defaults to None.
+
+        Raises:
+            exceptions.StackException: When container can not be run
+
+        Returns:
+            t.Tuple[int, str, float]: exit code, logs and duration
+        """
+        start = time.monotonic()
+        self.write_config()
+        container = self.create_container(one_off=True, command=command, tty=False)
+        try:
+            container.start()
+            if on_line is None:
+                exit_code = container.wait()
+                log = container.logs().decode(errors="replace")
+            else:
+                lines = []
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                buffer = ""
+                for chunk in container.logs(stream=True, follow=True):
+                    buffer += decoder.decode(chunk)
+                    *complete, buffer = buffer.split("\n")
+                    for line in complete:
+                        lines.append(line)
+                        on_line(line)
+                if buffer:
+                    lines.append(buffer)
+                    on_line(buffer)
+                exit_code = container.wait()
+                log = "\n".join(lines)
+            if fetch and exit_code == 0:
+                path, dest = fetch
+                data, _ = container.get_archive(path=path)
+                with tarfile.open(fileobj=ChunksReader(data), mode="r|") as tar:
+                    tar.extractall(path=dest, **EXTRACT_OPTIONS)  # nosec B202
+        except APIError as err:
+            raise exceptions.StackException(f"Failed to run one off container: {err}")
+        finally:
+            container.remove(force=True)
+        return exit_code, log, time.monotonic() - start
+
+    def build(self, rm: bool = True, no_cache: bool = True) -> None:
+        """
+        Build Odoo image unless its build inputs did not change since
+        last build
+
+        Args:
+            rm (bool, optional): remove intermediate containers. Defaults to True.
+            no_cache (bool, optional): do not use build cache. Defaults to True.
+        """
+        digest = self.get_image_digest()
+        try:
+            image = ctx.docker.images.get(self.image_tag)
+        except ImageNotFound:
+            image = None
+        if (
+            image is not None
+            and image.labels.get(constant.LABEL_IMAGE_DIGEST) == digest
+        ):
+            logger.info("Odoo image is up to date, skipping build")
+            return
+        with self.build_context():
+            self.build_image(
+                path=self.build_context_path,
+                rm=rm,
+                no_cache=no_cache,
+                labels={constant.LABEL_IMAGE_DIGEST: digest},
+            )
+
     def create(self, force: bool, do_pull: bool, ensure_addons: bool, **kw) -> None:
         if ensure_addons:
             self.addons.ensure()
-        return super().create(force=force, do_pull=do_pull, **kw)
+        self.write_config()
+        super().create(force=force, do_pull=do_pull, **kw)
+        self.scale(replicas=self.config.replicas)
+
+    def update(self) -> None:
+        self.write_config()
+        super().update()
+        self.scale(replicas=self.config.replicas)
+
+    def prepare_start(self) -> None:
+        self.write_config()
+
+    def drop(self, volumes: bool = True, force: bool = False) -> None:
+        super().drop(volumes=volumes, force=force)
+        for one_off in (False, True):
+            conf.get_path(stack_name=self.stack_name, one_off=one_off).unlink(
+                missing_ok=True
+            )
 
     def pull(self) -> None:
         self.addons.pull()
@@ -139,3 +474,7 @@ class OdooService(BaseService):
     @property
     def container_port(self) -> int:
         return 8069
+
+    @property
+    def health_command(self) -> t.List[str]:
+        return get_health_command(port=self.container_port)
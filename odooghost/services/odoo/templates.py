@@ -0,0 +1,345 @@
+import hashlib
+import json
+import shlex
+import typing as t
+from datetime import datetime, timezone
+
+from docker.errors import ImageNotFound
+from docker.utils import parse_bytes
+from loguru import logger
+
+from odooghost import exceptions
+from odooghost.context import ctx
+from odooghost.services import db
+from odooghost.utils import misc
+
+from .service import get_filestore_path
+
+if t.TYPE_CHECKING:
+    from .service import OdooService
+
+TEMPLATE_PREFIX = "odooghost_tpl_"
+
+
+class TemplateInfo(t.NamedTuple):
+    name: str
+    key: str
+    modules: t.List[str]
+    size: int
+    created: datetime
+    last_used: datetime
+
+
+def get_template_key(
+    odoo_service: "OdooService",
+    modules: t.List[str],
+    args: t.Optional[t.List[str]] = None,
+) -> str:
+    """
+    Get template cache key from Odoo image, modules, addons revisions
+    and install arguments
+
+    Args:
+        odoo_service (OdooService): odoo service
+        modules (t.List[str]): installed modules
+        args (t.Optional[t.List[str]], optional): odoo-bin install
+            arguments. Defaults to None.
+
+    Raises:
+        exceptions.StackImageEnsureError: When Odoo image does not exist
+
+    Returns:
+        str: key
+    """
+    try:
+        image_id = ctx.docker.images.get(odoo_service.image_tag).id
+    except ImageNotFound:
+        raise exceptions.StackImageEnsureError(
+            f"Image {odoo_service.image_tag} not found, create or update stack"
+        )
+    data = dict(
+        image=image_id,
+        modules=sorted(set(modules)),
+        addons=odoo_service.addons.get_revisions(),
+        args=args or [],
+    )
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def get_template_name(key: str) -> str:
+    return f"{TEMPLATE_PREFIX}{key[:16]}"
+
+
+def list_templates(admin: "db.AdminClient") -> t.List[TemplateInfo]:
+    """
+    List cached templates, most recently used first
+
+    Args:
+        admin (db.AdminClient): admin client
+
+    Returns:
+        t.List[TemplateInfo]: templates
+    """
+    result = admin.execute(
+        "SELECT datname, pg_database_size(datname), "
+        "shobj_description(oid, 'pg_database') FROM pg_database "
+        "WHERE datistemplate AND left(datname, :len) = :'prefix'",
+        params=dict(len=len(TEMPLATE_PREFIX), prefix=TEMPLATE_PREFIX),
+        dbname=admin.maintenance_dbname,
+    )
+    templates = []
+    for name, size, comment in result.rows:
+        try:
+            meta = json.loads(comment or "")
+        except ValueError:
+            logger.warning(f"Ignoring template {name} without metadata")
+            continue
+        templates.append(
+            TemplateInfo(
+                name=name,
+                key=meta["key"],
+                modules=meta["modules"],
+                size=int(size),
+                created=datetime.fromisoformat(meta["created"]),
+                last_used=datetime.fromisoformat(meta["last_used"]),
+            )
+        )
+    return sorted(templates, key=lambda template: template.last_used, reverse=True)
+
+
+def _write_meta(admin: "db.AdminClient", template: TemplateInfo) -> None:
+    meta = dict(
+        key=template.key,
+        modules=template.modules,
+        created=template.created.isoformat(),
+        last_used=template.last_used.isoformat(),
+    )
+    admin.execute(
+        "COMMENT ON DATABASE :\"dbname\" IS :'meta'",
+        params=dict(dbname=template.name, meta=json.dumps(meta)),
+        dbname=admin.maintenance_dbname,
+    )
+
+
+def drop_template(
+    odoo_service: "OdooService", admin: "db.AdminClient", name: str
+) -> None:
+    """
+    Drop template database and its filestore
+
+    Args:
+        odoo_service (OdooService): odoo service
+        admin (db.AdminClient): admin client
+        name (str): template name
+    """
+    if db.database_exists(admin=admin, dbname=name):
+        admin.execute(
+            'ALTER DATABASE :"dbname" IS_TEMPLATE false',
+            params=dict(dbname=name),
+            dbname=admin.maintenance_dbname,
+        )
+        db.drop_database(admin=admin, dbname=name)
+    odoo_service.run_one_off(command=["rm", "-rf", get_filestore_path(dbname=name)])
+
+
+def evict_templates(
+    odoo_service: "OdooService",
+    admin: "db.AdminClient",
+    keep: t.Optional[str] = None,
+) -> t.List[TemplateInfo]:
+    """
+    Drop least recently used templates beyond db service cache limits
+
+    Args:
+        odoo_service (OdooService): odoo service
+        admin (db.AdminClient): admin client
+        keep (t.Optional[str], optional): template name never evicted.
+            Defaults to None.
+
+    Returns:
+        t.List[TemplateInfo]: evicted templates
+    """
+    cache_config = odoo_service.stack_config.services.db.template_cache
+    max_size = (
+        parse_bytes(cache_config.max_size)
+        if isinstance(cache_config.max_size, str)
+        else cache_config.max_size
+    )
+    templates = list_templates(admin=admin)
+    evicted = []
+    while templates and (
+        len(templates) > cache_config.max_count
+        or sum(template.size for template in templates) > max_size
+    ):
+        candidates = [template for template in templates if template.name != keep]
+        if not candidates:
+            break
+        template = candidates[-1]
+        logger.info(
+            f"Evicting template {template.name} "
+            f"({misc.format_size(template.size)}, last used {template.last_used:%Y-%m-%d %H:%M})"
+        )
+        drop_template(odoo_service=odoo_service, admin=admin, name=template.name)
+        templates.remove(template)
+        evicted.append(template)
+    return evicted
+
+
+def build_template(
+    odoo_service: "OdooService",
+    db_service: "db.DbService",
+    key: str,
+    modules: t.List[str],
+    args: t.Optional[t.List[str]] = None,
+) -> TemplateInfo:
+    """
+    Install modules in a new database and register it as template
+
+    Args:
+        odoo_service (OdooService): odoo service
+        db_service (db.DbService): db service, its container must be running
+        key (str): template key
+        modules (t.List[str]): modules to install
+        args (t.Optional[t.List[str]], optional): odoo-bin install
+            arguments. Defaults to None.
+
+    Raises:
+        exceptions.StackDatabaseTemplateError: When modules install failed
+
+    Returns:
+        TemplateInfo: template
+    """
+    name = get_template_name(key=key)
+    modules = sorted(set(modules))
+    with db_service.admin() as admin:
+        # leftover of an interrupted build
+        drop_template(odoo_service=odoo_service, admin=admin, name=name)
+    logger.info(f"Building template {name} with {', '.join(modules)} ...")
+    exit_code, log, duration = odoo_service.run_one_off(
+        command=[
+            "odoo",
+            "-d",
+            name,
+            "-i",
+            ",".join(modules),
+            "--stop-after-init",
+            "--workers=0",
+            "--max-cron-threads=0",
+            *(args or []),
+        ]
+    )
+    with db_service.admin() as admin:
+        if exit_code != 0:
+            drop_template(odoo_service=odoo_service, admin=admin, name=name)
+            logger.debug(log)
+            raise exceptions.StackDatabaseTemplateError(
+                f"Failed to install {', '.join(modules)} in template {name}: "
+                + "\n".join(log.splitlines()[-20:])
+            )
+        admin.execute(
+            'ALTER DATABASE :"dbname" IS_TEMPLATE true',
+            params=dict(dbname=name),
+            dbname=admin.maintenance_dbname,
+        )
+        now = datetime.now(timezone.utc)
+        template = TemplateInfo(
+            name=name,
+            key=key,
+            modules=modules,
+            size=0,
+            created=now,
+            last_used=now,
+        )
+        _write_meta(admin=admin, template=template)
+    logger.info(f"Built template {name} in {duration:.1f}s")
+    return template
+
+
+def get_template(
+    odoo_service: "OdooService",
+    db_service: "db.DbService",
+    modules: t.List[str],
+    args: t.Optional[t.List[str]] = None,
+    use_cache: bool = True,
+) -> t.Tuple[TemplateInfo, bool]:
+    """
+    Get a template with modules installed, built and registered when
+    no cached template match. Least recently used templates are evicted
+    beyond db service cache limits.
+
+    Args:
+        odoo_service (OdooService): odoo service
+        db_service (db.DbService): db service, its container must be running
+        modules (t.List[str]): modules to install
+        args (t.Optional[t.List[str]], optional): odoo-bin install
+            arguments. Defaults to None.
+        use_cache (bool, optional): use matching cached template, rebuild
+            it otherwise. Defaults to True.
+
+    Returns:
+        t.Tuple[TemplateInfo, bool]: template and whether it was cached
+    """
+    key = get_template_key(odoo_service=odoo_service, modules=modules, args=args)
+    with db_service.admin() as admin:
+        template = next(
+            (
+                template
+                for template in list_templates(admin=admin)
+                if template.key == key
+            ),
+            None,
+        )
+        if template is not None and use_cache:
+            template = template._replace(last_used=datetime.now(timezone.utc))
+            _write_meta(admin=admin, template=template)
+            logger.info(f"Using cached template {template.name}")
+            return template, True
+    template = build_template(
+        odoo_service=odoo_service,
+        db_service=db_service,
+        key=key,
+        modules=modules,
+        args=args,
+    )
+    with db_service.admin() as admin:
+        evict_templates(odoo_service=odoo_service, admin=admin, keep=template.name)
+    return template, False
+
+
+def create_from_template(
+    odoo_service: "OdooService",
+    db_service: "db.DbService",
+    template: str,
+    dbnames: t.List[str],
+) -> None:
+    """
+    Create databases from template and copy its filestore
+
+    Args:
+        odoo_service (OdooService): odoo service
+        db_service (db.DbService): db service, its container must be running
+        template (str): template database name
+        dbnames (t.List[str]): databases to create
+    """
+    with db_service.admin() as admin:
+        # pooled connections would prevent template copy
+        admin.execute(
+            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+            "WHERE pid <> pg_backend_pid() AND datname = :'dbname'",
+            params=dict(dbname=template),
+            dbname=admin.maintenance_dbname,
+        )
+        for dbname in dbnames:
+            db.create_database(admin=admin, dbname=dbname, template=template)
+    source = shlex.quote(get_filestore_path(dbname=template))
+    odoo_service.run_one_off(
+        command=[
+            "sh",
+            "-c",
+            " && ".join(
+                f"if [ -d {source} ]; then cp -a {source} "
+                f"{shlex.quote(get_filestore_path(dbname=dbname))}; fi"
+                for dbname in dbnames
+            ),
+        ]
+    )
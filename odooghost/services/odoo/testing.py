@@ -0,0 +1,364 @@
+import re
+import statistics
+import time
+import typing as t
+import xml.etree.ElementTree as ET  # nosec B405
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from loguru import logger
+
+from odooghost.services import db
+
+from . import templates
+from .service import VOLUME_PATH, get_filestore_path
+
+if t.TYPE_CHECKING:
+    from .service import OdooService
+
+# used for modules without known duration when nothing is known
+DEFAULT_DURATION: float = 60.0
+COVERAGE_PATH: str = (VOLUME_PATH / ".odooghost_coverage").as_posix()
+# odoo.tests.stats: sale: 120 tests 35.12s 98765 queries
+STATS_RE = re.compile(
+    r"\s(?P<module>\w+): (?P<tests>\d+) tests (?P<duration>\d+(?:\.\d+)?)s"
+)
+LOG_RE = re.compile(
+    r"^\S+ \S+ \d+ (?P<level>ERROR|CRITICAL) \S+ (?P<logger>[\w.]+): (?P<message>.*)$"
+)
+ADDON_LOGGER_RE = re.compile(r"^odoo\.addons\.(?P<module>\w+)")
+TEST_RE = re.compile(r"^(?P<kind>FAIL|ERROR): (?P<name>.+)$")
+
+
+class TestFailure(t.NamedTuple):
+    kind: str
+    name: str
+    message: str
+
+
+class ModuleReport(t.NamedTuple):
+    module: str
+    shard: int
+    tests: int
+    duration: t.Optional[float]
+    failures: t.List[TestFailure]
+
+
+class ShardReport(t.NamedTuple):
+    index: int
+    dbname: str
+    modules: t.List[str]
+    exit_code: int
+    duration: float
+    errors: t.List[TestFailure]
+
+
+class TestRunReport(t.NamedTuple):
+    template_duration: float
+    shards: t.List[ShardReport]
+    modules: t.List[ModuleReport]
+
+    @property
+    def failed(self) -> bool:
+        return any(
+            shard.exit_code != 0 or shard.errors for shard in self.shards
+        ) or any(module.failures for module in self.modules)
+
+
+def balance_shards(
+    modules: t.List[str], durations: t.Dict[str, float], shards: int
+) -> t.List[t.List[str]]:
+    """
+    Spread modules over shards of even expected duration, longest first.
+    Modules without history are expected to last the average known duration.
+
+    Args:
+        modules (t.List[str]): modules names
+        durations (t.Dict[str, float]): known durations by module name
+        shards (int): shards count
+
+    Returns:
+        t.List[t.List[str]]: modules by shard, without empty shard
+    """
+    known = [durations[module] for module in modules if module in durations]
+    default = statistics.mean(known) if known else DEFAULT_DURATION
+    buckets: t.List[t.Tuple[t.List[str], float]] = [
+        ([], 0.0) for _ in range(max(1, min(shards, len(modules))))
+    ]
+    for module in sorted(
+        modules, key=lambda module: durations.get(module, default), reverse=True
+    ):
+        index = min(range(len(buckets)), key=lambda i: buckets[i][1])
+        buckets[index] = (
+            buckets[index][0] + [module],
+            buckets[index][1] + durations.get(module, default),
+        )
+    return [bucket for bucket, _ in buckets if bucket]
+
+
+def parse_log(
+    log: str, shard: int, modules: t.List[str]
+) -> t.Tuple[t.List[ModuleReport], t.List[TestFailure]]:
+    """
+    Parse Odoo test log, Odoo has no structured test output
+
+    Args:
+        log (str): Odoo log
+        shard (int): shard index
+        modules (t.List[str]): tested modules
+
+    Returns:
+        t.Tuple[t.List[ModuleReport], t.List[TestFailure]]: modules reports
+            and errors not related to a tested module
+    """
+    stats: t.Dict[str, t.Tuple[int, float]] = {}
+    failures: t.Dict[str, t.List[TestFailure]] = {module: [] for module in modules}
+    errors = []
+    for line in log.splitlines():
+        match = STATS_RE.search(line)
+        if match and match["module"] in failures:
+            stats[match["module"]] = (int(match["tests"]), float(match["duration"]))
+            continue
+        match = LOG_RE.match(line)
+        if not match:
+            continue
+        test = TEST_RE.match(match["message"])
+        failure = TestFailure(
+            kind=test["kind"] if test else match["level"],
+            name=test["name"] if test else match["logger"],
+            message=match["message"],
+        )
+        addon = ADDON_LOGGER_RE.match(match["logger"])
+        if addon and addon["module"] in failures:
+            failures[addon["module"]].append(failure)
+        else:
+            errors.append(failure)
+    return [
+        ModuleReport(
+            module=module,
+            shard=shard,
+            tests=stats.get(module, (0, None))[0],
+            duration=stats.get(module, (0, None))[1],
+            failures=failures[module],
+        )
+        for module in modules
+    ], errors
+
+
+def build_junit(report: TestRunReport) -> ET.Element:
+    """
+    Build JUnit document of a test run, one test suite by module.
+    Failed tests are reported as test cases, passed tests are only counted.
+
+    Args:
+        report (TestRunReport): test run report
+
+    Returns:
+        ET.Element: testsuites element
+    """
+    root = ET.Element("testsuites")
+    suites = [
+        (module.module, module.tests, module.duration or 0.0, module.failures)
+        for module in report.modules
+    ] + [
+        (f"shard_{shard.index}", 0, shard.duration, shard.errors)
+        for shard in report.shards
+        if shard.errors
+    ]
+    for name, tests, duration, failures in suites:
+        suite = ET.SubElement(
+            root,
+            "testsuite",
+            name=name,
+            tests=str(max(tests, len(failures))),
+            failures=str(sum(failure.kind == "FAIL" for failure in failures)),
+            errors=str(sum(failure.kind != "FAIL" for failure in failures)),
+            time=f"{duration:.3f}",
+        )
+        for failure in failures:
+            case = ET.SubElement(suite, "testcase", classname=name, name=failure.name)
+            ET.SubElement(
+                case,
+                "failure" if failure.kind == "FAIL" else "error",
+                message=failure.message,
+            )
+    return root
+
+
+def _get_odoo_command(
+    odoo_service: "OdooService",
+    dbname: str,
+    args: t.List[str],
+    coverage: bool = False,
+) -> t.List[str]:
+    command = [
+        "odoo",
+        "-d",
+        dbname,
+        "--stop-after-init",
+        "--workers=0",
+        "--max-cron-threads=0",
+        *args,
+    ]
+    if not coverage:
+        return command
+    sources = [
+        addons.container_posix_path
+        for addons in (
+            *odoo_service.addons.get_copy_addons(),
+            *odoo_service.addons.get_mount_addons(),
+        )
+    ]
+    return [
+        "env",
+        f"COVERAGE_FILE={COVERAGE_PATH}/.coverage",
+        "coverage",
+        "run",
+        "--parallel-mode",
+        *([f"--source={','.join(sources)}"] if sources else []),
+        "/usr/bin/odoo",
+        *command[1:],
+        *odoo_service.get_db_args(),
+    ]
+
+
+def run_tests(
+    odoo_service: "OdooService",
+    db_service: "db.DbService",
+    modules: t.List[str],
+    durations: t.Dict[str, float],
+    output: Path,
+    shards: int = 1,
+    coverage: bool = False,
+    odoo_args: t.Optional[t.List[str]] = None,
+) -> TestRunReport:
+    """
+    Run modules tests in parallel shards.
+    Modules are installed once in a cached template database, each shard
+    runs in a one off container on its own clone of it and databases are
+    dropped once done. Shard logs, JUnit report and combined coverage
+    are written in output folder.
+
+    Args:
+        odoo_service (OdooService): odoo service
+        db_service (db.DbService): db service, its container must be running
+        modules (t.List[str]): modules to test
+        durations (t.Dict[str, float]): known durations by module name
+        output (Path): output folder, created if needed
+        shards (int, optional): parallel shards. Defaults to 1.
+        coverage (bool, optional): measure coverage, coverage package must
+            be installed in Odoo image. Defaults to False.
+        odoo_args (t.Optional[t.List[str]], optional): additional odoo-bin
+            arguments. Defaults to None.
+
+    Raises:
+        exceptions.StackDatabaseTemplateError: When template database can
+            not be built
+
+    Returns:
+        TestRunReport: test run report
+    """
+    odoo_args = odoo_args or []
+    output.mkdir(parents=True, exist_ok=True)
+    prefix = f"{odoo_service.stack_name}_test".lower()
+    buckets = balance_shards(modules=modules, durations=durations, shards=shards)
+    dbnames = [f"{prefix}_{index}" for index in range(len(buckets))]
+    filestores = [get_filestore_path(dbname=dbname) for dbname in dbnames]
+
+    with db_service.admin() as admin:
+        for dbname in dbnames:
+            if db.database_exists(admin=admin, dbname=dbname):
+                db.drop_database(admin=admin, dbname=dbname)
+    try:
+        start = time.monotonic()
+        template, _ = templates.get_template(
+            odoo_service=odoo_service,
+            db_service=db_service,
+            modules=modules,
+            args=odoo_args,
+        )
+        template_duration = time.monotonic() - start
+
+        logger.info(f"Cloning template database in {len(buckets)} shards ...")
+        templates.create_from_template(
+            odoo_service=odoo_service,
+            db_service=db_service,
+            template=template.name,
+            dbnames=dbnames,
+        )
+        if coverage:
+            odoo_service.run_one_off(
+                command=[
+                    "sh",
+                    "-c",
+                    f"rm -rf {COVERAGE_PATH} && mkdir -p {COVERAGE_PATH}",
+                ],
+            )
+
+        def _run_shard(index: int) -> t.Tuple[ShardReport, t.List[ModuleReport]]:
+            bucket = buckets[index]
+            args = ["-u", ",".join(bucket), "--test-enable"]
+            if odoo_service.config.version >= 12:
+                args.append(
+                    "--test-tags=" + ",".join(f"/{module}" for module in bucket)
+                )
+            logger.info(f"Shard {index} testing {', '.join(bucket)} ...")
+            exit_code, log, duration = odoo_service.run_one_off(
+                command=_get_odoo_command(
+                    odoo_service=odoo_service,
+                    dbname=dbnames[index],
+                    args=args + odoo_args,
+                    coverage=coverage,
+                ),
+            )
+            (output / f"shard_{index}.log").write_text(log)
+            module_reports, errors = parse_log(log=log, shard=index, modules=bucket)
+            logger.info(f"Shard {index} done in {duration:.1f}s")
+            return (
+                ShardReport(
+                    index=index,
+                    dbname=dbnames[index],
+                    modules=bucket,
+                    exit_code=exit_code,
+                    duration=duration,
+                    errors=errors,
+                ),
+                module_reports,
+            )
+
+        with ThreadPoolExecutor(max_workers=len(buckets)) as executor:
+            results = list(executor.map(_run_shard, range(len(buckets))))
+        report = TestRunReport(
+            template_duration=template_duration,
+            shards=[shard for shard, _ in results],
+            modules=[
+                module for _, module_reports in results for module in module_reports
+            ],
+        )
+        ET.ElementTree(build_junit(report=report)).write(
+            output / "junit.xml", encoding="utf-8", xml_declaration=True
+        )
+
+        if coverage:
+            logger.info("Combining coverage ...")
+            exit_code, log, _ = odoo_service.run_one_off(
+                command=[
+                    "sh",
+                    "-c",
+                    f"cd {COVERAGE_PATH} && coverage combine -q "
+                    "&& coverage xml -q -o coverage.xml",
+                ],
+                fetch=(f"{COVERAGE_PATH}/coverage.xml", output),
+            )
+            if exit_code != 0:
+                logger.warning(f"Failed to combine coverage: {log}")
+        return report
+    finally:
+        logger.info("Dropping test databases ...")
+        with db_service.admin() as admin:
+            for dbname in dbnames:
+                if db.database_exists(admin=admin, dbname=dbname):
+                    db.drop_database(admin=admin, dbname=dbname)
+        odoo_service.run_one_off(
+            command=["rm", "-rf", *filestores, COVERAGE_PATH],
+        )
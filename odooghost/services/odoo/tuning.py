@@ -0,0 +1,188 @@
+import shlex
+import typing as t
+
+from odooghost import constant
+from odooghost.container import Container
+from odooghost.context import ctx
+from odooghost.utils.misc import format_size, labels_as_list
+
+if t.TYPE_CHECKING:
+    from odooghost import config
+
+MB: int = 1024 * 1024
+# Odoo deployment guide estimates 80% of light requests (150 MB)
+# and 20% of heavy requests (1 GB) per worker
+WORKER_MEMORY: int = int(0.8 * 150 * MB + 0.2 * 1024 * MB)
+MIN_MEMORY_SOFT: int = 640 * MB
+MAX_MEMORY_SOFT: int = 2048 * MB
+# share of host memory kept for databases and other services
+MEMORY_RESERVE: float = 0.25
+# connections kept for superuser and admin sessions
+RESERVED_CONNECTIONS: int = 10
+# Odoo default, pool size of each process
+MAX_DB_MAXCONN: int = 64
+
+
+class Tuning(t.NamedTuple):
+    workers: int
+    max_cron_threads: int
+    limit_memory_soft: int
+    limit_memory_hard: int
+    db_maxconn: int
+    reasons: t.List[str]
+
+    def as_options(self) -> t.Dict[str, int]:
+        """
+        Get odoo.conf options
+
+        Returns:
+            t.Dict[str, int]: options
+        """
+        return dict(
+            workers=self.workers,
+            max_cron_threads=self.max_cron_threads,
+            limit_memory_soft=self.limit_memory_soft,
+            limit_memory_hard=self.limit_memory_hard,
+            db_maxconn=self.db_maxconn,
+        )
+
+
+def count_running_stacks(stack_name: str) -> int:
+    """
+    Count stacks with a running Odoo container, including given stack
+
+    Args:
+        stack_name (str): current stack name
+
+    Returns:
+        int: stacks count
+    """
+    containers = Container.search(
+        filters={
+            "label": labels_as_list(
+                {
+                    constant.LABEL_NAME: "true",
+                    constant.LABEL_STACK_SERVICE_TYPE: "odoo",
+                }
+            )
+        }
+    )
+    return len({container.stack for container in containers} | {stack_name})
+
+
+def compute_tuning(
+    cpus: int, memory: int, stacks: int, max_connections: int, replicas: int = 1
+) -> Tuning:
+    """
+    Compute Odoo workers, memory limits and connection pool size for a
+    stack sharing host resources with other running stacks
+
+    Args:
+        cpus (int): host cpus
+        memory (int): host memory in bytes
+        stacks (int): running stacks sharing host
+        max_connections (int): connections accepted by database or pooler
+        replicas (int, optional): Odoo containers of the stack sharing its
+            resources and database. Defaults to 1.
+
+    Returns:
+        Tuning: tuning with its reasoning
+    """
+    stacks = max(1, stacks)
+    replicas = max(1, replicas)
+    cpus_share = max(1, cpus // (stacks * replicas))
+    memory_share = int(memory * (1 - MEMORY_RESERVE) / (stacks * replicas))
+    reasons = [
+        f"{cpus} cpus and {format_size(memory)} shared by {stacks} stacks"
+        + (f" of {replicas} Odoo replicas" if replicas > 1 else "")
+        + f": {cpus_share} cpus and {format_size(memory_share)} for this "
+        + ("replica" if replicas > 1 else "stack")
+        + f" ({MEMORY_RESERVE:.0%} of memory kept for other services)"
+    ]
+
+    cpu_workers = 2 * cpus_share + 1
+    memory_workers = memory_share // WORKER_MEMORY
+    workers = max(2, min(cpu_workers, memory_workers))
+    reasons.append(
+        f"workers={workers}: 2 x cpus + 1 = {cpu_workers}, "
+        f"memory fits {memory_workers} workers of {format_size(WORKER_MEMORY)}"
+    )
+
+    max_cron_threads = 1 if workers <= 2 else 2
+    reasons.append(f"max_cron_threads={max_cron_threads}")
+
+    processes = workers + max_cron_threads
+    limit_memory_soft = min(
+        MAX_MEMORY_SOFT, max(MIN_MEMORY_SOFT, memory_share // processes)
+    )
+    limit_memory_hard = int(limit_memory_soft * 1.25)
+    reasons.append(
+        f"limit_memory_soft={format_size(limit_memory_soft)}: "
+        f"{format_size(memory_share)} over {processes} processes, "
+        f"within {format_size(MIN_MEMORY_SOFT)} and {format_size(MAX_MEMORY_SOFT)}, "
+        f"hard limit is 25% higher"
+    )
+
+    # workers, cron threads and longpolling process each own a pool
+    db_maxconn = max(
+        2,
+        min(
+            MAX_DB_MAXCONN,
+            (max_connections - RESERVED_CONNECTIONS) // ((processes + 1) * replicas),
+        ),
+    )
+    reasons.append(
+        f"db_maxconn={db_maxconn}: {max_connections} connections minus "
+        f"{RESERVED_CONNECTIONS} reserved over {(processes + 1) * replicas} processes"
+    )
+    return Tuning(
+        workers=workers,
+        max_cron_threads=max_cron_threads,
+        limit_memory_soft=limit_memory_soft,
+        limit_memory_hard=limit_memory_hard,
+        db_maxconn=db_maxconn,
+        reasons=reasons,
+    )
+
+
+def get_tuning(stack_config: "config.StackConfig") -> Tuning:
+    """
+    Compute tuning of a stack from docker host resources
+
+    Args:
+        stack_config (config.StackConfig): stack config
+
+    Returns:
+        Tuning: tuning with its reasoning
+    """
+    info = ctx.docker.info()
+    pgbouncer_config = stack_config.services.pgbouncer
+    return compute_tuning(
+        cpus=info["NCPU"],
+        memory=info["MemTotal"],
+        stacks=count_running_stacks(stack_name=stack_config.name),
+        max_connections=pgbouncer_config.max_client_conn
+        if pgbouncer_config
+        else stack_config.services.db.max_connections,
+        replicas=stack_config.services.odoo.replicas,
+    )
+
+
+def has_workers(odoo_config: "config.OdooStackConfig") -> bool:
+    """
+    Check Odoo runs in multi-processing mode, longpolling and websocket
+    requests are then served by a gevent process on another port
+
+    Args:
+        odoo_config (config.OdooStackConfig): Odoo config
+
+    Returns:
+        bool: Odoo runs workers
+    """
+    for arg in shlex.split(odoo_config.cmdline or ""):
+        if arg.startswith("--workers="):
+            return int(arg.split("=", 1)[1]) > 0
+    if "workers" in odoo_config.options:
+        return int(odoo_config.options["workers"]) > 0
+    # auto tuning always sets workers
+    return odoo_config.tuning == "auto"
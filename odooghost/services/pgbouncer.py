@@ -0,0 +1,99 @@
+import typing as t
+
+from odooghost import exceptions
+
+from .base import BaseService
+from .db import AdminClient
+
+if t.TYPE_CHECKING:
+    from odooghost import config
+
+
+class PgBouncerService(BaseService):
+    name = "pgbouncer"
+
+    def __init__(self, stack_config: "config.StackConfig") -> None:
+        super().__init__(stack_config=stack_config)
+
+    def _get_container_options(self, one_off: bool = False) -> t.Dict[str, t.Any]:
+        return super()._get_container_options(one_off)
+
+    def _get_environment(self) -> t.Dict[str, t.Any]:
+        db_service_config = self.stack_config.services.db
+        return dict(
+            DB_HOST=db_service_config.host
+            or self.stack_config.get_service_hostname(service="db"),
+            DB_PORT=5432,
+            DB_USER=self.db_user,
+            DB_PASSWORD=self.db_password,
+            LISTEN_PORT=self.container_port,
+            POOL_MODE=self.config.pool_mode,
+            DEFAULT_POOL_SIZE=self.config.default_pool_size,
+            MAX_CLIENT_CONN=self.config.max_client_conn,
+            AUTH_TYPE="scram-sha-256",
+            ADMIN_USERS=self.db_user,
+        )
+
+    def admin(self) -> AdminClient:
+        """
+        Get an admin client on PgBouncer admin console
+
+        Returns:
+            AdminClient: admin client
+        """
+        return AdminClient(
+            container=self.get_container(),
+            user=self.db_user,
+            dbname="pgbouncer",
+            host="127.0.0.1",
+            port=self.container_port,
+            password=self.db_password,
+            exec_user=None,
+            init_sql=None,
+        )
+
+    def pool_stats(self) -> t.List[t.Dict[str, str]]:
+        """
+        Get PgBouncer pools statistics from admin console (SHOW POOLS)
+
+        Raises:
+            exceptions.StackPoolStatsError: When admin console query fail
+
+        Returns:
+            t.List[t.Dict[str, str]]: One dict per pool
+        """
+        try:
+            with self.admin() as admin:
+                return admin.execute("SHOW POOLS").as_dicts()
+        except exceptions.StackDatabaseError as err:
+            raise exceptions.StackPoolStatsError(
+                f"Failed to get {self.stack_name} pool stats: {err}"
+            )
+
+    @property
+    def config(self) -> "config.PgBouncerStackConfig":
+        return super().config
+
+    @property
+    def db_user(self) -> str:
+        return self.stack_config.services.db.user or "odoo"
+
+    @property
+    def db_password(self) -> str:
+        return self.stack_config.services.db.password or "odoo"
+
+    @property
+    def base_image_tag(self) -> str:
+        return f"edoburu/pgbouncer:{self.config.version}"
+
+    @property
+    def has_custom_image(self) -> bool:
+        return False
+
+    @property
+    def container_port(self) -> int:
+        return 5432
+
+    @property
+    def health_command(self) -> t.List[str]:
+        return ["pg_isready", "-q", "-h", "127.0.0.1", "-p", str(self.container_port)]
@@ -1,16 +1,23 @@
 import enum
+import time
 import typing as t
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 from pathlib import Path
 
 from loguru import logger
 
-from odooghost import config, constant
+from odooghost import config, constant, metrics
 from odooghost.container import Container
 from odooghost.context import ctx
-from odooghost.exceptions import StackAlreadyExistsError, StackNotFoundError
+from odooghost.exceptions import (
+    StackAlreadyExistsError,
+    StackException,
+    StackNotFoundError,
+    StackServiceNotFound,
+)
 from odooghost.filters import OneOffFilter
-from odooghost.services import db, mail, odoo
+from odooghost.services import db, lb, mail, odoo, pgbouncer
 from odooghost.types import Filters, Labels
 from odooghost.utils.misc import get_hash, labels_as_list
 
@@ -42,6 +49,14 @@ class Stack:
         )
         if config.services.mail:
             self._services.update(dict(mail=mail.MailService(stack_config=config)))
+        if config.services.pgbouncer:
+            self._services.update(
+                dict(pgbouncer=pgbouncer.PgBouncerService(stack_config=config))
+            )
+        if config.services.gevent:
+            self._services.update(dict(gevent=odoo.GeventService(stack_config=config)))
+        if config.services.lb:
+            self._services.update(dict(lb=lb.LoadBalancerService(stack_config=config)))
 
     def _check_state(self) -> StackState:
         """
@@ -167,8 +182,9 @@ class Stack:
         try:
             service = self._services[name]
         except KeyError:
-            # TODO make exception
-            raise Exception
+            raise StackServiceNotFound(
+                f"Service {name} is not defined in stack {self.name}"
+            )
         return service
 
     def containers(
@@ -265,20 +281,97 @@ class Stack:
         logger.info(f"Updated Stack {self.name} !")
 
     @_ensure_exists
-    def start(self) -> None:
+    def start(self, wait: bool = False, timeout: float = 300) -> t.Dict[str, float]:
         """
         Start Stack
 
+        Args:
+            wait (bool, optional): wait for services to be ready and record
+                their boot time. Defaults to False.
+            timeout (float, optional): services ready timeout in seconds.
+                Defaults to 300.
+
         Raises:
             StackNotFoundError: When Stack does not exists
+
+        Returns:
+            t.Dict[str, float]: seconds to ready by service name when waiting
         """
+        start = time.monotonic()
         containers = self.containers(stopped=True)
         if not len(containers):
             logger.warning("No container to start !")
-            return
-        for container in containers:
+            return {}
+        for service in self.services():
+            service.prepare_start()
+        # load balancer resolves Odoo replicas when it starts
+        for container in sorted(containers, key=lambda c: c.service == "lb"):
             logger.info(f"Starting container {container.name}")
             container.start()
+        if not wait:
+            return {}
+        return self.wait_ready(timeout=timeout, start=start)
+
+    @_ensure_exists
+    def wait_ready(
+        self, timeout: float = 300, start: t.Optional[float] = None
+    ) -> t.Dict[str, float]:
+        """
+        Wait for all services to be ready and record their boot time
+
+        Args:
+            timeout (float, optional): timeout in seconds. Defaults to 300.
+            start (t.Optional[float], optional): monotonic time the Stack
+                was started at. Defaults to now.
+
+        Raises:
+            StackNotFoundError: When Stack does not exists
+            StackContainerHealthError: When a service is not ready in time
+
+        Returns:
+            t.Dict[str, float]: seconds to ready by service name
+        """
+        start = time.monotonic() if start is None else start
+        services = [
+            service
+            for service in self.services()
+            if service.get_container(raise_not_found=False) is not None
+        ]
+        logger.info("Waiting for services to be ready ...")
+        with ThreadPoolExecutor(max_workers=max(1, len(services))) as executor:
+            durations = dict(
+                zip(
+                    (service.name for service in services),
+                    executor.map(
+                        lambda service: service.wait_ready(
+                            timeout=timeout, start=start
+                        ),
+                        services,
+                    ),
+                )
+            )
+        metrics.record_boot(stack_name=self.name, durations=durations)
+        return durations
+
+    @_ensure_exists
+    def start_dependencies(self, timeout: float = 300) -> None:
+        """
+        Start services Odoo depends on and wait for them to be ready,
+        used before running Odoo in one off containers. Gevent container
+        is not started as it runs Odoo too.
+
+        Args:
+            timeout (float, optional): timeout in seconds. Defaults to 300.
+
+        Raises:
+            StackNotFoundError: When Stack does not exists
+            StackContainerHealthError: When a service is not ready in time
+        """
+        for service in self.services():
+            if service.name in ("odoo", "gevent") or service.health_command is None:
+                continue
+            service.start_container()
+            service.wait_ready(timeout=timeout)
 
     @_ensure_exists
     def stop(self, timeout: int = 10, wait: bool = False) -> None:
@@ -318,10 +411,213 @@ class Stack:
         if not len(containers):
             logger.warning("No container to restart !")
             return
+        for service in self.services():
+            service.prepare_start()
         for container in containers:
             logger.info(f"Restarting container {container.name}")
             container.restart(timeout=timeout)
 
+    @_ensure_exists
+    def update_resources(
+        self, service_name: str, resources: "config.ResourcesConfig"
+    ) -> None:
+        """
+        Update service resources on its container if any and in stored
+        Stack config
+
+        Args:
+            service_name (str): service name
+            resources (config.ResourcesConfig): resources config
+
+        Raises:
+            StackNotFoundError: When Stack does not exists
+            StackServiceNotFound: When service is not defined in Stack
+        """
+        service = self.get_service(name=service_name)
+        if service.get_container(raise_not_found=False) is not None:
+            service.update_resources(resources=resources)
+        service.config.resources = resources
+        ctx.stacks.update(config=self._config)
+
+    @_ensure_exists
+    def scale(self, replicas: int, timeout: float = 300) -> None:
+        """
+        Scale Odoo replicas behind the load balancer without restarting
+        the Stack and update stored Stack config. When Odoo is running,
+        new replicas are started and added once ready, removed replicas
+        are taken out of the load balancer before being dropped.
+
+        Args:
+            replicas (int): replicas count
+            timeout (float, optional): replicas ready timeout in seconds.
+                Defaults to 300.
+
+        Raises:
+            StackNotFoundError: When Stack does not exists
+            StackServiceNotFound: When Stack has no load balancer
+            StackContainerHealthError: When a new replica is not ready in time
+        """
+        odoo_service = t.cast("odoo.OdooService", self.get_service(name="odoo"))
+        lb_service = t.cast("lb.LoadBalancerService", self.get_service(name="lb"))
+        primary = odoo_service.get_container(raise_not_found=False)
+        running = primary is not None and primary.is_running
+        current = len(odoo_service.get_replicas())
+        self._config.services.odoo.replicas = replicas
+        if replicas > current:
+            odoo_service.scale(replicas=replicas, start=running)
+            if running:
+                for container in odoo_service.get_replicas()[current:]:
+                    odoo_service.wait_ready(timeout=timeout, container=container)
+            lb_service.reload()
+        else:
+            lb_service.reload()
+            odoo_service.scale(replicas=replicas)
+        ctx.stacks.update(config=self._config)
+
+    @_ensure_exists
+    def sync_addons(
+        self, jobs: int = 4, dry_run: bool = False, restart: bool = True
+    ) -> t.Tuple["odoo.addons_sync.AddonsSyncReport", t.List[Container]]:
+        """
+        Push copy mode addons changes in running Odoo containers without
+        rebuilding image, then restart changed containers so Odoo loads
+        new code. Stopped containers are left untouched.
+
+        Args:
+            jobs (int, optional): concurrent hashing threads. Defaults to 4.
+            dry_run (bool, optional): only compute changes. Defaults to False.
+            restart (bool, optional): restart changed containers.
+                Defaults to True.
+
+        Raises:
+            StackNotFoundError: When Stack does not exists
+            StackException: When Odoo is not running or sync fail
+
+        Returns:
+            t.Tuple[odoo.addons_sync.AddonsSyncReport, t.List[Container]]:
+                report summed over containers and changed containers
+        """
+        odoo_service = t.cast("odoo.OdooService", self.get_service(name="odoo"))
+        containers = odoo_service.get_replicas()
+        if "gevent" in self._services:
+            gevent_container = self.get_service(name="gevent").get_container(
+                raise_not_found=False
+            )
+            if gevent_container is not None:
+                containers.append(gevent_container)
+        for container in containers:
+            if not container.is_running:
+                logger.warning(f"Container {container.name} is not running, skipping")
+        containers = [container for container in containers if container.is_running]
+        if not containers:
+            raise StackException("Odoo is not running")
+
+        reports = []
+        changed = {}
+        for addon in odoo_service.addons.get_copy_addons():
+            source = addon.path or odoo_service.addons.get_context_path(addon)
+            logger.info(f"Comparing addons {source.as_posix()} ...")
+            source_manifest = odoo.addons_sync.get_source_manifest(
+                source=source, jobs=jobs
+            )
+            for container in containers:
+                report = odoo.addons_sync.sync_addons(
+                    container=container,
+                    source=source,
+                    dest=addon.container_posix_path,
+                    source_manifest=source_manifest,
+                    dry_run=dry_run,
+                )
+                if report.transfered or report.deleted:
+                    changed[container.name] = container
+                reports.append(report)
+        if restart and not dry_run:
+            for container in changed.values():
+                logger.info(f"Restarting container {container.name}")
+                container.restart()
+        return (
+            odoo.addons_sync.AddonsSyncReport(
+                transfered=sum(report.transfered for report in reports),
+                size=sum(report.size for report in reports),
+                deleted=sum(report.deleted for report in reports),
+            ),
+            list(changed.values()),
+        )
+
+    def get_http_container(self) -> Container:
+        """
+        Get container serving Odoo HTTP, load balancer when configured
+
+        Returns:
+            Container: Container instance
+        """
+        return self.get_service(
+            name="lb" if "lb" in self._services else "odoo"
+        ).get_container()
+
+    @_ensure_exists
+    def upgrade_database(
+        self, version: int, jobs: int = 1
+    ) -> t.List["db.restore.PhaseReport"]:
+        """
+        Upgrade Stack database cluster to a new postgres major version in
+        place, recreate db container and update stored Stack config.
+        Required images are pulled first, then running containers are
+        stopped during upgrade and started again.
+
+        Args:
+            version (int): target postgres major version
+            jobs (int, optional): pg_upgrade and analyze jobs. Defaults to 1.
+
+        Raises:
+            StackNotFoundError: When Stack does not exists
+            StackImagePullError: When required images can not be pulled
+
+        Returns:
+            t.List[db.restore.PhaseReport]: upgrade phases reports
+        """
+        db_service = t.cast("db.DbService", self.get_service(name="db"))
+        # old server can not start on an upgraded cluster, target image
+        # must be there before pg_upgrade runs
+        db_service.prepare_upgrade(version=version)
+        running = self.containers()
+        for container in running:
+            logger.info(f"Stopping container {container.name}")
+            container.stop()
+        for container in running:
+            container.wait()
+
+        try:
+            reports = [db_service.upgrade_cluster(version=version, jobs=jobs)]
+        except StackException:
+            # cluster is left untouched when upgrade fail
+            for container in running:
+                container.start()
+            raise
+        self._config.services.db.version = version
+        db_service.drop_containers()
+        db_service.create_container()
+        ctx.stacks.update(config=self._config)
+
+        db_container = db_service.start_container()
+        reports.append(
+            db.upgrade.analyze_cluster(
+                container=db_container,
+                user=db_service.config.user or "odoo",
+                jobs=jobs,
+            )
+        )
+        was_running = False
+        for container in running:
+            if container.name == db_container.name:
+                was_running = True
+                continue
+            logger.info(f"Starting container {container.name}")
+            container.start()
+        if not was_running:
+            db_container.stop()
+        return reports
+
     @property
     def name(self) -> str:
         """
@@ -1,3 +1,3 @@
-from . import misc, progress_stream, stream
+from . import http, misc, progress_stream, sketch, stream
 
-__all__ = ("stream", "progress_stream", "misc")
+__all__ = ("stream", "progress_stream", "misc", "sketch", "http")
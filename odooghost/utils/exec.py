@@ -1,4 +1,7 @@
+import io
+import tarfile
 import typing as t
+from pathlib import PurePosixPath
 
 if t.TYPE_CHECKING:
     from odooghost.container import Container
@@ -22,12 +25,33 @@ def create_folder(container: "Container", folder_path: str) -> bool:
 
 
 def set_permissions(
-    container: "Container", path: str, user: str = "odoo", group: str = "odoo"
+    container: "Container",
+    path: str,
+    user: str = "odoo",
+    group: str = "odoo",
+    recursive: bool = True,
 ):
     """
     Set permissions and ownership for a given path inside a Docker container.
     """
     exit_code, _ = container.exec_run(
-        command=f"chown -R {user}:{group} {path}", user="root"
+        command=f"chown {'-R ' if recursive else ''}{user}:{group} {path}",
+        user="root",
     )
     return exit_code == 0
+
+
+def write_file(container: "Container", path: str, content: str) -> bool:
+    """
+    Write a text file inside a Docker container.
+    Parent folder must exist.
+    """
+    path = PurePosixPath(path)
+    data = content.encode()
+    stream = io.BytesIO()
+    with tarfile.open(fileobj=stream, mode="w") as tar:
+        info = tarfile.TarInfo(name=path.name)
+        info.size = len(data)
+        info.mode = 0o644
+        tar.addfile(info, io.BytesIO(data))
+    return container.put_archive(path=path.parent.as_posix(), data=stream.getvalue())
@@ -0,0 +1,183 @@
+import asyncio
+import typing as t
+
+
+class HttpResponse(t.NamedTuple):
+    status: int
+    headers: t.Dict[str, str]
+    cookies: t.Dict[str, str]
+    body: bytes
+
+
+class HttpConnection:
+    """
+    Minimal asyncio HTTP/1.1 keep-alive connection
+    """
+
+    def __init__(self, host: str, port: int, timeout: float = 60) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader: t.Optional[asyncio.StreamReader] = None
+        self._writer: t.Optional[asyncio.StreamWriter] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def open(self) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=self.timeout
+        )
+
+    async def close(self) -> None:
+        if self._writer is None:
+            return
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+        self._reader = self._writer = None
+
+    async def _read_body(self, headers: t.Dict[str, str]) -> bytes:
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                if not size:
+                    # trailers are ignored
+                    while (await self._reader.readline()) not in (b"\r\n", b""):
+                        pass
+                    return b"".join(chunks)
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readexactly(2)
+        if "content-length" in headers:
+            return await self._reader.readexactly(int(headers["content-length"]))
+        return await self._reader.read()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        body: t.Optional[bytes],
+        headers: t.Dict[str, str],
+    ) -> HttpResponse:
+        lines = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            f"Content-Length: {len(body or b'')}",
+            *(f"{key}: {value}" for key, value in headers.items()),
+        ]
+        self._writer.write("\r\n".join(lines).encode() + b"\r\n\r\n" + (body or b""))
+        await self._writer.drain()
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server")
+        status = int(status_line.split()[1])
+        response_headers: t.Dict[str, str] = {}
+        cookies: t.Dict[str, str] = {}
+        while (line := await self._reader.readline()) not in (b"\r\n", b""):
+            key, _, value = line.decode("latin-1").partition(":")
+            key, value = key.strip().lower(), value.strip()
+            if key == "set-cookie":
+                name, _, cookie = value.split(";", 1)[0].partition("=")
+                cookies[name.strip()] = cookie.strip()
+            response_headers[key] = value
+        response_body = await self._read_body(response_headers)
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return HttpResponse(
+            status=status,
+            headers=response_headers,
+            cookies=cookies,
+            body=response_body,
+        )
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: t.Optional[bytes] = None,
+        headers: t.Optional[t.Dict[str, str]] = None,
+    ) -> HttpResponse:
+        """
+        Send a request, connection is opened when needed
+
+        Args:
+            method (str): HTTP method
+            path (str): request path
+            body (t.Optional[bytes], optional): request body. Defaults to None.
+            headers (t.Optional[t.Dict[str, str]], optional): request headers.
+                Defaults to None.
+
+        Returns:
+            HttpResponse: response
+        """
+        if not self.is_open:
+            await self.open()
+        try:
+            return await asyncio.wait_for(
+                self._request(
+                    method=method, path=path, body=body, headers=headers or {}
+                ),
+                timeout=self.timeout,
+            )
+        except BaseException:
+            # connection state is unknown, never reuse it
+            await self.close()
+            raise
+
+
+class ConnectionPool:
+    """
+    Pool of keep-alive connections to one host, at most size connections
+    are opened and each one serves a single request at a time
+    """
+
+    def __init__(self, host: str, port: int, size: int, timeout: float = 60) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(size)
+        self._idle: t.List[HttpConnection] = []
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: t.Optional[bytes] = None,
+        headers: t.Optional[t.Dict[str, str]] = None,
+    ) -> HttpResponse:
+        """
+        Send a request on an idle connection
+
+        Args:
+            method (str): HTTP method
+            path (str): request path
+            body (t.Optional[bytes], optional): request body. Defaults to None.
+            headers (t.Optional[t.Dict[str, str]], optional): request headers.
+                Defaults to None.
+
+        Returns:
+            HttpResponse: response
+        """
+        async with self._semaphore:
+            connection = (
+                self._idle.pop()
+                if self._idle
+                else HttpConnection(
+                    host=self.host, port=self.port, timeout=self.timeout
+                )
+            )
+            try:
+                return await connection.request(
+                    method=method, path=path, body=body, headers=headers
+                )
+            finally:
+                if connection.is_open:
+                    self._idle.append(connection)
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._idle.pop().close()
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import re
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from odooghost import exceptions
+
+if t.TYPE_CHECKING:
+    from odooghost.container import Container
+
+Manifest = t.Dict[str, t.Tuple[int, str]]
+
+# Odoo filestore files are named after their content sha1
+CONTENT_ADDRESSED_RE = re.compile(r"^[0-9a-f]{40}$")
+
+# runs with container python, mirrors build_manifest
+MANIFEST_SCRIPT: str = """
+import hashlib, json, os, re, sys
+root, content_addressed, manifest = sys.argv[1], sys.argv[2] == "1", {}
+for folder, _, files in os.walk(root):
+    for name in files:
+        path = os.path.join(folder, name)
+        if os.path.islink(path) or not os.path.isfile(path):
+            continue
+        rel = os.path.relpath(path, root).replace(os.sep, "/")
+        if content_addressed and re.match(r"^[0-9a-f]{40}$", name):
+            manifest[rel] = [os.path.getsize(path), name]
+            continue
+        digest = hashlib.sha1()
+        with open(path, "rb") as stream:
+            for chunk in iter(lambda: stream.read(1048576), b""):
+                digest.update(chunk)
+        manifest[rel] = [os.path.getsize(path), digest.hexdigest()]
+json.dump(manifest, sys.stdout)
+"""
+
+
+class ManifestDiff(t.NamedTuple):
+    changed: t.List[str]
+    extra: t.List[str]
+    size: int
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha1(usedforsecurity=False)
+    with open(path, "rb") as stream:
+        for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_content_addressed(path: Path) -> bool:
+    return CONTENT_ADDRESSED_RE.match(path.name) is not None
+
+
+def build_manifest(
+    root: Path, jobs: int = 4, content_addressed: bool = False
+) -> Manifest:
+    """
+    Build manifest of files under root: relative path, size and sha1
+
+    Args:
+        root (Path): root folder
+        jobs (int, optional): concurrent hashing threads. Defaults to 4.
+        content_addressed (bool, optional): files named after their sha1
+            are not read, their name is used as digest. Defaults to False.
+
+    Returns:
+        Manifest: manifest
+    """
+    paths = [
+        path for path in root.rglob("*") if path.is_file() and not path.is_symlink()
+    ]
+    hashed = [
+        path
+        for path in paths
+        if not (content_addressed and _is_content_addressed(path))
+    ]
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        digests = dict(zip(hashed, executor.map(_hash_file, hashed)))
+    return {
+        path.relative_to(root).as_posix(): (
+            path.stat().st_size,
+            digests.get(path, path.name),
+        )
+        for path in paths
+    }
+
+
+def get_container_manifest(
+    container: "Container", root: str, content_addressed: bool = False
+) -> Manifest:
+    """
+    Build manifest of files under root in container, with one exec
+
+    Args:
+        container (Container): container with python3
+        root (str): root folder in container
+        content_addressed (bool, optional): files named after their sha1
+            are not read, their name is used as digest. Defaults to False.
+
+    Raises:
+        exceptions.StackException: When manifest can not be built
+
+    Returns:
+        Manifest: manifest, empty if root does not exists
+    """
+    exit_code, res = container.exec_run(
+        command=[
+            "python3",
+            "-c",
+            MANIFEST_SCRIPT,
+            root,
+            "1" if content_addressed else "0",
+        ],
+        stderr=False,
+    )
+    if exit_code != 0:
+        raise exceptions.StackException(f"Failed to build manifest of {root}")
+    return {path: tuple(item) for path, item in json.loads(res.decode()).items()}
+
+
+def diff_manifests(source: Manifest, dest: Manifest) -> ManifestDiff:
+    """
+    Compare manifests
+
+    Args:
+        source (Manifest): source manifest
+        dest (Manifest): destination manifest
+
+    Returns:
+        ManifestDiff: paths missing or changed in dest, paths only in dest
+            and size of changed paths
+    """
+    changed = sorted(path for path, item in source.items() if dest.get(path) != item)
+    return ManifestDiff(
+        changed=changed,
+        extra=sorted(set(dest) - set(source)),
+        size=sum(source[path][0] for path in changed),
+    )
@@ -28,6 +28,41 @@ def get_now() -> str:
     return datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
 
+def parse_duration(duration: str) -> int:
+    """
+    Parse duration like 90, 30s, 5m, 2h or 1d
+
+    Raises:
+        ValueError: When duration can not be parsed
+
+    Returns:
+        int: seconds
+    """
+    units = dict(s=1, m=60, h=3600, d=86400)
+    duration = duration.strip().lower()
+    if duration[-1:] in units:
+        return int(duration[:-1]) * units[duration[-1]]
+    return int(duration)
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if abs(size) < 1024 or unit == "TB":
+            break
+        size /= 1024
+    return f"{size:.1f} {unit}"
+
+
+def format_change(before: float, after: float) -> str:
+    if not before:
+        return "-"
+    return f"{100 * (after - before) / before:+.1f}%"
+
+
+def is_glob(pattern: str) -> bool:
+    return any(char in pattern for char in "*?[")
+
+
 def write_tar(dest: Path, data: t.Union[bytes, t.IO]) -> None:
     with open(dest.as_posix(), "wb") as stream:
         for chunk in data:
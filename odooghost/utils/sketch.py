@@ -0,0 +1,91 @@
+import math
+import typing as t
+
+# values below are counted as zero, ie. 0.000 SQL time
+MIN_VALUE: float = 1e-6
+
+
+class QuantileSketch:
+    """
+    Streaming quantile sketch with relative accuracy guarantee (DDSketch).
+    Values are counted in logarithmic buckets, memory is bounded by
+    collapsing lowest buckets so high quantiles stay accurate.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 1024) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: t.Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def _collapse(self) -> None:
+        keys = sorted(self.bins)
+        overflow = len(keys) - self.max_bins + 1
+        target = keys[overflow]
+        for key in keys[:overflow]:
+            self.bins[target] += self.bins.pop(key)
+
+    def add(self, value: float) -> None:
+        """
+        Add a value
+
+        Args:
+            value (float): positive value
+        """
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        if value < MIN_VALUE:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """
+        Merge a sketch with the same relative accuracy
+
+        Args:
+            other (QuantileSketch): sketch
+        """
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+        self.zero_count += other.zero_count
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def quantile(self, q: float) -> float:
+        """
+        Get value at quantile
+
+        Args:
+            q (float): quantile between 0 and 1
+
+        Returns:
+            float: value, 0 when sketch is empty
+        """
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                return min(2 * self.gamma**key / (self.gamma + 1), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
@@ -1,5 +1,8 @@
+import io
 import json.decoder
+import tarfile
 import typing as t
+from pathlib import Path, PurePosixPath
 
 from loguru import logger
 
@@ -83,3 +86,83 @@ def json_stream(stream: t.IO) -> t.Generator:
     be newline delimited, and others are not).
     """
     return split_buffer(stream, json_splitter, json_decoder.decode)
+
+
+class ChunksReader(io.RawIOBase):
+    """
+    Read only file object over an iterable of bytes chunks,
+    like docker archive streams
+    """
+
+    def __init__(self, chunks: t.Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+class _ChunksWriter:
+    def __init__(self) -> None:
+        self.chunks: t.List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def tar_stream(
+    source: Path,
+    arcname: str,
+    filter: t.Optional[t.Callable] = None,
+    paths: t.Optional[t.Iterable[str]] = None,
+) -> t.Generator[bytes, None, None]:
+    """
+    Stream an uncompressed tar archive of source, one member at a time
+
+    Args:
+        source (Path): file or folder to archive
+        arcname (str): source name in archive
+        filter (t.Optional[t.Callable], optional): tarfile add filter.
+            Defaults to None.
+        paths (t.Optional[t.Iterable[str]], optional): only archive these paths,
+            relative to source. Defaults to None.
+
+    Yields:
+        bytes: archive chunks
+    """
+    writer = _ChunksWriter()
+    with tarfile.open(fileobj=writer, mode="w|") as tar:
+        if paths is not None:
+            members = [source / path for path in paths]
+        else:
+            members = [source]
+            if source.is_dir() and not source.is_symlink():
+                members += sorted(source.rglob("*"))
+        for path in members:
+            name = PurePosixPath(arcname, path.relative_to(source).as_posix())
+            info = tar.gettarinfo(path.as_posix(), arcname=name.as_posix())
+            if filter is not None:
+                info = filter(info)
+            if info.isreg():
+                with open(path, "rb") as stream:
+                    tar.addfile(info, stream)
+            else:
+                tar.addfile(info)
+            yield writer.pop()
+    yield writer.pop()
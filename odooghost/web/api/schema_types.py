@@ -1,9 +1,13 @@
 import enum
 import typing as t
+from datetime import datetime, timedelta, timezone
 
 import strawberry
 
 from odooghost import container, stack
+from odooghost.services import db
+from odooghost.services.odoo import http_stats
+from odooghost.utils.sketch import QuantileSketch
 
 
 @strawberry.enum
@@ -54,6 +58,91 @@ class Container:
         )
 
 
+@strawberry.type
+class PoolStats:
+    database: str
+    user: str
+    cl_active: int
+    cl_waiting: int
+    sv_active: int
+    sv_idle: int
+    sv_used: int
+    maxwait: int
+    pool_mode: str
+
+    @classmethod
+    def from_dict(cls, data: t.Dict[str, str]) -> "PoolStats":
+        counters = ("cl_active", "cl_waiting", "sv_active", "sv_idle", "sv_used")
+        return cls(
+            database=data.get("database", ""),
+            user=data.get("user", ""),
+            pool_mode=data.get("pool_mode", ""),
+            maxwait=int(data.get("maxwait") or 0),
+            **{counter: int(data.get(counter) or 0) for counter in counters},
+        )
+
+
+@strawberry.type
+class Percentiles:
+    p50: float
+    p95: float
+    p99: float
+    mean: float
+    max: float
+
+    @classmethod
+    def from_sketch(cls, sketch: QuantileSketch) -> "Percentiles":
+        return cls(
+            p50=sketch.quantile(0.5),
+            p95=sketch.quantile(0.95),
+            p99=sketch.quantile(0.99),
+            mean=sketch.mean,
+            max=sketch.max,
+        )
+
+
+@strawberry.type
+class HttpRouteStats:
+    method: str
+    route: str
+    count: int
+    errors: int
+    latency: Percentiles
+    sql_count: Percentiles
+    sql_time: Percentiles
+
+    @classmethod
+    def from_stats(cls, stats: http_stats.RouteStats) -> "HttpRouteStats":
+        return cls(
+            method=stats.method,
+            route=stats.route,
+            count=stats.count,
+            errors=stats.errors,
+            latency=Percentiles.from_sketch(stats.latency),
+            sql_count=Percentiles.from_sketch(stats.sql_count),
+            sql_time=Percentiles.from_sketch(stats.sql_time),
+        )
+
+
+@strawberry.type
+class SqlStatementStats:
+    query: str
+    calls: int
+    total_time: float
+    mean_time: float
+    rows: int
+
+    @classmethod
+    def from_stats(cls, stats: db.statements.StatementStats) -> "SqlStatementStats":
+        return cls(
+            query=stats.query,
+            calls=stats.calls,
+            total_time=stats.total_time,
+            mean_time=stats.mean_time,
+            rows=stats.rows,
+        )
+
+
 @strawberry.type
 class Stack:
     id: str
@@ -90,6 +179,48 @@ class Stack:
             return None
         return [Container.from_instance(c) for c in ctns]
 
+    @strawberry.field
+    def pool_stats(self) -> t.Optional[t.List[PoolStats]]:
+        if not self.instance._config.services.pgbouncer:
+            return None
+        return [
+            PoolStats.from_dict(pool)
+            for pool in self.instance.get_service(name="pgbouncer").pool_stats()
+        ]
+
+    @strawberry.field
+    def http_stats(
+        self, since: int = 3600, sort: str = "latency", limit: int = 20
+    ) -> t.List[HttpRouteStats]:
+        stats = http_stats.collect(
+            container=self.instance.get_service(name="odoo").get_container(),
+            since=datetime.now(timezone.utc) - timedelta(seconds=since),
+        )
+        return [
+            HttpRouteStats.from_stats(route)
+            for route in stats.top(sort=http_stats.SortKey(sort), limit=limit)
+        ]
+
+    @strawberry.field
+    def sql_stats(
+        self, dbname: str, sort: str = "total", limit: int = 20
+    ) -> t.Optional[t.List[SqlStatementStats]]:
+        db_service = self.instance.get_service(name="db")
+        if db_service.config.statements is None:
+            return None
+        with db_service.admin() as admin:
+            statements = db.statements.get_statements(
+                admin=admin, dbname=dbname, version=db_service.config.version
+            )
+        return [
+            SqlStatementStats.from_stats(statement)
+            for statement in db.statements.top(
+                statements=statements,
+                sort=db.statements.SortKey(sort),
+                limit=limit,
+            )
+        ]
+
     @classmethod
     def from_instance(cls, instance: stack.Stack) -> "Stack":
         return cls(id=instance.id, name=instance.name, instance=instance)